@@ -0,0 +1,145 @@
+from fastapi import APIRouter, Header, Query, Request
+from fastapi.responses import JSONResponse
+from utils.helper import create_error_response, get_logger
+from utils.admin_auth import check_admin_token
+from utils.profiler import SamplingProfiler
+from pathlib import Path
+from typing import Optional
+
+import asyncio
+import config
+
+router = APIRouter()
+logger = get_logger(__name__)
+
+
+@router.get("/api/admin/model")
+async def get_model_versions(request: Request, token: Optional[str] = Header(None, alias="X-Admin-Token")):
+    error = check_admin_token(token, "get_model_versions(토큰 확인)")
+    if error is not None:
+        return error
+
+    return JSONResponse(
+        status_code=200,
+        content={"status": 200, "success": True, "registry": request.app.state.model_registry.stats()}
+    )
+
+
+@router.post("/api/admin/model/reload")
+async def reload_model(
+    request: Request,
+    model_path: Optional[str] = Query(None, alias="modelPath"),
+    force: bool = Query(False),
+    token: Optional[str] = Header(None, alias="X-Admin-Token"),
+):
+    error = check_admin_token(token, "reload_model(토큰 확인)")
+    if error is not None:
+        return error
+
+    # 모델 디렉터리(MODEL_PATH 가 있는 디렉터리) 밖의 파일은 로드하지 않음
+    model_dir = Path(config.MODEL_PATH).resolve().parent
+    path = Path(model_path).resolve() if model_path else Path(config.MODEL_PATH).resolve()
+    if path.parent != model_dir or not path.is_file():
+        logger.error(f"error_code:422, invalid_parameter, reload_model(경로 확인), {model_path}")
+        return create_error_response(422, "invalid_parameter", "reload_model(경로 확인)", f"{model_dir} 안의 모델 파일만 로드할 수 있습니다.")
+
+    registry = request.app.state.model_registry
+    if registry.reloading:
+        logger.warning("error_code:409, reload_in_progress, reload_model(로드 중 확인), 이미 모델을 로드하는 중")
+        return create_error_response(409, "reload_in_progress", "reload_model(로드 중 확인)", "이미 모델을 로드하는 중입니다.")
+
+    # 로드/warm-up 은 백그라운드에서 진행, 진행 상황은 GET /api/admin/model 의 lastReload 로 확인
+    request.app.state.model_reload_task = asyncio.create_task(registry.reload(str(path), force=force))
+    logger.info(f"모델 reload 요청: {path} (force={force})")
+    return JSONResponse(
+        status_code=202,
+        content={"status": 202, "success": True, "modelPath": str(path), "active": registry.stats()["active"]}
+    )
+
+
+@router.post("/api/admin/profile")
+async def run_profiler(
+    request: Request,
+    seconds: float = Query(5.0),
+    interval_ms: float = Query(5.0, alias="intervalMs"),
+    top: int = Query(30),
+    token: Optional[str] = Header(None, alias="X-Admin-Token"),
+):
+    error = check_admin_token(token, "run_profiler(토큰 확인)")
+    if error is not None:
+        return error
+
+    if not 0 < seconds <= config.PROFILE_MAX_SECONDS or not 1 <= interval_ms <= 1000:
+        logger.error(f"error_code:422, invalid_parameter, run_profiler(파라미터 확인), seconds={seconds}, intervalMs={interval_ms}")
+        return create_error_response(422, "invalid_parameter", "run_profiler(파라미터 확인)",
+                                     f"seconds 는 0 초과 {config.PROFILE_MAX_SECONDS} 이하, intervalMs 는 1~1000 이어야 합니다.")
+    if request.app.state.profiler is not None:
+        logger.warning("error_code:409, profile_in_progress, run_profiler(실행 중 확인), 이미 프로파일링 중")
+        return create_error_response(409, "profile_in_progress", "run_profiler(실행 중 확인)", "이미 프로파일링 중입니다.")
+
+    # 샘플링은 별도 스레드에서, 이 요청은 seconds 동안 기다렸다가 결과를 반환
+    profiler = SamplingProfiler(interval_seconds=interval_ms / 1000)
+    request.app.state.profiler = profiler
+    profiler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.stop()
+        request.app.state.profiler = None
+
+    logger.info(f"프로파일링 완료: {seconds}초, 샘플 {profiler.samples}회")
+    return JSONResponse(status_code=200, content={"status": 200, "success": True, "profile": profiler.result(top=top)})
+
+
+@router.get("/api/admin/traces")
+async def get_slow_traces(
+    request: Request,
+    limit: int = Query(20),
+    token: Optional[str] = Header(None, alias="X-Admin-Token"),
+):
+    error = check_admin_token(token, "get_slow_traces(토큰 확인)")
+    if error is not None:
+        return error
+
+    traces = request.app.state.traces
+    return JSONResponse(
+        status_code=200,
+        content={
+            "status": 200,
+            "success": True,
+            "tracing": traces.stats(),
+            "traces": [trace.to_dict() for trace in traces.recent(max(limit, 0))],
+        }
+    )
+
+
+@router.get("/api/admin/traces/{request_uuid}")
+async def get_slow_trace(request: Request, request_uuid: str, token: Optional[str] = Header(None, alias="X-Admin-Token")):
+    error = check_admin_token(token, "get_slow_trace(토큰 확인)")
+    if error is not None:
+        return error
+
+    trace = request.app.state.traces.get(request_uuid)
+    if trace is None:
+        logger.warning(f"error_code:404, trace_not_found, get_slow_trace(조회), {request_uuid}")
+        return create_error_response(404, "trace_not_found", "get_slow_trace(조회)", f"보관 중인 trace 가 없습니다: {request_uuid}")
+    return JSONResponse(status_code=200, content={"status": 200, "success": True, "trace": trace.to_dict()})
+
+
+@router.put("/api/admin/traces")
+async def configure_slow_traces(
+    request: Request,
+    threshold_ms: float = Query(..., alias="thresholdMs"),
+    token: Optional[str] = Header(None, alias="X-Admin-Token"),
+):
+    error = check_admin_token(token, "configure_slow_traces(토큰 확인)")
+    if error is not None:
+        return error
+
+    # 0 이하면 추적을 끄고 보관 중인 trace 도 비움
+    traces = request.app.state.traces
+    traces.threshold_ms = max(threshold_ms, 0)
+    if not traces.enabled:
+        traces.clear()
+    logger.info(f"느린 요청 추적 기준 변경: {traces.threshold_ms} ms")
+    return JSONResponse(status_code=200, content={"status": 200, "success": True, "tracing": traces.stats()})
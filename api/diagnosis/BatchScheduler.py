@@ -0,0 +1,208 @@
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from utils.bounded_executor import BoundedExecutor
+from utils.helper import get_logger
+from utils.metrics import Histogram
+from utils.tracing import RequestTrace, current_trace
+
+logger = get_logger(__name__)
+
+INFERENCE_SECONDS = Histogram("inference_seconds", "배치 단위 model.predict 시간")
+INFERENCE_BATCH_SIZE = Histogram("inference_batch_size", "추론 배치 크기", buckets=(1, 2, 4, 8, 16, 32, 64))
+INFERENCE_QUEUE_WAIT_SECONDS = Histogram("inference_queue_wait_seconds", "진단 요청이 배치에 실리기까지 대기한 시간")
+
+PendingRequest = Tuple[tuple, asyncio.Future, float, Optional[RequestTrace]]
+
+
+class BatchScheduler:
+    """여러 디바이스의 진단 요청을 모아 한 번의 model.predict 로 처리하는 스케줄러
+
+    prepare(*inputs, out=...) 는 워커 스레드에서 요청별 입력을 재사용되는 배치 버퍼의 한 행에 직접 채운다.
+    """
+
+    def __init__(self, model_getter: Callable, executor: BoundedExecutor, prepare: Callable,
+                 input_shape: Tuple[int, ...], max_batch_size: int = 8, max_wait_seconds: float = 0.01):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size 는 1 이상이어야 함")
+
+        self.model_getter = model_getter
+        self.executor = executor
+        self.prepare = prepare
+        self.input_shape = tuple(input_shape)
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+
+        self._pending: Deque[PendingRequest] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._batch_tasks: Set[asyncio.Task] = set()
+        self._local = threading.local()
+
+        self._total_requests = 0
+        self._total_batches = 0
+        self._batch_size_counts: Dict[int, int] = {}
+        self._total_wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._compute_seconds = 0.0
+
+    async def submit(self, *inputs) -> np.ndarray:
+        """요청 하나를 배치에 태우고 해당 요청의 예측 결과 (1, ...) 만 돌려준다"""
+        loop = asyncio.get_running_loop()
+        self._ensure_worker(loop)
+
+        future = loop.create_future()
+        self._pending.append((inputs, future, time.perf_counter(), current_trace.get()))
+        self._wakeup.set()
+        return await future
+
+    def _ensure_worker(self, loop: asyncio.AbstractEventLoop):
+        if self._task is not None and not self._task.done() and self._task.get_loop() is loop:
+            return
+
+        # 이벤트 루프가 바뀌면 이전 루프에 묶인 요청은 더 이상 처리할 수 없음
+        self._pending.clear()
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.executor.max_workers)
+        self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            # 모든 워커가 추론 중이면 빈 자리가 날 때까지 요청을 더 모음
+            await self._slots.acquire()
+
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            # 첫 요청이 들어온 시점부터 max_wait 동안 추가 요청을 모음
+            deadline = self._pending[0][2] + self.max_wait_seconds
+            while len(self._pending) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            batch_size = min(len(self._pending), self.max_batch_size)
+            batch = [self._pending.popleft() for _ in range(batch_size)]
+            task = asyncio.create_task(self._dispatch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _dispatch(self, batch: List[PendingRequest]):
+        try:
+            await self._predict_batch(batch)
+        finally:
+            self._slots.release()
+
+    async def _predict_batch(self, batch: List[PendingRequest]):
+        batch = [item for item in batch if not item[1].done()]
+        if not batch:
+            return
+
+        dispatched_at = time.perf_counter()
+        self._record_stats(batch, dispatched_at)
+
+        try:
+            model = self.model_getter()
+            errors, predictions, predict_started, predict_seconds = await self.executor.run(
+                self._run_batch, model, [(inputs, trace) for inputs, _, _, trace in batch])
+            self._compute_seconds += time.perf_counter() - dispatched_at
+        except Exception as e:
+            logger.error(f"배치 추론 실패 (batch_size={len(batch)}): {str(e)}")
+            for _, future, _, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for _, _, enqueued_at, trace in batch:
+            if trace is not None:
+                trace.add("inference_queue_wait", enqueued_at, dispatched_at - enqueued_at)
+                if predict_seconds:
+                    trace.add(f"model_predict(batch={len(batch)})", predict_started, predict_seconds)
+
+        row = 0
+        for (_, future, _, _), error in zip(batch, errors):
+            if error is not None:
+                if not future.done():
+                    future.set_exception(error)
+                continue
+            if not future.done():
+                future.set_result(predictions[row:row + 1])
+            row += 1
+
+    def _run_batch(self, model, batch_inputs: List[Tuple[tuple, Optional[RequestTrace]]]):
+        """워커 스레드에서 실행: 배치 버퍼 채우기 + model.predict, predict 시작 시각과 걸린 시간도 반환"""
+        buffer = self._batch_buffer(len(batch_inputs))
+        errors: List[Optional[Exception]] = []
+        filled = 0
+        for inputs, trace in batch_inputs:
+            # 전처리 단계 span 이 해당 요청의 trace 에 기록되도록 요청마다 trace 를 바꿔 가며 실행
+            token = current_trace.set(trace)
+            try:
+                self.prepare(*inputs, out=buffer[filled:filled + 1])
+            except Exception as e:
+                errors.append(e)
+                continue
+            finally:
+                current_trace.reset(token)
+            errors.append(None)
+            filled += 1
+
+        predictions = None
+        predict_started = time.perf_counter()
+        if filled:
+            with INFERENCE_SECONDS.time():
+                predictions = model.predict(buffer[:filled])
+        return errors, predictions, predict_started, time.perf_counter() - predict_started if filled else 0.0
+
+    def _batch_buffer(self, batch_size: int) -> np.ndarray:
+        # 워커 스레드마다 float32 배치 버퍼를 하나씩 두고 더 큰 배치가 올 때만 다시 할당
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None or buffer.shape[0] < batch_size:
+            buffer = np.empty((batch_size, *self.input_shape), dtype=np.float32)
+            self._local.buffer = buffer
+        return buffer
+
+    def _record_stats(self, batch: List[PendingRequest], dispatched_at: float):
+        batch_size = len(batch)
+        self._total_batches += 1
+        self._total_requests += batch_size
+        self._batch_size_counts[batch_size] = self._batch_size_counts.get(batch_size, 0) + 1
+        INFERENCE_BATCH_SIZE.observe(batch_size)
+
+        for _, _, enqueued_at, _ in batch:
+            waited = dispatched_at - enqueued_at
+            INFERENCE_QUEUE_WAIT_SECONDS.observe(waited)
+            self._total_wait_seconds += waited
+            self._max_wait_seconds = max(self._max_wait_seconds, waited)
+
+    def seconds_per_request(self) -> float:
+        """요청 하나당 평균 추론 시간(전처리 + model.predict, 배치 시간을 배치 크기로 나눔)"""
+        return self._compute_seconds / self._total_requests if self._total_requests else 0.0
+
+    def stats(self) -> dict:
+        requests = self._total_requests
+        batches = self._total_batches
+        return {
+            "maxBatchSize": self.max_batch_size,
+            "maxWaitMs": self.max_wait_seconds * 1000,
+            "pending": len(self._pending),
+            "totalRequests": requests,
+            "totalBatches": batches,
+            "avgBatchSize": requests / batches if batches else 0.0,
+            "batchSizeCounts": {str(size): count for size, count in sorted(self._batch_size_counts.items())},
+            "avgQueueWaitMs": self._total_wait_seconds / requests * 1000 if requests else 0.0,
+            "maxQueueWaitMs": self._max_wait_seconds * 1000,
+            "computeSeconds": round(self._compute_seconds, 6),
+        }
@@ -0,0 +1,67 @@
+from typing import Callable, Optional
+import time
+
+import numpy as np
+
+from utils.metrics import Counter
+from api.diagnosis.DiagnosisCache import CachedDiagnosis
+
+DIAGNOSIS_SKIP_TOTAL = Counter("diagnosis_skip_total", "윈도우 변화 확인 결과 (skipped, changed, forced, no_reference)", ["outcome"])
+
+
+class ChangeDetector:
+    """마지막으로 추론한 윈도우와 현재 윈도우의 썸네일을 비교해 모델 추론을 건너뛸지 결정
+
+    각 윈도우를 frameIdx 순으로 samples 개 구간에서 한 장씩 뽑아 (samples, 32, 32) 기준 썸네일을 만들고,
+    같은 위치끼리의 평균 밝기 차이(0~255) 중 가장 큰 값을 변화 점수로 쓴다.
+    윈도우 일부 구간만 바뀌어도(눈을 감는 구간 등) 점수가 올라가도록 평균이 아닌 최댓값을 사용한다.
+    """
+
+    def __init__(self, threshold: float, max_age_seconds: float, samples: int = 8,
+                 seconds_per_diagnosis: Optional[Callable[[], float]] = None):
+        self.threshold = threshold
+        self.max_age_seconds = max_age_seconds
+        self.samples = max(samples, 1)
+        # 추론 1회 평균 시간, 건너뛴 추론으로 아낀 시간 추정용
+        self.seconds_per_diagnosis = seconds_per_diagnosis
+
+        self._counts = {outcome: 0 for outcome in ("skipped", "changed", "forced", "no_reference")}
+        self._last_score = 0.0
+
+    def reference(self, signatures: np.ndarray) -> np.ndarray:
+        positions = np.linspace(0, len(signatures) - 1, self.samples).round().astype(np.int64)
+        return signatures[positions]
+
+    def score(self, reference: np.ndarray, signatures: np.ndarray) -> float:
+        current = self.reference(signatures).astype(np.int16)
+        return float(np.abs(current - reference).mean(axis=(1, 2)).max())
+
+    def reusable(self, entry: Optional[CachedDiagnosis], signatures: np.ndarray) -> bool:
+        """entry 결과를 그대로 써도 되면 True, 다시 추론해야 하면 False"""
+        if entry is None or entry.signatures is None or len(signatures) == 0:
+            return self._count("no_reference", False)
+        if time.monotonic() - entry.created_at > self.max_age_seconds:
+            return self._count("forced", False)
+
+        self._last_score = self.score(entry.signatures, signatures)
+        if self._last_score < self.threshold:
+            return self._count("skipped", True)
+        return self._count("changed", False)
+
+    def _count(self, outcome: str, reusable: bool) -> bool:
+        self._counts[outcome] += 1
+        DIAGNOSIS_SKIP_TOTAL.labels(outcome).inc()
+        return reusable
+
+    def stats(self) -> dict:
+        checks = sum(self._counts.values())
+        seconds_per_diagnosis = self.seconds_per_diagnosis() if self.seconds_per_diagnosis else 0.0
+        return {
+            "threshold": self.threshold,
+            "maxAgeSeconds": self.max_age_seconds,
+            "checks": checks,
+            **self._counts,
+            "skipRate": self._counts["skipped"] / checks if checks else 0.0,
+            "lastScore": round(self._last_score, 3),
+            "estimatedSecondsSaved": round(self._counts["skipped"] * seconds_per_diagnosis, 6),
+        }
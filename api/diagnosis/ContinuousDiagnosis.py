@@ -0,0 +1,141 @@
+import asyncio
+import time
+from typing import Dict, Set
+
+from utils.helper import get_logger
+from utils.metrics import Counter
+from api.diagnosis.diagnosis_routes import run_diagnosis, publish_latest, DiagnosisError, MIN_DIAGNOSIS_FRAMES
+
+logger = get_logger(__name__)
+
+CONTINUOUS_DIAGNOSIS_TOTAL = Counter("continuous_diagnosis_total", "서버 측 연속 진단 결과 (completed, shed, deferred, error)", ["outcome"])
+
+
+class ContinuousDiagnosis:
+    """디바이스 요청 없이 서버가 직접 진단을 돌려 큐 카운터(publish_result)와 DiagnosisCache 에 최신 결과를 남기는 스케줄러
+
+    interval 마다 활성 디바이스를 훑어 윈도우가 43프레임 이상이고 마지막 진단 이후 새 프레임이 stride 개 이상
+    들어온 디바이스를 진단한다. 한 번에 띄운 진단은 BatchScheduler 에서 여러 디바이스가 한 배치로 묶인다.
+    동시에 진행할 수 있는 진단 수(max_in_flight)를 넘으면 가장 오래전에 진단한 디바이스부터 처리하고
+    나머지는 다음 주기로 미룬다.
+    마지막으로 진단한 sequence 는 큐 카운터(claim_diagnosis)에 두므로, 공유 메모리 저장소를 쓰는 워커가 여럿이어도
+    각 윈도우는 먼저 맡은 워커 하나만 진단하고, 결과도 큐 카운터에 있으므로 어느 워커로 온 조회든 같은 결과를 읽는다.
+    """
+
+    def __init__(self, app, devices, stride: int, interval_seconds: float, max_in_flight: int):
+        self.app = app
+        self.devices = devices
+        self.stride = max(stride, 1)
+        self.interval_seconds = interval_seconds
+        self.max_in_flight = max(max_in_flight, 1)
+
+        self._last_scheduled: Dict[str, float] = {}
+        self._in_flight: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+        self._ticks = 0
+        self._scheduled = 0
+        self._completed = 0
+        self._unchanged = 0
+        self._deferred = 0
+        self._claimed_elsewhere = 0
+        self._shed = 0
+        self._errors = 0
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"연속 진단 스케줄링 중 오류: {str(e)}")
+
+    def tick(self) -> int:
+        """진단할 디바이스를 골라 진단 task 를 띄우고 띄운 수를 반환"""
+        self._ticks += 1
+        if self.app.state.model is None:
+            return 0
+
+        candidates = []
+        for device_uid, queue in self.devices.items():
+            if device_uid in self._in_flight:
+                continue
+            sequence, claimed = queue.sequence, queue.claimed_sequence
+            if claimed and claimed == sequence:
+                self._unchanged += 1
+                continue
+            if claimed and sequence - claimed < self.stride:
+                continue
+            if queue.qsize() < MIN_DIAGNOSIS_FRAMES:
+                continue
+            candidates.append((self._last_scheduled.get(device_uid, 0.0), device_uid, queue))
+
+        # 가장 오래전에 진단한(또는 한 번도 진단하지 않은) 디바이스부터
+        candidates.sort(key=lambda candidate: candidate[:2])
+        slots = max(self.max_in_flight - len(self._in_flight), 0)
+        scheduled = 0
+        for _, device_uid, queue in candidates[:slots]:
+            # 후보를 고른 뒤 다른 워커가 먼저 맡았으면 건너뜀
+            claim = queue.claim_diagnosis(self.stride)
+            if claim is None:
+                self._claimed_elsewhere += 1
+                continue
+            self._in_flight.add(device_uid)
+            self._last_scheduled[device_uid] = time.monotonic()
+            task = asyncio.create_task(self._diagnose(device_uid, queue, *claim))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            scheduled += 1
+
+        deferred = len(candidates) - min(len(candidates), slots)
+        if deferred:
+            self._deferred += deferred
+            CONTINUOUS_DIAGNOSIS_TOTAL.labels("deferred").inc(deferred)
+        self._scheduled += scheduled
+        return scheduled
+
+    async def _diagnose(self, device_uid: str, queue, sequence: int, previous: int):
+        # 실패한 윈도우도 stride 만큼 새 프레임이 들어올 때까지 다시 시도하지 않음 (claim 유지)
+        generation = self.app.state.diagnosis_cache.generation
+        try:
+            result = await run_diagnosis(self.app, device_uid, "continuous_diagnosis")
+        except DiagnosisError as e:
+            if e.code == 503:
+                # 추론 대기열이 가득 참, claim 을 되돌려 다음 주기에 다시 후보가 됨
+                queue.release_diagnosis(sequence, previous)
+                self._shed += 1
+                CONTINUOUS_DIAGNOSIS_TOTAL.labels("shed").inc()
+                return
+            self._errors += 1
+            CONTINUOUS_DIAGNOSIS_TOTAL.labels("error").inc()
+        else:
+            # 진단 중 모델이 바뀌었으면 (캐시와 마찬가지로) 이전 모델의 결과는 남기지 않음
+            if generation == self.app.state.diagnosis_cache.generation:
+                publish_latest(queue, sequence, result)
+            self._completed += 1
+            CONTINUOUS_DIAGNOSIS_TOTAL.labels("completed").inc()
+        finally:
+            self._in_flight.discard(device_uid)
+
+    def discard(self, device_uid: str):
+        self._last_scheduled.pop(device_uid, None)
+
+    def close(self):
+        for task in list(self._tasks):
+            task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "stride": self.stride,
+            "intervalMs": round(self.interval_seconds * 1000, 3),
+            "maxInFlight": self.max_in_flight,
+            "inFlight": len(self._in_flight),
+            "ticks": self._ticks,
+            "scheduled": self._scheduled,
+            "completed": self._completed,
+            "unchanged": self._unchanged,
+            "deferred": self._deferred,
+            "claimedElsewhere": self._claimed_elsewhere,
+            "shed": self._shed,
+            "errors": self._errors,
+        }
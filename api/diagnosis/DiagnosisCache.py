@@ -0,0 +1,68 @@
+from typing import Dict, NamedTuple, Optional
+import time
+
+import numpy as np
+
+
+class CachedDiagnosis(NamedTuple):
+    fingerprint: int
+    is_drowsiness_drive: bool
+    detection_time: str
+    created_at: float  # time.monotonic()
+    signatures: Optional[np.ndarray] = None  # 진단한 윈도우의 기준 썸네일 (진단 건너뛰기 사용 시)
+
+
+class DiagnosisCache:
+    """디바이스별 마지막 진단 결과, 프레임 윈도우가 그대로면 모델을 다시 돌리지 않고 재사용"""
+
+    def __init__(self):
+        self._entries: Dict[str, CachedDiagnosis] = {}
+        # clear() 마다 증가, 비우기 전에 시작한 추론 결과가 비운 뒤에 저장되지 않도록 확인
+        self.generation = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, device_uid: str, fingerprint: int) -> Optional[CachedDiagnosis]:
+        entry = self._entries.get(device_uid)
+        if entry is not None and entry.fingerprint == fingerprint:
+            self._hits += 1
+            return entry
+
+        self._misses += 1
+        return None
+
+    def latest(self, device_uid: str, max_age_seconds: float) -> Optional[CachedDiagnosis]:
+        """윈도우 비교 없이 max_age_seconds 이내에 만들어진 마지막 결과 반환 (연속 진단 모드의 조회용)"""
+        entry = self._entries.get(device_uid)
+        if entry is None or time.monotonic() - entry.created_at > max_age_seconds:
+            return None
+        return entry
+
+    def peek(self, device_uid: str) -> Optional[CachedDiagnosis]:
+        """적중/실패 집계 없이 마지막 결과 조회"""
+        return self._entries.get(device_uid)
+
+    def put(self, device_uid: str, fingerprint: int, is_drowsiness_drive: bool, detection_time: str,
+            signatures: Optional[np.ndarray] = None, generation: Optional[int] = None) -> CachedDiagnosis:
+        """generation 이 주어졌고 그 사이 clear() 되었으면 결과만 반환하고 저장하지 않음"""
+        entry = CachedDiagnosis(fingerprint, is_drowsiness_drive, detection_time, time.monotonic(), signatures)
+        if generation is None or generation == self.generation:
+            self._entries[device_uid] = entry
+        return entry
+
+    def discard(self, device_uid: str):
+        self._entries.pop(device_uid, None)
+
+    def clear(self):
+        """모든 디바이스의 결과 삭제 (모델 버전 교체 시)"""
+        self._entries.clear()
+        self.generation += 1
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hitRate": self._hits / lookups if lookups else 0.0,
+        }
@@ -1,106 +1,223 @@
 from fastapi import APIRouter, Query, Request
 from utils.helper import create_error_response, get_logger
 from utils.exception_handlers import ErrorForm
+from utils.bounded_executor import ExecutorSaturated
+from utils.metrics import Histogram
+from utils.tracing import span as trace_span
 from fastapi.responses import JSONResponse
-from api.frame.TimedQueue import TimedQueue
-from api.frame.frame_routes import uid_queues, get_or_create_queue
+from api.frame.TimedQueue import TimedQueue, FrameWindow, FRAME_SHAPE
+from api.frame.frame_routes import uid_queues, recorder
+from api.diagnosis.DiagnosisCache import DiagnosisCache, CachedDiagnosis
 
-import cv2
 import numpy as np
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import config
 
 router = APIRouter()
 logger = get_logger(__name__)
 
-@router.get("/api/diagnosis/drowiness")
-async def get_diagnosis_result(request: Request, device_uid: str = Query(..., alias="deviceUid")):
-    model = request.app.state.model
+FRAME_COUNT = 48
+MIN_DIAGNOSIS_FRAMES = 43
 
-    if model is None:
-        logger.error("error_code:500, model_not_loaded, get_diagnosis_result(모델 로드 확인), 모델이 로드되지 않음")
-        return create_error_response(500, "model_not_loaded", "get_diagnosis_result(모델 로드 확인)", "모델이 로드되지 않음")
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
 
-    try:
-        frames = await get_frames_from_queue(device_uid)
+DIAGNOSIS_STAGE_SECONDS = Histogram("diagnosis_stage_seconds", "진단 전처리 단계별 시간", ["stage"])
 
-        input_array = preprocess_input_data(frames)
-    except ErrorForm as e:
-        logger.error(f"error_code:{e.code}, {e.message}, get_diagnosis_result(큐에서 이미지 가져올 때), {e.detail_message}")
-        return create_error_response(e.code, e.message, "get_diagnosis_result(큐에서 이미지 가져올 때)", e.detail_message)
+class DiagnosisError(ErrorForm):
+    """진단 파이프라인 중 실패한 단계(method)를 함께 담는 에러"""
+    def __init__(self, code, message, method, detail_message):
+        super().__init__(code, message, detail_message)
+        self.method = method
 
-    try:
-        predicted_class  = model.predict(input_array)
-        logger.info(f"모델 결과 반환 값(확률): {predicted_class}")
 
-        predicted_class_int = (predicted_class.flatten()[0] > 0.5).astype(int)
-        logger.info(f"모델 결과 반환 값 (이진): {predicted_class_int}")
+@router.get("/api/diagnosis/drowiness")
+async def get_diagnosis_result(request: Request, device_uid: str = Query(..., alias="deviceUid")):
+    if request.app.state.continuous_diagnosis is not None:
+        # 연속 진단 모드: 서버가 이미 만들어 둔 최신 결과가 있으면 윈도우를 확인하지 않고 바로 반환
+        # (큐 카운터의 결과는 공유 메모리 저장소에서 다른 워커가 진단한 것도 포함, 없으면 이 워커의 캐시)
+        latest = read_latest(device_uid) or request.app.state.diagnosis_cache.latest(device_uid, config.CONTINUOUS_DIAGNOSIS_MAX_AGE_SECONDS)
+        if latest is not None:
+            record_diagnosis(device_uid, 200, latest.is_drowsiness_drive)
+            return create_diagnosis_response(latest.is_drowsiness_drive, latest.detection_time)
 
-        detection_time = datetime.now(timezone.utc).isoformat()
-    except Exception as e:
-        logger.error(f"error_code:500, prediction_error, get_diagnosis_result(모델 예측), {str(e)}")
-        return create_error_response(500, "prediction_error", "get_diagnosis_result(모델 예측)", f"모델 예측 중 오류 발생: {str(e)}")
+    try:
+        result = await run_diagnosis(request.app, device_uid, "get_diagnosis_result")
+    except DiagnosisError as e:
+        record_diagnosis(device_uid, e.code, None)
+        return create_error_response(e.code, e.message, e.method, e.detail_message)
+
+    record_diagnosis(device_uid, 200, result.is_drowsiness_drive)
+    with trace_span("response_serialize"):
+        return create_diagnosis_response(result.is_drowsiness_drive, result.detection_time)
+
+
+def publish_latest(queue: TimedQueue, sequence: int, result: CachedDiagnosis):
+    """연속 진단 결과를 큐 카운터에 기록, 공유 메모리 저장소면 모든 워커의 조회가 같은 결과를 읽음"""
+    detected_us = (datetime.fromisoformat(result.detection_time) - EPOCH) // timedelta(microseconds=1)
+    queue.publish_result(sequence, result.is_drowsiness_drive, detected_us)
+
+
+def read_latest(device_uid: str) -> Optional[CachedDiagnosis]:
+    queue = uid_queues.get(device_uid)
+    latest = queue.latest_result(config.CONTINUOUS_DIAGNOSIS_MAX_AGE_SECONDS) if queue is not None else None
+    if latest is None:
+        return None
+    is_drowsiness_drive, detected_us = latest
+    return CachedDiagnosis(0, is_drowsiness_drive, (EPOCH + timedelta(microseconds=detected_us)).isoformat(), 0.0)
+
+
+def record_diagnosis(device_uid: str, status: int, is_drowsiness_drive: Optional[bool]):
+    if recorder is not None:
+        recorder.record_diagnosis(device_uid, status, is_drowsiness_drive)
+
+
+async def run_diagnosis(app, device_uid: str, caller: str) -> CachedDiagnosis:
+    """캐시 확인 → 윈도우 변화 확인(사용 시) → 윈도우 스냅샷 → 배치 추론, 실패 시 DiagnosisError"""
+    if app.state.model is None:
+        if app.state.model_status.loading:
+            raise _log_error(DiagnosisError(503, "model_loading", f"{caller}(모델 로드 확인)", f"모델 로드 중 ({app.state.model_status.state})"))
+        raise _log_error(DiagnosisError(500, "model_not_loaded", f"{caller}(모델 로드 확인)", "모델이 로드되지 않음"))
+
+    cache: DiagnosisCache = app.state.diagnosis_cache
+    queue = uid_queues.get(device_uid)
+    if queue is not None:
+        cached = cache.get(device_uid, queue.fingerprint())
+        if cached is not None:
+            logger.info(f"라즈베리 파이 UID: {device_uid} - 윈도우 변경 없음, 캐시된 진단 결과 반환: {cached.is_drowsiness_drive}")
+            return cached
+
+    signatures = None
+    detector = app.state.change_detector
+    if detector is not None and queue is not None:
+        _, signatures = queue.window_signatures()
+        previous = cache.peek(device_uid)
+        if len(signatures) >= MIN_DIAGNOSIS_FRAMES and detector.reusable(previous, signatures):
+            logger.info(f"라즈베리 파이 UID: {device_uid} - 윈도우 변화 작음, 이전 진단 결과 재사용: {previous.is_drowsiness_drive}")
+            return previous
+
+    generation = cache.generation
+    executor = app.state.inference_executor
+    try:
+        with executor.reserve():
+            try:
+                window = await get_frames_from_queue(device_uid)
+            except ErrorForm as e:
+                raise _log_error(DiagnosisError(e.code, e.message, f"{caller}(큐에서 이미지 가져올 때)", e.detail_message))
+
+            try:
+                predicted_class = await app.state.batch_scheduler.submit(window.frame_indices, window.frames)
+                logger.info(f"모델 결과 반환 값(확률): {predicted_class}")
+
+                predicted_class_int = (predicted_class.flatten()[0] > 0.5).astype(int)
+                logger.info(f"모델 결과 반환 값 (이진): {predicted_class_int}")
+
+                detection_time = datetime.now(timezone.utc).isoformat()
+            except ErrorForm as e:
+                raise _log_error(DiagnosisError(e.code, e.message, f"{caller}(전처리)", e.detail_message))
+            except Exception as e:
+                raise _log_error(DiagnosisError(500, "prediction_error", f"{caller}(모델 예측)", f"모델 예측 중 오류 발생: {str(e)}"))
+    except ExecutorSaturated as e:
+        raise _log_error(DiagnosisError(503, "inference_busy", f"{caller}(추론 대기열)", f"진단 요청이 너무 많음: {str(e)}"))
 
     predicted_result = True if predicted_class_int == 0 else False
     logger.info(f"라즈베리 파이 UID: {device_uid} - 진단 결과: {predicted_result}")
+    reference = detector.reference(signatures) if signatures is not None and len(signatures) else None
+    return cache.put(device_uid, window.fingerprint, predicted_result, detection_time, reference, generation)
+
+
+def _log_error(e: DiagnosisError) -> DiagnosisError:
+    log = logger.warning if e.code == 503 else logger.error
+    log(f"error_code:{e.code}, {e.message}, {e.method}, {e.detail_message}")
+    return e
+
+
+def create_diagnosis_response(is_drowsiness_drive: bool, detection_time: str):
     return JSONResponse(
         status_code=200,
         content={
             "status": 200,
             "success": True,
-            "isDrowsinessDrive": predicted_result,
+            "isDrowsinessDrive": is_drowsiness_drive,
             "detectionTime": detection_time
         }
     )
 
 
-async def get_frames_from_queue(device_uid: str):
-    if device_uid not in uid_queues:
-        raise ErrorForm(404, "queue_not_found", "해당 라즈베리 파이 UID에 대한 큐가 없습니다.")
-
-    queue: TimedQueue = get_or_create_queue(device_uid)
-    frames = await queue.get_all()
-
-    if not frames:
-        raise ErrorForm(404, "no_frames", "큐에 저장된 이미지 프레임이 없습니다.")
+@router.get("/api/diagnosis/stats")
+async def get_diagnosis_stats(request: Request):
+    continuous = request.app.state.continuous_diagnosis
+    detector = request.app.state.change_detector
+    return JSONResponse(
+        status_code=200,
+        content={
+            "status": 200,
+            "success": True,
+            "scheduler": request.app.state.batch_scheduler.stats(),
+            "executor": request.app.state.inference_executor.stats(),
+            "cache": request.app.state.diagnosis_cache.stats(),
+            "backend": _describe_backend(request.app.state.model),
+            "continuous": continuous.stats() if continuous is not None else None,
+            "skip": detector.stats() if detector is not None else None
+        }
+    )
 
-    if queue.qsize() < 43:
-        raise ErrorForm(400, "insufficient_frames", "진단에 쓰일 이미지 프레임 수가 충분하지 않습니다.")
 
-    frames.sort(key=lambda x: x[0])
-    return [img for _, img in frames]
+def _describe_backend(model) -> Optional[dict]:
+    if model is None:
+        return None
+    describe = getattr(model, "describe", None)
+    return describe() if describe else {"backend": type(model).__name__}
 
 
-def preprocess_input_data(frames: list) -> np.ndarray:
-    try:
-        frame_count = 48
+async def get_frames_from_queue(device_uid: str) -> FrameWindow:
+    queue: TimedQueue = uid_queues.get(device_uid)
+    if queue is None:
+        raise ErrorForm(404, "queue_not_found", "해당 라즈베리 파이 UID에 대한 큐가 없습니다.")
 
-        interpolated_frames = []
-        for i in range(len(frames) - 1):
-            current_frame = np.array(frames[i])
-            next_frame = np.array(frames[i + 1])
-            interpolated_frames.append(current_frame)
+    with DIAGNOSIS_STAGE_SECONDS.labels("queue_read").time(), trace_span("queue_read"):
+        window = await queue.snapshot()
 
-            current_idx = i
-            next_idx = i + 1
+    if len(window.frames) == 0:
+        raise ErrorForm(404, "no_frames", "큐에 저장된 이미지 프레임이 없습니다.")
 
-            if next_idx - current_idx > 1:
-                for missing_idx in range(current_idx + 1, next_idx):
-                    alpha = (missing_idx - current_idx) / (next_idx - current_idx)
-                    interpolated_frame = cv2.addWeighted(current_frame, 1 - alpha, next_frame, alpha, 0)
-                    interpolated_frames.append(interpolated_frame)
+    if len(window.frames) < MIN_DIAGNOSIS_FRAMES:
+        raise ErrorForm(400, "insufficient_frames", "진단에 쓰일 이미지 프레임 수가 충분하지 않습니다.")
 
-        interpolated_frames.append(np.array(frames[-1]))
+    return window
 
-        if len(interpolated_frames) < frame_count:
-            padding_frames = [np.zeros((145, 145, 3))] * (frame_count - len(interpolated_frames))
-            interpolated_frames.extend(padding_frames)
-        else:
-            interpolated_frames = interpolated_frames[:frame_count]
 
-        image_array = [cv2.resize(frame, (145, 145)) / 255.0 for frame in interpolated_frames]
-        input_array = np.array(image_array)
-        input_array = np.expand_dims(input_array, axis=0)  # (1, 48, 145, 145, 3)
+def preprocess_input_data(frame_indices: np.ndarray, frames: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """frameIdx 기준으로 빠진 프레임을 앞뒤 프레임의 선형 보간으로 채워 (1, 48, 145, 145, 3) float32 생성
 
-        return input_array
+    out 이 주어지면 새로 할당하지 않고 그 버퍼에 직접 채운다.
+    """
+    try:
+        frame_indices = np.asarray(frame_indices, dtype=np.int64)
+        if out is None:
+            out = np.empty((1, FRAME_COUNT, *FRAME_SHAPE), dtype=np.float32)
+
+        with DIAGNOSIS_STAGE_SECONDS.labels("interpolate_index").time(), trace_span("preprocess.interpolate_index"):
+            # 가장 최근 프레임으로 끝나는 48개 frameIdx 구간, 마지막 프레임 이후는 마지막 프레임으로 채움
+            start = max(frame_indices[0], frame_indices[-1] - FRAME_COUNT + 1)
+            targets = start + np.arange(FRAME_COUNT)
+
+            left = np.searchsorted(frame_indices, targets, side="right") - 1
+            right = np.minimum(left + 1, len(frame_indices) - 1)
+            span = frame_indices[right] - frame_indices[left]
+            alpha = np.divide(targets - frame_indices[left], span, out=np.zeros(FRAME_COUNT), where=span > 0)
+            alpha = np.clip(alpha, 0.0, 1.0).astype(np.float32)
+
+        with DIAGNOSIS_STAGE_SECONDS.labels("blend_normalize").time(), trace_span("preprocess.blend_normalize"):
+            scale = np.float32(1 / 255.0)
+            weights = ((1 - alpha) * scale)[:, None, None, None]
+            np.multiply(frames[left], weights, out=out[0])
+
+            blended = np.flatnonzero(alpha > 0)
+            if blended.size:
+                weights = (alpha[blended] * scale)[:, None, None, None]
+                out[0, blended] += frames[right[blended]] * weights
+
+        return out  # (1, 48, 145, 145, 3)
     except Exception as e:
         raise ErrorForm(422, "invalid_data", f"입력 데이터를 numpy 배열로 변환 중 오류: {str(e)}")
@@ -0,0 +1,119 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Tuple
+import math
+import time
+
+from utils.bounded_executor import BoundedExecutor
+from utils.exception_handlers import ErrorForm
+from utils.metrics import Counter
+
+FRAME_ADMISSION_TOTAL = Counter(
+    "frame_admission_total",
+    "프레임 입장 제어 결과 (admitted, dropped, rate_limited, too_large, decode_budget)",
+    ["outcome"],
+)
+
+
+def base64_decoded_size(base64_str: str) -> int:
+    """디코딩하지 않고 base64 문자열(data URL 접두어 포함 가능)이 디코딩될 바이트 수 추정"""
+    comma = base64_str.find(",")
+    return (len(base64_str) - comma - 1) * 3 // 4
+
+
+class AdmissionController:
+    """프레임 저장 앞단의 입장 제어
+
+    1. 크기 제한: 디코딩 전에 max_frame_bytes 를 넘는 프레임 거절 (413 frame_too_large)
+    2. 디바이스별 token bucket: 초당 device_rate 프레임, 최대 device_burst 까지 몰아서 허용 (429 rate_limited)
+    3. 전역 디코딩 예산: 동시에 디코딩 중인 바이트 합이 decode_budget_bytes 를 넘으면 거절 (503 decode_budget)
+    4. 적응형 드롭: 디코딩 실행기가 drop_start 이상 차 있으면 frameIdx 기준 k 프레임 중 하나만 저장
+       (k 는 대기열이 찰수록 max_keep_every 까지 증가, 빠진 프레임은 진단 전처리에서 보간됨)
+    """
+
+    def __init__(self, decode_executor: BoundedExecutor, device_rate: float = 30.0, device_burst: float = 60,
+                 max_frame_bytes: int = 1 << 20, decode_budget_bytes: int = 64 << 20,
+                 drop_start: float = 0.5, max_keep_every: int = 4, max_buckets: int = 2000):
+        self.decode_executor = decode_executor
+        self.device_rate = device_rate
+        self.device_burst = device_burst
+        self.max_frame_bytes = max_frame_bytes
+        self.decode_budget_bytes = decode_budget_bytes
+        self.drop_start = drop_start
+        self.max_keep_every = max(max_keep_every, 1)
+        self.max_buckets = max_buckets
+
+        # deviceUid → (남은 토큰, 마지막 갱신 시각), 오래 안 쓴 bucket 부터 정리 (정리되면 가득 찬 상태로 다시 시작)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._decoding_bytes = 0
+
+        self._counts = {outcome: 0 for outcome in ("admitted", "dropped", "rate_limited", "too_large", "decode_budget")}
+
+    def _count(self, outcome: str, amount: int = 1):
+        self._counts[outcome] += amount
+        FRAME_ADMISSION_TOTAL.labels(outcome).inc(amount)
+
+    def check_size(self, nbytes: int):
+        if nbytes > self.max_frame_bytes:
+            self._count("too_large")
+            raise ErrorForm(413, "frame_too_large", f"프레임 크기 초과: {nbytes} bytes (최대 {self.max_frame_bytes} bytes)")
+
+    def acquire(self, device_uid: str, frames: int = 1):
+        """디바이스 token bucket 에서 frames 개 차감, 부족하면 429"""
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(device_uid, (self.device_burst, now))
+        tokens = min(self.device_burst, tokens + (now - updated) * self.device_rate)
+
+        if tokens < frames:
+            self._buckets[device_uid] = (tokens, now)
+            self._count("rate_limited", frames)
+            retry_after = (frames - tokens) / self.device_rate if self.device_rate > 0 else math.inf
+            raise ErrorForm(429, "rate_limited", f"디바이스 프레임 전송 속도 초과: {device_uid} (약 {retry_after:.2f}초 후 재시도)")
+
+        self._buckets[device_uid] = (tokens - frames, now)
+        while len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+
+    def keep_every(self) -> int:
+        """디코딩 대기열 사용률에 따라 몇 프레임 중 하나를 저장할지 (1 이면 드롭 없음)"""
+        executor = self.decode_executor
+        load = executor.stats()["reserved"] / executor.max_pending
+        if load < self.drop_start or self.max_keep_every == 1:
+            return 1
+        pressure = (load - self.drop_start) / max(1 - self.drop_start, 1e-9)
+        return 1 + min(math.ceil(pressure * (self.max_keep_every - 1)), self.max_keep_every - 1)
+
+    def should_drop(self, frame_idx: int) -> bool:
+        keep_every = self.keep_every()
+        if keep_every > 1 and frame_idx % keep_every != 0:
+            self._count("dropped")
+            return True
+        self._count("admitted")
+        return False
+
+    @contextmanager
+    def decode_budget(self, nbytes: int):
+        """디코딩하는 동안 nbytes 만큼 전역 예산 점유, 진행 중인 디코딩이 없으면 예산과 무관하게 허용"""
+        if self._decoding_bytes and self._decoding_bytes + nbytes > self.decode_budget_bytes:
+            self._count("decode_budget")
+            raise ErrorForm(503, "decode_budget", f"디코딩 중인 프레임 크기 합이 한도 초과 (최대 {self.decode_budget_bytes} bytes)")
+
+        self._decoding_bytes += nbytes
+        try:
+            yield
+        finally:
+            self._decoding_bytes -= nbytes
+
+    def discard(self, device_uid: str):
+        self._buckets.pop(device_uid, None)
+
+    def stats(self) -> dict:
+        return {
+            "deviceRate": self.device_rate,
+            "deviceBurst": self.device_burst,
+            "maxFrameBytes": self.max_frame_bytes,
+            "decodeBudgetBytes": self.decode_budget_bytes,
+            "decodingBytes": self._decoding_bytes,
+            "keepEvery": self.keep_every(),
+            **self._counts,
+        }
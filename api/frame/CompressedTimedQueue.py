@@ -0,0 +1,133 @@
+from typing import Callable, List, Optional
+import asyncio
+import time
+
+import numpy as np
+
+from utils.bounded_executor import BoundedExecutor, ExecutorSaturated
+from utils.exception_handlers import ErrorForm
+from utils.helper import get_logger
+from .TimedQueue import (TimedQueue, QueueBuffers, FrameWindow, Frame, SignedFrame, FRAME_SHAPE, SIGNATURE_SHAPE,
+                         EMPTY_STAMP, COUNTER_FIELDS, image_signature)
+
+logger = get_logger(__name__)
+
+
+class CompressedTimedQueue(TimedQueue):
+    """압축된 이미지 바이트를 그대로 보관하고 진단 시점에 윈도우 전체를 한 번에 디코딩하는 TimedQueue (lazy 모드)
+
+    진단 전에 만료되는 프레임은 디코딩하지 않으므로 진단 요청이 드문 디바이스의 CPU 와 메모리를 아낀다.
+    snapshot() 은 윈도우 프레임을 실행기 워커 수만큼 나눠 병렬로 디코딩한다.
+    디코딩에 실패한 프레임은 윈도우에서 빠지고(진단 전처리에서 보간됨) decode_failed_count 에 집계된다.
+    """
+
+    def __init__(self, decoder: Callable[[bytes], np.ndarray], executor: Optional[BoundedExecutor] = None,
+                 maxsize=48, window_seconds=2, signatures: bool = False):
+        buffers = QueueBuffers(
+            frames=np.empty((0, *FRAME_SHAPE), dtype=np.uint8),
+            frame_indices=np.full(maxsize, -1, dtype=np.int64),
+            timestamps=np.full(maxsize, EMPTY_STAMP, dtype=np.int64),
+            sequences=np.zeros(maxsize, dtype=np.int64),
+            counters=[0] * COUNTER_FIELDS,
+            signatures=np.zeros((maxsize, *SIGNATURE_SHAPE) if signatures else (0, *SIGNATURE_SHAPE), dtype=np.uint8),
+        )
+        super().__init__(maxsize=maxsize, window_seconds=window_seconds, buffers=buffers, signatures=signatures)
+        self.decoder = decoder
+        self.executor = executor
+
+        # 슬롯별 압축 바이트 (이미 디코딩된 배열이 들어오면 배열 그대로)
+        self._payloads: List[Optional[object]] = [None] * maxsize
+        self._payload_bytes = 0
+        self._decoded = 0
+        self._decode_failed = 0
+        self._decode_seconds = 0.0
+
+    @property
+    def decode_failed_count(self) -> int:
+        return self._decode_failed
+
+    def _prepare(self, image: Frame):
+        signature = None
+        if isinstance(image, SignedFrame):
+            image, signature = image
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            if signature is None and self.signatures:
+                signature = image_signature(image)
+            return bytes(image), signature
+        return super()._prepare(image if signature is None else SignedFrame(image, signature))
+
+    def _store(self, slot: int, frame):
+        self._release((slot,))
+        self._payloads[slot] = frame
+        self._payload_bytes += frame.nbytes if isinstance(frame, np.ndarray) else len(frame)
+
+    def _export(self, slots: np.ndarray) -> list:
+        return [self._payloads[slot] for slot in slots]
+
+    def _release(self, slots):
+        for slot in slots:
+            payload = self._payloads[slot]
+            if payload is not None:
+                self._payload_bytes -= payload.nbytes if isinstance(payload, np.ndarray) else len(payload)
+                self._payloads[slot] = None
+
+    def _read(self, slots: np.ndarray) -> np.ndarray:
+        frames = np.empty((len(slots), *FRAME_SHAPE), dtype=np.uint8)
+        failed = self._decode_into(frames, [self._payloads[slot] for slot in slots], range(len(slots)))
+        if failed:
+            raise ErrorForm(422, "invalid_image", f"저장된 프레임 디코딩 실패: {len(failed)}개")
+        return frames
+
+    def _decode_into(self, out: np.ndarray, payloads: list, positions) -> List[int]:
+        """payloads[position] 을 out[position] 에 디코딩, 실패한 position 목록 반환 (실행기 스레드에서도 호출됨)"""
+        failed = []
+        for position in positions:
+            payload = payloads[position]
+            try:
+                out[position] = payload if isinstance(payload, np.ndarray) else self.decoder(payload)
+            except ErrorForm:
+                failed.append(position)
+        return failed
+
+    async def snapshot(self) -> FrameWindow:
+        with self._exclusive():
+            self._expire_window(time.monotonic_ns())
+            slots = self._window_slots()
+            frame_indices = self._frame_indices[slots]
+            payloads = [self._payloads[slot] for slot in slots]
+            fingerprint = self._fingerprint(slots)
+
+        frames = np.empty((len(payloads), *FRAME_SHAPE), dtype=np.uint8)
+        start = time.perf_counter()
+        if self.executor is None or len(payloads) <= 1:
+            failed = self._decode_into(frames, payloads, range(len(payloads)))
+        else:
+            chunks = np.array_split(np.arange(len(payloads)), min(self.executor.max_workers, len(payloads)))
+            try:
+                with self.executor.reserve():
+                    results = await asyncio.gather(*(self.executor.run(self._decode_into, frames, payloads, chunk.tolist())
+                                                     for chunk in chunks))
+            except ExecutorSaturated as e:
+                raise ErrorForm(503, "decode_busy", f"이미지 디코딩 요청이 너무 많음: {str(e)}")
+            failed = [position for result in results for position in result]
+        self._decode_seconds += time.perf_counter() - start
+        self._decoded += len(payloads) - len(failed)
+
+        if failed:
+            self._decode_failed += len(failed)
+            logger.warning(f"저장된 프레임 {len(failed)}개 디코딩 실패, 윈도우에서 제외")
+            keep = np.ones(len(payloads), dtype=bool)
+            keep[failed] = False
+            frame_indices, frames = frame_indices[keep], frames[keep]
+        return FrameWindow(frame_indices, frames, fingerprint)
+
+    @property
+    def nbytes(self) -> int:
+        return super().nbytes + self._payload_bytes + len(self._payloads) * 8
+
+    def decode_stats(self) -> dict:
+        return {
+            "decoded": self._decoded,
+            "decodeFailed": self._decode_failed,
+            "decodeSeconds": round(self._decode_seconds, 6),
+        }
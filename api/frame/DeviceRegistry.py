@@ -0,0 +1,132 @@
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+import asyncio
+import time
+
+from utils.exception_handlers import ErrorForm
+from utils.helper import get_logger
+from .TimedQueue import TimedQueue
+
+logger = get_logger(__name__)
+
+
+class DeviceRegistry:
+    """deviceUid → TimedQueue 저장소, 최대 디바이스 수 제한과 유휴 디바이스 정리(LRU) 담당
+
+    dict 처럼 `uid in registry`, `registry[uid]`, `registry.get(uid)` 로 조회할 수 있다.
+    """
+
+    def __init__(self, max_devices: int = 1000, idle_timeout_seconds: float = 300,
+                 queue_factory: Callable[[], TimedQueue] = TimedQueue):
+        self.max_devices = max_devices
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.queue_factory = queue_factory
+
+        # 가장 오래 사용되지 않은 디바이스가 앞쪽, 값은 (큐, 마지막 사용 시각)
+        self._devices: "OrderedDict[str, Tuple[TimedQueue, float]]" = OrderedDict()
+        self._eviction_listeners: List[Callable[[str], None]] = []
+
+        self._created = 0
+        self._evicted = 0
+        self._rejected = 0
+
+    def __contains__(self, device_uid: str) -> bool:
+        return device_uid in self._devices
+
+    def __getitem__(self, device_uid: str) -> TimedQueue:
+        return self._devices[device_uid][0]
+
+    def __len__(self) -> int:
+        return len(self._devices)
+
+    def items(self) -> List[Tuple[str, TimedQueue]]:
+        return [(device_uid, queue) for device_uid, (queue, _) in self._devices.items()]
+
+    def get(self, device_uid: str, default: Optional[TimedQueue] = None) -> Optional[TimedQueue]:
+        entry = self._devices.get(device_uid)
+        if entry is None:
+            return default
+        self._touch(device_uid, entry[0])
+        return entry[0]
+
+    def get_or_create(self, device_uid: str) -> TimedQueue:
+        queue = self.get(device_uid)
+        if queue is not None:
+            return queue
+
+        if len(self._devices) >= self.max_devices and not self._evict_lru_empty():
+            self._rejected += 1
+            raise ErrorForm(503, "device_limit", f"등록 가능한 라즈베리 파이 수 초과 (최대 {self.max_devices}대): {device_uid}")
+
+        queue = self.queue_factory()
+        self._devices[device_uid] = (queue, time.monotonic())
+        self._created += 1
+        return queue
+
+    def _touch(self, device_uid: str, queue: TimedQueue):
+        self._devices[device_uid] = (queue, time.monotonic())
+        self._devices.move_to_end(device_uid)
+
+    def _evict_lru_empty(self) -> bool:
+        # 가득 찼을 때는 윈도우에 프레임이 남아 있지 않은 디바이스 중 가장 오래된 것만 내보냄
+        for device_uid, (queue, _) in self._devices.items():
+            if queue.qsize() == 0:
+                self.evict(device_uid)
+                return True
+        return False
+
+    def evict(self, device_uid: str):
+        if self._devices.pop(device_uid, None) is None:
+            return
+        self._evicted += 1
+        for listener in self._eviction_listeners:
+            listener(device_uid)
+
+    def add_eviction_listener(self, listener: Callable[[str], None]):
+        """디바이스가 정리될 때 함께 정리해야 할 디바이스별 상태(진단 캐시 등) 등록"""
+        self._eviction_listeners.append(listener)
+
+    def sweep(self) -> int:
+        """idle_timeout_seconds 동안 사용되지 않은 디바이스 정리, 정리한 수 반환"""
+        deadline = time.monotonic() - self.idle_timeout_seconds
+        idle = []
+        for device_uid, (_, last_seen) in self._devices.items():
+            if last_seen > deadline:
+                break
+            idle.append(device_uid)
+
+        for device_uid in idle:
+            self.evict(device_uid)
+        if idle:
+            logger.info(f"유휴 라즈베리 파이 {len(idle)}대 정리, 남은 디바이스: {len(self._devices)}")
+        return len(idle)
+
+    async def run_sweeper(self, interval_seconds: float):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"유휴 디바이스 정리 중 오류: {str(e)}")
+
+    def stats(self, include_devices: bool = False) -> dict:
+        now = time.monotonic()
+        content = {
+            "maxDevices": self.max_devices,
+            "idleTimeoutSeconds": self.idle_timeout_seconds,
+            "active": len(self._devices),
+            "created": self._created,
+            "evicted": self._evicted,
+            "rejected": self._rejected,
+            "memoryBytes": sum(queue.nbytes for queue, _ in self._devices.values()),
+        }
+        if include_devices:
+            devices: Dict[str, dict] = {}
+            for device_uid, (queue, last_seen) in self._devices.items():
+                devices[device_uid] = {
+                    "frames": queue.qsize(),
+                    "memoryBytes": queue.nbytes,
+                    "idleSeconds": round(now - last_seen, 3),
+                }
+            content["devices"] = devices
+        return content
@@ -0,0 +1,355 @@
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable, Dict, List, Optional, Tuple
+import asyncio
+import errno
+import fcntl
+import math
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from utils.exception_handlers import ErrorForm
+from utils.helper import get_logger
+from utils.tracing import span
+from .TimedQueue import TimedQueue, QueueBuffers, FRAME_SHAPE, GENERATION, COUNTER_FIELDS, EMPTY_STAMP, SIGNATURE_SHAPE
+
+logger = get_logger(__name__)
+
+MAGIC = 0x41495346  # "AISF"
+LAYOUT_VERSION = 8
+UID_BYTES = 64
+
+# 헤더 int64 배열 인덱스
+H_MAGIC, H_VERSION, H_MAX_DEVICES, H_MAXSIZE, H_FRAME_SIZE, H_GENERATION, H_CREATED, H_EVICTED, H_REJECTED = range(9)
+HEADER_LENGTH = 16
+
+
+def _layout(max_devices: int, maxsize: int) -> Tuple[Dict[str, Tuple[int, np.dtype, tuple]], int]:
+    fields = [
+        ("header", np.int64, (HEADER_LENGTH,)),
+        ("uids", f"S{UID_BYTES}", (max_devices,)),
+        ("last_seen", np.float64, (max_devices,)),
+        ("counters", np.int64, (max_devices, COUNTER_FIELDS)),
+        ("frame_indices", np.int64, (max_devices, maxsize)),
+        ("timestamps", np.int64, (max_devices, maxsize)),
+        ("sequences", np.int64, (max_devices, maxsize)),
+        ("frames", np.uint8, (max_devices, maxsize, *FRAME_SHAPE)),
+        ("signatures", np.uint8, (max_devices, maxsize, *SIGNATURE_SHAPE)),
+    ]
+    layout = {}
+    offset = 0
+    for name, dtype, shape in fields:
+        offset = (offset + 63) // 64 * 64
+        dtype = np.dtype(dtype)
+        layout[name] = (offset, dtype, shape)
+        offset += dtype.itemsize * math.prod(shape)
+    return layout, offset
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    shm = shared_memory.SharedMemory(name=name)
+    # 붙기만 한 워커가 종료될 때 resource_tracker 가 세그먼트를 지우지 않도록 등록 해제
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm
+
+
+class SharedTimedQueue(TimedQueue):
+    """공유 메모리 위 디바이스 슬롯 하나에 대한 TimedQueue 뷰, 버퍼 접근은 프로세스 간 잠금으로 보호"""
+
+    def __init__(self, store: "SharedFrameStore", slot: int, buffers: QueueBuffers):
+        super().__init__(maxsize=store.maxsize, window_seconds=store.window_seconds, buffers=buffers,
+                         signatures=store.signatures)
+        self.store = store
+        self.slot = slot
+        self.generation = int(buffers.counters[GENERATION])
+
+    def _exclusive(self):
+        return self.store._locked(self.slot)
+
+
+class SharedFrameStore:
+    """여러 uvicorn 워커가 함께 쓰는 공유 메모리 프레임 저장소
+
+    디바이스마다 고정 크기 슬롯(링 버퍼 + 메타데이터)을 두고 deviceUid → 슬롯 색인도 공유 메모리에 둔다.
+    잠금은 잠금 파일의 바이트 범위 잠금(fcntl.lockf)으로, 슬롯마다 1바이트 + 색인용 1바이트를 쓴다.
+    이벤트 루프를 멈추지 않도록 비차단 잠금을 짧게 재시도하고, lock_timeout_seconds 안에 못 잡으면 503 으로 거절한다.
+    DeviceRegistry 와 같은 인터페이스를 제공한다.
+    """
+
+    def __init__(self, name: str, max_devices: int = 256, maxsize: int = 48, window_seconds: float = 2,
+                 idle_timeout_seconds: float = 300, signatures: bool = False, lock_timeout_seconds: float = 0.5):
+        self.name = name
+        self.max_devices = max_devices
+        self.maxsize = maxsize
+        self.window_seconds = window_seconds
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.signatures = signatures
+        self.lock_timeout_seconds = lock_timeout_seconds
+
+        self._layout, size = _layout(max_devices, maxsize)
+        self._lock_fd = os.open(os.path.join(tempfile.gettempdir(), f"{name}.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+        self._table_lock_offset = max_devices
+
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            created = True
+        except FileExistsError:
+            self._shm = _attach_shared_memory(name)
+            created = False
+
+        for field, (offset, dtype, shape) in self._layout.items():
+            setattr(self, f"_{field}", np.ndarray(shape, dtype=dtype, buffer=self._shm.buf, offset=offset))
+
+        if created:
+            self._initialize()
+        else:
+            self._wait_initialized()
+
+        self._views: Dict[str, SharedTimedQueue] = {}
+        self._eviction_listeners: List[Callable[[str], None]] = []
+
+    def _initialize(self):
+        with self._locked(self._table_lock_offset):
+            self._frame_indices.fill(-1)
+            self._timestamps.fill(EMPTY_STAMP)
+            self._header[H_VERSION] = LAYOUT_VERSION
+            self._header[H_MAX_DEVICES] = self.max_devices
+            self._header[H_MAXSIZE] = self.maxsize
+            self._header[H_FRAME_SIZE] = FRAME_SHAPE[0]
+            # 초기화가 끝났음을 다른 워커에게 알리기 위해 MAGIC 은 마지막에 기록
+            self._header[H_MAGIC] = MAGIC
+        logger.info(f"공유 메모리 프레임 저장소 생성: {self.name} ({self._shm.size / 2**20:.1f} MB)")
+
+    def _wait_initialized(self, timeout_seconds: float = 10):
+        deadline = time.monotonic() + timeout_seconds
+        while self._header[H_MAGIC] != MAGIC:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"공유 메모리 프레임 저장소 초기화 대기 시간 초과: {self.name}")
+            time.sleep(0.01)
+
+        expected = (LAYOUT_VERSION, self.max_devices, self.maxsize, FRAME_SHAPE[0])
+        actual = tuple(int(self._header[i]) for i in (H_VERSION, H_MAX_DEVICES, H_MAXSIZE, H_FRAME_SIZE))
+        if actual != expected:
+            raise RuntimeError(f"공유 메모리 프레임 저장소 구성 불일치: {self.name} {actual} != {expected}")
+
+    @contextmanager
+    def _locked(self, offset: int):
+        with span("queue_lock_wait"):
+            self._acquire(offset)
+        try:
+            yield
+        finally:
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_UN, 1, offset)
+
+    def _acquire(self, offset: int):
+        """비차단 잠금을 간격을 늘려 가며 재시도, lock_timeout_seconds 를 넘기면 ErrorForm(503)"""
+        delay, deadline = 0.0001, None
+        while True:
+            try:
+                fcntl.lockf(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, offset)
+                return
+            except OSError as e:
+                if e.errno not in (errno.EACCES, errno.EAGAIN):
+                    raise
+            now = time.monotonic()
+            if deadline is None:
+                deadline = now + self.lock_timeout_seconds
+            elif now >= deadline:
+                raise ErrorForm(503, "frame_store_busy",
+                                f"공유 프레임 저장소 잠금 대기 시간 초과 ({self.lock_timeout_seconds}초): {self.name}")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.005)
+
+    @staticmethod
+    def _encode_uid(device_uid: str) -> Optional[bytes]:
+        encoded = device_uid.encode("utf-8")
+        if not encoded or len(encoded) > UID_BYTES or encoded.endswith(b"\x00"):
+            return None
+        return encoded
+
+    def _find_slot(self, encoded: bytes) -> Optional[int]:
+        slots = np.flatnonzero(self._uids == encoded)
+        return int(slots[0]) if slots.size else None
+
+    def _buffers(self, slot: int) -> QueueBuffers:
+        return QueueBuffers(
+            frames=self._frames[slot],
+            frame_indices=self._frame_indices[slot],
+            timestamps=self._timestamps[slot],
+            sequences=self._sequences[slot],
+            counters=self._counters[slot],
+            signatures=self._signatures[slot],
+        )
+
+    def _view(self, device_uid: str, slot: int) -> SharedTimedQueue:
+        view = self._views.get(device_uid)
+        if view is None or view.slot != slot or view.generation != self._counters[slot, GENERATION]:
+            view = SharedTimedQueue(self, slot, self._buffers(slot))
+            self._views[device_uid] = view
+        return view
+
+    def __contains__(self, device_uid: str) -> bool:
+        encoded = self._encode_uid(device_uid)
+        return encoded is not None and self._find_slot(encoded) is not None
+
+    def __getitem__(self, device_uid: str) -> SharedTimedQueue:
+        queue = self.get(device_uid)
+        if queue is None:
+            raise KeyError(device_uid)
+        return queue
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._uids != b""))
+
+    def items(self) -> List[Tuple[str, SharedTimedQueue]]:
+        return [(self._uids[slot].decode("utf-8"), self._view(self._uids[slot].decode("utf-8"), int(slot)))
+                for slot in np.flatnonzero(self._uids != b"")]
+
+    def get(self, device_uid: str, default: Optional[SharedTimedQueue] = None) -> Optional[SharedTimedQueue]:
+        encoded = self._encode_uid(device_uid)
+        if encoded is None:
+            return default
+
+        # 다른 워커가 슬롯을 정리/재할당했을 수 있으므로 매번 공유 색인에서 확인
+        view = self._views.get(device_uid)
+        if view is not None and self._uids[view.slot] == encoded and view.generation == self._counters[view.slot, GENERATION]:
+            slot = view.slot
+        else:
+            slot = self._find_slot(encoded)
+            if slot is None:
+                self._views.pop(device_uid, None)
+                return default
+
+        self._last_seen[slot] = time.monotonic()
+        return self._view(device_uid, slot)
+
+    def get_or_create(self, device_uid: str) -> SharedTimedQueue:
+        queue = self.get(device_uid)
+        if queue is not None:
+            return queue
+
+        encoded = self._encode_uid(device_uid)
+        if encoded is None:
+            raise ErrorForm(422, "invalid_device_uid", f"deviceUid 는 1~{UID_BYTES}바이트(UTF-8)여야 합니다.")
+
+        with self._locked(self._table_lock_offset):
+            slot = self._find_slot(encoded)
+            if slot is None:
+                slot = self._allocate_slot(device_uid)
+                with self._locked(slot):
+                    self._buffers(slot).reset()
+                    self._header[H_GENERATION] += 1
+                    self._counters[slot, GENERATION] = self._header[H_GENERATION]
+                self._last_seen[slot] = time.monotonic()
+                self._uids[slot] = encoded
+                self._header[H_CREATED] += 1
+
+        return self.get(device_uid)
+
+    def _allocate_slot(self, device_uid: str) -> int:
+        free = np.flatnonzero(self._uids == b"")
+        if free.size:
+            return int(free[0])
+
+        # 가득 찼을 때는 윈도우에 프레임이 남아 있지 않은 디바이스 중 가장 오래된 것만 내보냄
+        cutoff = time.monotonic_ns() - int(self.window_seconds * 1_000_000_000)
+        for slot in np.argsort(self._last_seen):
+            with self._locked(int(slot)):
+                has_frames = bool(np.any(self._timestamps[slot] > cutoff))
+            if not has_frames:
+                self._evict_slot(int(slot))
+                return int(slot)
+
+        self._header[H_REJECTED] += 1
+        raise ErrorForm(503, "device_limit", f"등록 가능한 라즈베리 파이 수 초과 (최대 {self.max_devices}대): {device_uid}")
+
+    def _evict_slot(self, slot: int):
+        device_uid = self._uids[slot].decode("utf-8")
+        self._uids[slot] = b""
+        self._header[H_EVICTED] += 1
+        self._views.pop(device_uid, None)
+        for listener in self._eviction_listeners:
+            listener(device_uid)
+
+    def evict(self, device_uid: str):
+        encoded = self._encode_uid(device_uid)
+        if encoded is None:
+            return
+        with self._locked(self._table_lock_offset):
+            slot = self._find_slot(encoded)
+            if slot is not None:
+                self._evict_slot(slot)
+
+    def add_eviction_listener(self, listener: Callable[[str], None]):
+        """이 워커에서 디바이스를 정리할 때 함께 정리할 워커 로컬 상태(진단 캐시 등) 등록"""
+        self._eviction_listeners.append(listener)
+
+    def sweep(self) -> int:
+        with self._locked(self._table_lock_offset):
+            deadline = time.monotonic() - self.idle_timeout_seconds
+            idle = np.flatnonzero((self._uids != b"") & (self._last_seen <= deadline))
+            for slot in idle:
+                self._evict_slot(int(slot))
+        if idle.size:
+            logger.info(f"유휴 라즈베리 파이 {idle.size}대 정리 (공유 저장소), 남은 디바이스: {len(self)}")
+        return int(idle.size)
+
+    async def run_sweeper(self, interval_seconds: float):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"유휴 디바이스 정리 중 오류: {str(e)}")
+
+    def stats(self, include_devices: bool = False) -> dict:
+        now = time.monotonic()
+        active = len(self)
+        device_nbytes = sum(array[0].nbytes for array in (self._frames, self._frame_indices, self._timestamps,
+                                                          self._sequences, self._counters, self._signatures))
+        content = {
+            "backend": "shared",
+            "maxDevices": self.max_devices,
+            "idleTimeoutSeconds": self.idle_timeout_seconds,
+            "active": active,
+            "created": int(self._header[H_CREATED]),
+            "evicted": int(self._header[H_EVICTED]),
+            "rejected": int(self._header[H_REJECTED]),
+            "memoryBytes": active * device_nbytes,
+            "sharedMemoryBytes": self._shm.size,
+        }
+        if include_devices:
+            content["devices"] = {
+                device_uid: {
+                    "frames": queue.qsize(),
+                    "memoryBytes": device_nbytes,
+                    "idleSeconds": round(now - float(self._last_seen[queue.slot]), 3),
+                }
+                for device_uid, queue in self.items()
+            }
+        return content
+
+    def close(self):
+        self._views.clear()
+        for field in self._layout:
+            setattr(self, f"_{field}", None)
+        try:
+            self._shm.close()
+        except BufferError:
+            # 아직 참조 중인 뷰가 있으면 프로세스 종료 시 정리됨
+            pass
+        os.close(self._lock_fd)
+
+    def unlink(self):
+        """공유 메모리 세그먼트 삭제, 워커를 띄운 마스터 프로세스가 종료할 때 호출"""
+        self._shm.unlink()
+        try:
+            os.unlink(os.path.join(tempfile.gettempdir(), f"{self.name}.lock"))
+        except FileNotFoundError:
+            pass
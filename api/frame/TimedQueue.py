@@ -1,51 +1,483 @@
-from collections import deque
-from datetime import datetime
-from typing import Tuple, Deque
+from contextlib import nullcontext
+from io import BytesIO
+from typing import List, NamedTuple, Optional, Sequence, Tuple, Union
 import asyncio
+import time
+
+import cv2
+import numpy as np
 from PIL import Image
 
+from utils.helper import get_logger
+
+logger = get_logger(__name__)
+
+FRAME_SIZE = 145
+FRAME_SHAPE = (FRAME_SIZE, FRAME_SIZE, 3)
+
+# 프레임 변화 비교용 축소 흑백 썸네일 크기
+SIGNATURE_SIZE = 32
+SIGNATURE_SHAPE = (SIGNATURE_SIZE, SIGNATURE_SIZE)
+
+
+class SignedFrame(NamedTuple):
+    """디코딩 실행기에서 미리 계산한 썸네일을 함께 담은 프레임 (image 는 배열 또는 압축 바이트)"""
+    image: object
+    signature: np.ndarray
+
+
+Frame = Union[Image.Image, np.ndarray, SignedFrame]
+
+
+def to_frame_array(image: Frame) -> np.ndarray:
+    """PIL 이미지(또는 배열)를 모델 입력 크기의 uint8 RGB 배열로 변환"""
+    if isinstance(image, Image.Image):
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        array = np.asarray(image)
+    else:
+        array = np.asarray(image, dtype=np.uint8)
+
+    if array.shape != FRAME_SHAPE:
+        array = cv2.resize(array, (FRAME_SIZE, FRAME_SIZE))
+    return array
+
+
+def frame_signature(frame: np.ndarray) -> np.ndarray:
+    """(145, 145, 3) 프레임의 (32, 32) uint8 흑백 썸네일"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+    return cv2.resize(gray, SIGNATURE_SHAPE, interpolation=cv2.INTER_AREA)
+
+
+def image_signature(image_data: bytes) -> np.ndarray:
+    """압축 이미지의 (32, 32) uint8 흑백 썸네일, JPEG 은 1/8 축소 디코딩만 함"""
+    image = Image.open(BytesIO(image_data))
+    if image.format == "JPEG":
+        image.draft("L", SIGNATURE_SHAPE)
+    gray = np.asarray(image.convert("L"))
+    return cv2.resize(gray, SIGNATURE_SHAPE, interpolation=cv2.INTER_AREA)
+
+
+class FrameWindow(NamedTuple):
+    frame_indices: np.ndarray
+    frames: np.ndarray
+    fingerprint: int
+
+
+# QueueBuffers.counters 인덱스
+NEXT_SEQUENCE, EXPIRED, REJECTED, GENERATION, LIVE_COUNT, OLDEST_SLOT, CLAIMED_SEQUENCE = range(7)
+# 연속 진단의 최신 결과: 진단한 sequence, 판정(0/1), 검출 시각(UTC epoch us), 기록 시각(time.monotonic_ns())
+RESULT_SEQUENCE, RESULT_VALUE, RESULT_DETECTED_US, RESULT_AT_NS = range(7, 11)
+# frameIdx % maxsize 가 아닌 빈 슬롯으로 옮겨 저장한 프레임이 남아 있을 수 있는지 (0/1)
+RELOCATED = 11
+# 가장 최근에 저장된 프레임의 슬롯, 링 순서와 저장 순서가 어긋난 프레임이 있는지 (0/1)
+NEWEST_SLOT, DISORDERED = range(12, 14)
+COUNTER_FIELDS = 14
+
+# 빈 슬롯의 timestamp
+EMPTY_STAMP = np.iinfo(np.int64).min
+
+
+class QueueBuffers(NamedTuple):
+    """TimedQueue 상태 배열 묶음, 프로세스 메모리 또는 공유 메모리 위의 뷰"""
+    frames: np.ndarray         # (maxsize, 145, 145, 3) uint8
+    frame_indices: np.ndarray  # (maxsize,) int64
+    timestamps: np.ndarray     # (maxsize,) int64, time.monotonic_ns(), 빈 슬롯은 EMPTY_STAMP
+    sequences: np.ndarray      # (maxsize,) int64
+    counters: Union[List[int], np.ndarray]  # (COUNTER_FIELDS,), 프로세스 메모리는 int 리스트, 공유 메모리는 int64 배열
+    signatures: np.ndarray     # (maxsize, 32, 32) uint8, signatures=True 인 큐만 채움
+
+    @classmethod
+    def allocate(cls, maxsize: int) -> "QueueBuffers":
+        return cls(
+            frames=np.zeros((maxsize, *FRAME_SHAPE), dtype=np.uint8),
+            frame_indices=np.full(maxsize, -1, dtype=np.int64),
+            timestamps=np.full(maxsize, EMPTY_STAMP, dtype=np.int64),
+            sequences=np.zeros(maxsize, dtype=np.int64),
+            # 카운터는 put 마다 여러 번 읽고 쓰므로 numpy 스칼라 대신 파이썬 int
+            counters=[0] * COUNTER_FIELDS,
+            signatures=np.zeros((maxsize, *SIGNATURE_SHAPE), dtype=np.uint8),
+        )
+
+    def reset(self):
+        self.frame_indices.fill(-1)
+        self.timestamps.fill(EMPTY_STAMP)
+        self.sequences.fill(0)
+        self.counters[EXPIRED] = 0
+        self.counters[REJECTED] = 0
+        self.counters[LIVE_COUNT] = 0
+        self.counters[OLDEST_SLOT] = 0
+        self.counters[CLAIMED_SEQUENCE] = 0
+        self.counters[RESULT_SEQUENCE] = 0
+        self.counters[RELOCATED] = 0
+        self.counters[NEWEST_SLOT] = 0
+        self.counters[DISORDERED] = 0
+
+
 class TimedQueue:
-    def __init__(self, maxsize=48, window_seconds=2):
+    """디바이스별 프레임 링 버퍼, 프레임은 저장 시점에 한 번만 (145, 145, 3) uint8 로 변환됨
+
+    슬롯은 frameIdx % maxsize 이므로 frameIdx 순서로 들어오는 프레임은 링 순서가 곧 저장 순서다.
+    가장 오래된 프레임의 슬롯(OLDEST_SLOT)부터 링을 따라 만료된 슬롯만 지나가므로 put 의 만료 확인은
+    만료된 프레임 수(보통 0~1개)에 비례하고 슬롯 전체를 훑지 않는다.
+    링 순서와 저장 순서가 어긋난 프레임(같은 frameIdx 재전송, 빈 슬롯으로 옮긴 프레임 등)이 들어오면 DISORDERED 를
+    표시하고, 그동안 qsize 와 조회는 _expire_window 로 슬롯 전체를 확인해 남은 만료 프레임까지 정확히 비운다.
+    """
+
+    def __init__(self, maxsize=48, window_seconds=2, buffers: Optional[QueueBuffers] = None, signatures: bool = False):
         self.maxsize = maxsize
         self.window_seconds = window_seconds
-        self._items: Deque[Tuple[int, Image.Image, datetime]] = deque()
+        # True 면 프레임마다 흑백 썸네일을 함께 저장 (진단 건너뛰기용 윈도우 변화 비교)
+        self.signatures = signatures
+        self._window_ns = int(window_seconds * 1_000_000_000)
+
+        # frameIdx % maxsize 슬롯에 저장 (윈도우 안의 다른 프레임이 있으면 빈 슬롯), 빈(또는 만료된) 슬롯은 timestamp 가 EMPTY_STAMP
+        buffers = buffers if buffers is not None else QueueBuffers.allocate(maxsize)
+        self._frames = buffers.frames
+        self._frame_indices = buffers.frame_indices
+        self._timestamps = buffers.timestamps
+        # 슬롯별 저장 순번, 같은 frameIdx 가 다시 들어와도 윈도우 fingerprint 가 달라지도록 함
+        self._sequences = buffers.sequences
+        self._counters = buffers.counters
+        self._signatures = buffers.signatures
         self._condition = asyncio.Condition()
+        self._getters = 0
 
-    def _purge_expired(self, now: datetime):
-        while self._items and (now - self._items[0][2]).total_seconds() >= self.window_seconds:
-            self._items.popleft()
+    @property
+    def expired_count(self) -> int:
+        return int(self._counters[EXPIRED])
 
-    async def put(self, item: Tuple[int, Image.Image]):
-        now = datetime.utcnow()
-        async with self._condition:
-            self._purge_expired(now)
+    @property
+    def rejected_count(self) -> int:
+        return int(self._counters[REJECTED])
+
+    @property
+    def sequence(self) -> int:
+        """지금까지 저장된 프레임 수, 마지막 진단 이후 새 프레임이 몇 개 들어왔는지 확인용"""
+        return int(self._counters[NEXT_SEQUENCE])
+
+    @property
+    def claimed_sequence(self) -> int:
+        """연속 진단이 마지막으로 맡은 시점의 sequence, 맡은 적 없으면 0"""
+        return int(self._counters[CLAIMED_SEQUENCE])
+
+    def claim_diagnosis(self, stride: int) -> Optional[Tuple[int, int]]:
+        """마지막으로 맡은 뒤 새 프레임이 stride 개 이상이면 현재 sequence 를 맡고 (맡은 값, 이전 값) 반환, 아니면 None
+
+        공유 메모리 저장소에서는 카운터가 워커끼리 공유되므로 한 윈도우를 한 워커만 맡는다.
+        """
+        with self._exclusive():
+            counters = self._counters
+            sequence, claimed = int(counters[NEXT_SEQUENCE]), int(counters[CLAIMED_SEQUENCE])
+            if claimed and sequence - claimed < stride:
+                return None
+            counters[CLAIMED_SEQUENCE] = sequence
+            return sequence, claimed
+
+    def release_diagnosis(self, sequence: int, previous: int):
+        """진단하지 못한 claim 을 되돌림, 그 사이 다른 claim 이 있었으면 그대로 둠"""
+        with self._exclusive():
+            if self._counters[CLAIMED_SEQUENCE] == sequence:
+                self._counters[CLAIMED_SEQUENCE] = previous
+
+    def publish_result(self, sequence: int, is_drowsiness_drive: bool, detected_us: int):
+        """연속 진단 결과를 카운터에 기록, sequence 가 이미 기록된 결과보다 오래된 윈도우면 무시
+
+        공유 메모리 저장소에서는 진단하지 않은 워커의 조회도 latest_result 로 같은 결과를 읽는다.
+        """
+        with self._exclusive():
+            counters = self._counters
+            if sequence < counters[RESULT_SEQUENCE]:
+                return
+            counters[RESULT_VALUE] = int(is_drowsiness_drive)
+            counters[RESULT_DETECTED_US] = detected_us
+            counters[RESULT_AT_NS] = time.monotonic_ns()
+            counters[RESULT_SEQUENCE] = sequence
 
-            if len(self._items) >= self.maxsize:
+    def latest_result(self, max_age_seconds: float) -> Optional[Tuple[bool, int]]:
+        """max_age_seconds 이내에 기록된 연속 진단 결과 (판정, 검출 시각 us), 없으면 None"""
+        with self._exclusive():
+            counters = self._counters
+            if not counters[RESULT_SEQUENCE] or time.monotonic_ns() - counters[RESULT_AT_NS] > max_age_seconds * 1_000_000_000:
+                return None
+            return bool(counters[RESULT_VALUE]), int(counters[RESULT_DETECTED_US])
+
+    def clear_result(self):
+        """기록된 연속 진단 결과 삭제 (모델 버전 교체 시)"""
+        with self._exclusive():
+            self._counters[RESULT_SEQUENCE] = 0
+
+    def _exclusive(self):
+        """버퍼를 다른 프로세스와 공유할 때 쓰는 잠금, 프로세스 메모리 버퍼는 잠글 필요 없음"""
+        return nullcontext()
+
+    def _expire(self, now_ns: int):
+        """OLDEST_SLOT 부터 링 순서로 윈도우를 벗어난 프레임을 비움, 윈도우 안의 프레임을 만나면 멈춤
+
+        최대 한 바퀴(maxsize 슬롯)만 확인한다. 저장 도중 종료된 워커가 공유 카운터를 남겨
+        LIVE_COUNT 가 실제보다 크면 한 바퀴를 다 돌아도 남은 프레임이 없으므로 LIVE_COUNT 를 0 으로 맞춘다.
+        """
+        counters = self._counters
+        live = int(counters[LIVE_COUNT])
+        if live == 0:
+            return
+
+        stamps = self._timestamps
+        cutoff = now_ns - self._window_ns
+        slot = int(counters[OLDEST_SLOT]) % self.maxsize
+        expired = []
+        steps = 0
+        while live and steps < self.maxsize:
+            stamp = stamps[slot]
+            if stamp != EMPTY_STAMP:
+                if stamp > cutoff:
+                    break
+                stamps[slot] = EMPTY_STAMP
+                expired.append(slot)
+                live -= 1
+            slot = slot + 1 if slot + 1 < self.maxsize else 0
+            steps += 1
+
+        if live and steps == self.maxsize:
+            logger.warning(f"TimedQueue LIVE_COUNT 불일치 보정: 기록 {int(counters[LIVE_COUNT])}, 실제 {len(expired)}")
+            live = 0
+            counters[LIVE_COUNT] = 0
+        counters[OLDEST_SLOT] = slot
+        if expired:
+            counters[LIVE_COUNT] = live
+            counters[EXPIRED] += len(expired)
+            self._release(expired)
+
+    def _expire_window(self, now_ns: int):
+        """윈도우를 벗어난 프레임을 모두 비움 (qsize 와 조회용), 링 순서와 어긋난 프레임이 있을 때만 슬롯 전체 확인"""
+        self._expire(now_ns)
+        if self._counters[DISORDERED]:
+            self._recount(now_ns)
+
+    def _recount(self, now_ns: int):
+        """슬롯 전체를 확인해 남은 만료 프레임을 비우고 LIVE_COUNT 를 다시 셈, 링 순서가 맞으면 DISORDERED 해제"""
+        counters = self._counters
+        stamps = self._timestamps
+        live = stamps != EMPTY_STAMP
+        expired = (stamps <= now_ns - self._window_ns) & live
+        count = int(np.count_nonzero(expired))
+        if count:
+            stamps[expired] = EMPTY_STAMP
+            counters[EXPIRED] += count
+            self._release(np.flatnonzero(expired))
+        # LIVE_COUNT 는 실제 슬롯으로 다시 셈 (저장 도중 종료된 워커가 남긴 공유 카운터 보정)
+        counters[LIVE_COUNT] = int(np.count_nonzero(live)) - count
+
+        live_slots = np.flatnonzero(stamps != EMPTY_STAMP)
+        if live_slots.size:
+            ring = live_slots[np.argsort((live_slots - counters[OLDEST_SLOT]) % self.maxsize, kind="stable")]
+            if np.any(np.diff(stamps[ring]) < 0):
+                return
+            counters[OLDEST_SLOT], counters[NEWEST_SLOT] = int(ring[0]), int(ring[-1])
+        counters[DISORDERED] = 0
+
+    def _free_slot(self, slot: int) -> int:
+        """slot 부터 링 순서로 가장 가까운 빈 슬롯"""
+        free = np.flatnonzero(self._timestamps == EMPTY_STAMP)
+        return int(free[np.argmin((free - slot) % self.maxsize)])
+
+    def _relocated_slot(self, frame_idx: int) -> Optional[int]:
+        """빈 슬롯으로 옮겨 저장된 frame_idx 프레임의 슬롯, 옮겨 저장된 프레임이 더 없으면 RELOCATED 해제"""
+        live_slots = self._live_slots()
+        moved = live_slots[self._frame_indices[live_slots] % self.maxsize != live_slots]
+        if not moved.size:
+            self._counters[RELOCATED] = 0
+            return None
+        matches = moved[self._frame_indices[moved] == frame_idx]
+        return int(matches[0]) if matches.size else None
+
+    def _live_slots(self) -> np.ndarray:
+        return np.flatnonzero(self._timestamps != EMPTY_STAMP)
+
+    def _window_slots(self) -> np.ndarray:
+        live_slots = self._live_slots()
+        return live_slots[np.argsort(self._frame_indices[live_slots], kind="stable")]
+
+    def _prepare(self, image: Frame) -> Tuple[object, Optional[np.ndarray]]:
+        """저장 전 변환 (프레임, 썸네일), 잠금 밖에서 실행됨"""
+        if isinstance(image, SignedFrame):
+            return to_frame_array(image.image), image.signature
+        frame = to_frame_array(image)
+        return frame, frame_signature(frame) if self.signatures else None
+
+    def _store(self, slot: int, frame):
+        self._frames[slot] = frame
+
+    def _read(self, slots: np.ndarray) -> np.ndarray:
+        return self._frames[slots]
+
+    def _export(self, slots: np.ndarray) -> list:
+        """스냅샷에 쓸 슬롯별 저장 형태 그대로의 프레임"""
+        return list(self._frames[slots])
+
+    def _release(self, slots: np.ndarray):
+        """비워진 슬롯의 프레임 정리, 고정 크기 버퍼는 덮어쓰기만 하므로 할 일 없음"""
+
+    def _fingerprint(self, slots: np.ndarray) -> int:
+        return hash((self._frame_indices[slots].tobytes(), self._sequences[slots].tobytes(), int(self._counters[GENERATION])))
+
+    def put_nowait(self, item: Tuple[int, Frame]):
+        self.put_many_nowait([item])
+
+    def put_many_nowait(self, items: Sequence[Tuple[int, Frame]]):
+        """await 없이 저장하는 빠른 경로, 윈도우에 모두 들어갈 수 없으면 하나도 저장하지 않고 QueueFull
+
+        이벤트 루프 스레드에서는 중간에 다른 코루틴이 끼어들 수 없으므로 Condition 잠금이 필요 없다.
+        get_one 으로 기다리는 소비자가 있을 때만 깨우는 task 를 띄운다.
+        """
+        self._insert([(frame_idx, self._prepare(image)) for frame_idx, image in items])
+
+    def restore_nowait(self, items: Sequence[Tuple[int, Frame]], ages_ns: Sequence[int]):
+        """스냅샷에서 되살린 프레임 저장, 각 프레임의 timestamp 를 지금보다 ages_ns 만큼 이전으로 맞춤"""
+        self._insert([(frame_idx, self._prepare(image)) for frame_idx, image in items], ages_ns)
+
+    def _insert(self, frames: list, ages_ns: Optional[Sequence[int]] = None):
+        with self._exclusive():
+            counters = self._counters
+            now = time.monotonic_ns()
+            self._expire(now)
+            if counters[LIVE_COUNT] + len(frames) > self.maxsize:
+                # 링 순서와 다르게 남은 만료 프레임이 있을 수 있으므로 전체를 확인한 뒤 거절
+                self._recount(now)
+            if counters[LIVE_COUNT] + len(frames) > self.maxsize:
+                counters[REJECTED] += len(frames)
                 raise asyncio.QueueFull("TimedQueue full 상황")
 
-            self._items.append((item[0], item[1], now))
-            self._condition.notify()
+            stamps = [now] * len(frames) if ages_ns is None else [now - int(age) for age in ages_ns]
+            timestamps = self._timestamps
+            for (frame_idx, (frame, signature)), stamp in zip(frames, stamps):
+                slot = frame_idx % self.maxsize
+                added = True
+                moved = self._relocated_slot(frame_idx) if counters[RELOCATED] else None
+                if moved is not None:
+                    # 앞서 빈 슬롯으로 옮겨 저장한 같은 frameIdx 는 그 슬롯에서 교체
+                    slot, added = moved, False
+                elif timestamps[slot] != EMPTY_STAMP:
+                    if self._frame_indices[slot] == frame_idx:
+                        added = False
+                    else:
+                        # frameIdx 가 maxsize 이상 건너뛰었거나 0 부터 다시 시작해 다른 프레임이 아직 윈도우에 있으면
+                        # 덮어쓰지 않고 빈 슬롯에 저장 (위 용량 확인으로 빈 슬롯이 남아 있음), 같은 frameIdx 는 새 프레임으로 교체
+                        slot = self._free_slot(slot)
+                        counters[RELOCATED] = 1
 
-    async def get_one(self) -> Tuple[int, Image.Image]:
+                if counters[LIVE_COUNT] == 0:
+                    counters[OLDEST_SLOT] = counters[NEWEST_SLOT] = slot
+                    counters[DISORDERED] = 0
+                else:
+                    # 링에서 가장 최근 프레임 뒤에, 그보다 늦은 시각으로 들어와야 OLDEST_SLOT 부터의 링 순서가 저장 순서와 같음
+                    oldest, newest = counters[OLDEST_SLOT], counters[NEWEST_SLOT]
+                    position, head = (slot - oldest) % self.maxsize, (newest - oldest) % self.maxsize
+                    if stamp < timestamps[newest] or position < head:
+                        counters[DISORDERED] = 1
+                    elif position > head:
+                        counters[NEWEST_SLOT] = slot
+                if added:
+                    counters[LIVE_COUNT] += 1
+                self._store(slot, frame)
+                if signature is not None:
+                    self._signatures[slot] = signature
+                self._frame_indices[slot] = frame_idx
+                self._timestamps[slot] = stamp
+                counters[NEXT_SEQUENCE] += 1
+                self._sequences[slot] = counters[NEXT_SEQUENCE]
+
+        if self._getters:
+            asyncio.get_running_loop().create_task(self._notify(len(frames)))
+
+    async def _notify(self, count: int):
         async with self._condition:
-            while True:
-                now = datetime.utcnow()
-                self._purge_expired(now)
+            self._condition.notify(count)
 
-                if self._items:
-                    frame_idx, image, _ = self._items.popleft()
-                    return frame_idx, image
+    async def put(self, item: Tuple[int, Frame]):
+        self.put_nowait(item)
 
-                await self._condition.wait()
+    async def put_many(self, items: Sequence[Tuple[int, Frame]]):
+        self.put_many_nowait(items)
 
-    async def get_all(self) -> list[Tuple[int, Image.Image]]:
+    async def get_one(self) -> Tuple[int, np.ndarray]:
         async with self._condition:
-            now = datetime.utcnow()
-            self._purge_expired(now)
+            while True:
+                with self._exclusive():
+                    self._expire_window(time.monotonic_ns())
+                    live_slots = self._live_slots()
+                    if live_slots.size:
+                        slot = live_slots[np.argmin(self._timestamps[live_slots])]
+                        frame_idx, frame = int(self._frame_indices[slot]), self._read(slot[None])[0]
+                        self._timestamps[slot] = EMPTY_STAMP
+                        self._release(slot[None])
+                        self._counters[LIVE_COUNT] -= 1
+                        if slot == self._counters[NEWEST_SLOT]:
+                            # 링 순서를 확인할 기준 프레임이 없어졌으므로 다음 조회에서 전체 확인
+                            self._counters[DISORDERED] = 1
+                        return frame_idx, frame
+
+                self._getters += 1
+                try:
+                    await self._condition.wait()
+                finally:
+                    self._getters -= 1
+
+    async def get_all(self) -> list[Tuple[int, np.ndarray]]:
+        window = await self.snapshot()
+        return list(zip(window.frame_indices.tolist(), window.frames))
+
+    async def snapshot(self) -> FrameWindow:
+        return self.snapshot_nowait()
+
+    def snapshot_nowait(self) -> FrameWindow:
+        """윈도우 내 프레임을 frameIdx 순으로 복사해 (frame_indices, (n, 145, 145, 3) uint8, fingerprint) 로 반환
+
+        개수(len(frames)), frameIdx, 프레임이 한 번의 잠금 안에서 함께 만들어지므로 서로 어긋나지 않는다.
+        """
+        with self._exclusive():
+            self._expire_window(time.monotonic_ns())
+            slots = self._window_slots()
+            return FrameWindow(self._frame_indices[slots], self._read(slots), self._fingerprint(slots))
+
+    def export_window(self) -> Tuple[np.ndarray, list, np.ndarray]:
+        """윈도우 내 (frameIdx, 저장된 프레임(배열 또는 압축 바이트), 저장 후 지난 시간 ns) 를 frameIdx 순으로 반환"""
+        with self._exclusive():
+            now = time.monotonic_ns()
+            self._expire_window(now)
+            slots = self._window_slots()
+            return self._frame_indices[slots], self._export(slots), now - self._timestamps[slots]
+
+    def window_signatures(self) -> Tuple[np.ndarray, np.ndarray]:
+        """윈도우 내 (frameIdx, (n, 32, 32) 썸네일)을 frameIdx 순으로 반환, 프레임 복사나 디코딩 없음"""
+        with self._exclusive():
+            self._expire_window(time.monotonic_ns())
+            slots = self._window_slots()
+            return self._frame_indices[slots], self._signatures[slots]
+
+    def fingerprint(self) -> int:
+        """현재 윈도우 구성(frameIdx + 저장 순번)의 해시, 프레임 복사 없이 윈도우 변경 여부 확인용"""
+        with self._exclusive():
+            self._expire_window(time.monotonic_ns())
+            return self._fingerprint(self._window_slots())
+
+    def seconds_until_free(self) -> float:
+        """윈도우가 가득 찼을 때 가장 오래된 프레임이 만료되기까지 남은 시간(초)"""
+        with self._exclusive():
+            now = time.monotonic_ns()
+            self._expire_window(now)
+            if self._counters[LIVE_COUNT] < self.maxsize:
+                return 0.0
+            oldest = int(self._timestamps[self._live_slots()].min())
+        return max(oldest + self._window_ns - now, 0) / 1_000_000_000
 
-            return [(idx, img) for idx, img, _ in self._items]
+    @property
+    def nbytes(self) -> int:
+        """디바이스 하나가 고정으로 차지하는 버퍼 크기(바이트)"""
+        return (self._frames.nbytes + self._frame_indices.nbytes + self._timestamps.nbytes
+                + self._sequences.nbytes + COUNTER_FIELDS * 8 + self._signatures.nbytes)
 
     def qsize(self) -> int:
-        now = datetime.utcnow()
-        self._purge_expired(now)
-        return len(self._items)
+        with self._exclusive():
+            self._expire_window(time.monotonic_ns())
+            return int(self._counters[LIVE_COUNT])
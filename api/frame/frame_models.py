@@ -1,6 +1,17 @@
-from pydantic import BaseModel
+from typing import List
+from pydantic import BaseModel, Field
 
 class FrameRequest(BaseModel):
     deviceUid: str
     frameIdx: int
     driverFrame: str
+
+
+class BatchFrameItem(BaseModel):
+    frameIdx: int
+    driverFrame: str
+
+
+class BatchFrameRequest(BaseModel):
+    deviceUid: str
+    frames: List[BatchFrameItem] = Field(..., min_length=1, max_length=48)
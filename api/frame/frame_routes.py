@@ -1,20 +1,88 @@
-from fastapi import APIRouter
-from .frame_models import FrameRequest
+from fastapi import APIRouter, Header, Query, Request
+from .frame_models import FrameRequest, BatchFrameRequest
 from utils.helper import create_error_response, get_logger
 from utils.exception_handlers import ErrorForm
 from fastapi.responses import JSONResponse
-from .TimedQueue import TimedQueue
+from .TimedQueue import TimedQueue, Frame, SignedFrame, FRAME_SIZE, to_frame_array, frame_signature, image_signature
+from .CompressedTimedQueue import CompressedTimedQueue
+from .DeviceRegistry import DeviceRegistry
+from .SharedFrameStore import SharedFrameStore
+from .AdmissionController import AdmissionController, base64_decoded_size
+from utils.bounded_executor import BoundedExecutor, ExecutorSaturated
+from utils.metrics import Histogram, CallbackGauge
+from recording import FrameRecorder
+from utils.tracing import span
 
 import aiohttp
 import asyncio
 import base64
-from typing import Dict
+import time
+import numpy as np
+from typing import List, Optional, Tuple, Union
 from PIL import Image
 from io import BytesIO
+import config
 router = APIRouter()
 logger = get_logger(__name__)
 
-uid_queues: Dict[str, TimedQueue] = {}
+
+
+def create_frame_store():
+    if config.FRAME_DECODE_MODE not in ("eager", "lazy"):
+        raise ValueError(f"지원하지 않는 프레임 디코딩 방식: {config.FRAME_DECODE_MODE}")
+    if config.FRAME_STORE_BACKEND == "shared":
+        if config.FRAME_DECODE_MODE == "lazy":
+            raise ValueError("FRAME_DECODE_MODE=lazy 는 FRAME_STORE_BACKEND=memory 에서만 사용 가능")
+        return SharedFrameStore(
+            config.SHARED_FRAME_STORE_NAME,
+            max_devices=config.SHARED_FRAME_STORE_MAX_DEVICES,
+            maxsize=48,
+            window_seconds=2,
+            idle_timeout_seconds=config.DEVICE_IDLE_TIMEOUT_SECONDS,
+            signatures=config.DIAGNOSIS_SKIP_ENABLED,
+            lock_timeout_seconds=config.SHARED_FRAME_STORE_LOCK_TIMEOUT_SECONDS,
+        )
+    if config.FRAME_STORE_BACKEND != "memory":
+        raise ValueError(f"지원하지 않는 프레임 저장소: {config.FRAME_STORE_BACKEND}")
+    if config.FRAME_DECODE_MODE == "lazy":
+        queue_factory = lambda: CompressedTimedQueue(decode_image_bytes, decode_executor, maxsize=48, window_seconds=2,
+                                                     signatures=config.DIAGNOSIS_SKIP_ENABLED)
+    else:
+        queue_factory = lambda: TimedQueue(maxsize=48, window_seconds=2, signatures=config.DIAGNOSIS_SKIP_ENABLED)
+    return DeviceRegistry(
+        max_devices=config.MAX_DEVICES,
+        idle_timeout_seconds=config.DEVICE_IDLE_TIMEOUT_SECONDS,
+        queue_factory=queue_factory,
+    )
+
+
+decode_executor = BoundedExecutor("decode", max_workers=config.DECODE_WORKERS, max_pending=config.DECODE_MAX_PENDING)
+uid_queues = create_frame_store()
+admission = AdmissionController(
+    decode_executor,
+    device_rate=config.ADMISSION_DEVICE_RATE,
+    device_burst=config.ADMISSION_DEVICE_BURST,
+    max_frame_bytes=config.ADMISSION_MAX_FRAME_BYTES,
+    decode_budget_bytes=config.ADMISSION_DECODE_BUDGET_BYTES,
+    drop_start=config.ADMISSION_DROP_START,
+    max_keep_every=config.ADMISSION_MAX_KEEP_EVERY,
+    max_buckets=config.MAX_DEVICES * 2,
+)
+uid_queues.add_eviction_listener(admission.discard)
+recorder = FrameRecorder(
+    config.RECORD_DIR,
+    segment_bytes=config.RECORD_SEGMENT_BYTES,
+    max_pending=config.RECORD_MAX_PENDING,
+) if config.RECORD_ENABLED else None
+
+FRAME_DECODE_SECONDS = Histogram("frame_decode_seconds", "프레임 디코딩 시간 (base64, image, validate)", ["stage"])
+CallbackGauge("device_registry_active", "등록된 라즈베리 파이 수", [], lambda: {(): len(uid_queues)})
+CallbackGauge("frame_queue_depth", "디바이스별 윈도우 내 프레임 수", ["device_uid"],
+              lambda: {(uid, ): queue.qsize() for uid, queue in list(uid_queues.items())})
+CallbackGauge("frame_queue_expired_total", "디바이스별 윈도우 만료 프레임 수", ["device_uid"],
+              lambda: {(uid, ): queue.expired_count for uid, queue in list(uid_queues.items())}, "counter")
+CallbackGauge("frame_queue_rejected_total", "디바이스별 QueueFull 로 거절된 프레임 수", ["device_uid"],
+              lambda: {(uid, ): queue.rejected_count for uid, queue in list(uid_queues.items())}, "counter")
 
 
 @router.post("/api/save/frame")
@@ -22,39 +90,242 @@ async def save_frame(data: FrameRequest):
     device_uid = data.deviceUid
     frame_idx = data.frameIdx
     frame_data = data.driverFrame
+    arrived_ns = time.time_ns()
+
+    nbytes = base64_decoded_size(frame_data)
+    try:
+        if not admit_frames(device_uid, [(frame_idx, nbytes)])[0]:
+            return create_dropped_response()
+    except ErrorForm as e:
+        return create_admission_error_response(e, "save_frame(입장 제어)")
 
     try:
-        image = decode_base64_image(frame_data)
+        image = await run_decode(ingest_base64_image, frame_data, nbytes=nbytes)
     except ErrorForm as e:
         logger.error(f"error_code:{e.code}, {e.message}, save_frame(디코딩), {e.detail_message}")
         return create_error_response(e.code, e.message, "save_frame(디코딩)", e.detail_message)
 
-    queue = get_or_create_queue(device_uid)
+    return await enqueue_frames(device_uid, [(frame_idx, image)], "save_frame(큐 저장)", [frame_data], arrived_ns)
+
+
+@router.post("/api/save/frame/raw")
+async def save_raw_frame(
+    request: Request,
+    device_uid: Optional[str] = Query(None, alias="deviceUid"),
+    frame_idx: Optional[int] = Query(None, alias="frameIdx"),
+    header_device_uid: Optional[str] = Header(None, alias="X-Device-Uid"),
+    header_frame_idx: Optional[int] = Header(None, alias="X-Frame-Idx"),
+):
+    # application/octet-stream 본문에 이미지 바이트를 그대로 받음, deviceUid/frameIdx 는 쿼리 또는 헤더
+    arrived_ns = time.time_ns()
+    device_uid = device_uid if device_uid is not None else header_device_uid
+    frame_idx = frame_idx if frame_idx is not None else header_frame_idx
+    if device_uid is None or frame_idx is None:
+        logger.error("error_code:422, invalid_parameter, save_raw_frame(파라미터 확인), deviceUid/frameIdx 누락")
+        return create_error_response(422, "invalid_parameter", "save_raw_frame(파라미터 확인)", "deviceUid 와 frameIdx 를 쿼리 또는 헤더로 전달해야 합니다.")
+
+    try:
+        # 본문을 읽기 전에 Content-Length 로 먼저 크기 확인
+        content_length = request.headers.get("content-length")
+        if content_length is not None and content_length.isdigit():
+            admission.check_size(int(content_length))
+        body = await request.body()
+        if not admit_frames(device_uid, [(frame_idx, len(body))])[0]:
+            return create_dropped_response()
+    except ErrorForm as e:
+        return create_admission_error_response(e, "save_raw_frame(입장 제어)")
+
+    try:
+        image = await run_decode(ingest_image_bytes, body, nbytes=len(body))
+    except ErrorForm as e:
+        logger.error(f"error_code:{e.code}, {e.message}, save_raw_frame(디코딩), {e.detail_message}")
+        return create_error_response(e.code, e.message, "save_raw_frame(디코딩)", e.detail_message)
+
+    return await enqueue_frames(device_uid, [(frame_idx, image)], "save_raw_frame(큐 저장)", [body], arrived_ns)
+
+
+@router.post("/api/save/frames")
+async def save_frames(data: BatchFrameRequest):
+    device_uid = data.deviceUid
+    arrived_ns = time.time_ns()
+
+    sizes = [base64_decoded_size(frame.driverFrame) for frame in data.frames]
+    try:
+        keep = admit_frames(device_uid, [(frame.frameIdx, nbytes) for frame, nbytes in zip(data.frames, sizes)])
+    except ErrorForm as e:
+        return create_admission_error_response(e, "save_frames(입장 제어)")
+    if not any(keep):
+        return create_dropped_response()
+
+    # 하나라도 디코딩에 실패하면 아무 프레임도 저장하지 않음
+    try:
+        items = await run_decode(decode_batch_frames, data.frames, keep,
+                                 nbytes=sum(nbytes for nbytes, kept in zip(sizes, keep) if kept))
+    except ErrorForm as e:
+        logger.error(f"error_code:{e.code}, {e.message}, save_frames(디코딩), {e.detail_message}")
+        return create_error_response(e.code, e.message, "save_frames(디코딩)", e.detail_message)
+
+    payloads = [frame.driverFrame for frame, kept in zip(data.frames, keep) if kept]
+    return await enqueue_frames(device_uid, items, "save_frames(큐 저장)", payloads, arrived_ns)
+
 
+async def enqueue_frames(device_uid: str, items: List[Tuple[int, Frame]], method: str,
+                         payloads: Optional[List[Union[str, bytes]]] = None, arrived_ns: Optional[int] = None):
+    """items 를 디바이스 큐에 저장, 저장에 성공하면 원본 payloads 를 기록 (입장 제어, 디코딩, 큐에서 거절된 프레임은 기록하지 않음)"""
     try:
-        await queue.put((frame_idx, image))
+        queue = get_or_create_queue(device_uid)
+    except ErrorForm as e:
+        logger.warning(f"error_code:{e.code}, {e.message}, {method}, {e.detail_message}")
+        return create_error_response(e.code, e.message, method, e.detail_message)
+
+    try:
+        with span("queue_put"):
+            queue.put_many_nowait(items)
+        if recorder is not None and payloads is not None:
+            for (frame_idx, _), payload in zip(items, payloads):
+                recorder.record_frame(device_uid, frame_idx, payload, arrived_ns)
         return JSONResponse(status_code=200, content={"status": 200, "success": True})
     except asyncio.QueueFull:
-        return create_error_response(429, "queue_full", "save_frame(큐 저장)", f"해당 라즈베리 파이 기준 큐 사이즈 초과: {device_uid}")
+        return create_error_response(429, "queue_full", method, f"해당 라즈베리 파이 기준 큐 사이즈 초과: {device_uid}")
     except ErrorForm as e:
-        logger.error(f"error_code:{e.code}, {e.message}, save_frame(큐 저장), {e.detail_message}")
-        return create_error_response(500, "queue_error", "save_frame(큐 저장)", f"큐에 이미지 저장 실패: {str(e)}")
+        if e.code == 503:
+            return create_admission_error_response(e, method)
+        logger.error(f"error_code:{e.code}, {e.message}, {method}, {e.detail_message}")
+        return create_error_response(500, "queue_error", method, f"큐에 이미지 저장 실패: {str(e)}")
+
+def admit_frames(device_uid: str, frames: List[Tuple[int, int]]) -> List[bool]:
+    """(frameIdx, 디코딩 전 바이트 수) 목록의 입장 제어 (크기 → 디바이스 token bucket → 적응형 드롭), 프레임별 저장 여부 반환"""
+    for _, nbytes in frames:
+        admission.check_size(nbytes)
+    admission.acquire(device_uid, len(frames))
+    return [not admission.should_drop(frame_idx) for frame_idx, _ in frames]
+
+
+def create_dropped_response():
+    # 서버가 밀려 있어 저장하지 않고 건너뛴 프레임, 재전송할 필요 없음
+    return JSONResponse(status_code=200, content={"status": 200, "success": True, "dropped": True})
+
+
+def create_admission_error_response(e: ErrorForm, method: str):
+    log = logger.warning if e.code in (429, 503) else logger.error
+    log(f"error_code:{e.code}, {e.message}, {method}, {e.detail_message}")
+    return create_error_response(e.code, e.message, method, e.detail_message)
+
 
 def get_or_create_queue(device_uid: str) -> TimedQueue:
-    if device_uid not in uid_queues:
-        uid_queues[device_uid] = TimedQueue(maxsize=48, window_seconds=2)
-    return uid_queues[device_uid]
+    return uid_queues.get_or_create(device_uid)
+
+
+@router.get("/api/devices/stats")
+async def get_device_stats(detail: bool = Query(False)):
+    return JSONResponse(
+        status_code=200,
+        content={
+            "status": 200,
+            "success": True,
+            "devices": uid_queues.stats(include_devices=detail),
+            "decode": get_decode_stats(),
+            "admission": admission.stats(),
+            "recording": recorder.stats() if recorder is not None else None,
+        }
+    )
+
 
+def get_decode_stats() -> dict:
+    content = {"mode": config.FRAME_DECODE_MODE}
+    if config.FRAME_DECODE_MODE == "lazy":
+        totals = {"decoded": 0, "decodeFailed": 0, "decodeSeconds": 0.0}
+        for _, queue in uid_queues.items():
+            for key, value in queue.decode_stats().items():
+                totals[key] += value
+        content.update(totals)
+    return content
 
-def decode_base64_image(base64_str: str) -> Image.Image:
+
+async def run_decode(decoder, *args, nbytes: int = 0):
+    """이벤트 루프 대신 디코딩 실행기에서 디코딩, 동시 디코딩 수나 디코딩 중인 바이트 합이 한도를 넘으면 503"""
+    try:
+        with admission.decode_budget(nbytes), decode_executor.reserve():
+            return await decode_executor.run(decoder, *args)
+    except ExecutorSaturated as e:
+        raise ErrorForm(503, "decode_busy", f"이미지 디코딩 요청이 너무 많음: {str(e)}")
+
+
+def decode_batch_frames(frames: list, keep: Optional[List[bool]] = None) -> List[Tuple[int, Frame]]:
+    items = []
+    for position, frame in enumerate(frames):
+        if keep is not None and not keep[position]:
+            continue
+        try:
+            items.append((frame.frameIdx, ingest_base64_image(frame.driverFrame)))
+        except ErrorForm as e:
+            raise ErrorForm(e.code, e.message, f"frames[{position}] (frameIdx={frame.frameIdx}): {e.detail_message}")
+    return items
+
+
+def ingest_base64_image(base64_str: str) -> Frame:
+    """저장용 변환, eager 모드는 디코딩된 배열, lazy 모드는 헤더만 확인한 압축 바이트
+
+    진단 건너뛰기를 쓰면 썸네일도 여기(디코딩 실행기)에서 계산해 SignedFrame 으로 반환한다.
+    """
+    return ingest_image_bytes(decode_base64_bytes(base64_str))
+
+
+def ingest_image_bytes(image_data: bytes) -> Frame:
+    if config.FRAME_DECODE_MODE == "lazy":
+        frame = validate_image_bytes(image_data)
+        try:
+            signature = image_signature(frame) if config.DIAGNOSIS_SKIP_ENABLED else None
+        except Exception as e:
+            raise ErrorForm(422, "invalid_image", f"이미지 썸네일 생성 중 오류: {str(e)}")
+    else:
+        frame = decode_image_bytes(image_data)
+        signature = frame_signature(frame) if config.DIAGNOSIS_SKIP_ENABLED else None
+    return frame if signature is None else SignedFrame(frame, signature)
+
+
+def decode_base64_image(base64_str: str) -> np.ndarray:
+    return decode_image_bytes(decode_base64_bytes(base64_str))
+
+
+def decode_base64_bytes(base64_str: str) -> bytes:
     try:
         if ',' in base64_str:
             base64_str = base64_str.split(',')[1]
-        image_data = base64.b64decode(base64_str)
-        image = Image.open(BytesIO(image_data))
-        image.load()
-        return image
+        with FRAME_DECODE_SECONDS.labels("base64").time(), span("decode_base64"):
+            return base64.b64decode(base64_str)
     except base64.binascii.Error as e:
         raise ErrorForm(422, "invalid_base64", f"Base64 디코딩 실패: {str(e)}")
     except Exception as e:
         raise ErrorForm(422, "invalid_image", f"이미지 디코딩 중 오류: {str(e)}")
+
+
+def validate_image_bytes(image_data: bytes) -> bytes:
+    """픽셀을 디코딩하지 않고 헤더(형식, 크기)와 JPEG 끝 마커만 확인"""
+    try:
+        with FRAME_DECODE_SECONDS.labels("validate").time(), span("validate_image"):
+            image = Image.open(BytesIO(image_data))
+            width, height = image.size
+            image_format = image.format
+    except Exception as e:
+        raise ErrorForm(422, "invalid_image", f"이미지 헤더 확인 중 오류: {str(e)}")
+
+    if width <= 0 or height <= 0:
+        raise ErrorForm(422, "invalid_image", f"이미지 크기 오류: {width}x{height}")
+    if image_format == "JPEG" and not image_data.rstrip(b"\0").endswith(b"\xff\xd9"):
+        raise ErrorForm(422, "invalid_image", "JPEG 데이터가 잘림 (EOI 마커 없음)")
+    return image_data
+
+
+def decode_image_bytes(image_data: bytes) -> np.ndarray:
+    """이미지 바이트를 모델 입력 크기 (145, 145, 3) uint8 배열로 디코딩"""
+    try:
+        with FRAME_DECODE_SECONDS.labels("image").time(), span("decode_image"):
+            image = Image.open(BytesIO(image_data))
+            if image.format == "JPEG":
+                # JPEG 은 DCT 스케일링으로 145x145 이상인 가장 작은 크기(1/2, 1/4, 1/8)로 바로 디코딩
+                image.draft("RGB", (FRAME_SIZE, FRAME_SIZE))
+            image.load()
+            return to_frame_array(image)
+    except Exception as e:
+        raise ErrorForm(422, "invalid_image", f"이미지 디코딩 중 오류: {str(e)}")
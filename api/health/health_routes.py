@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+from model_loader import ModelStatus, model_status
+from utils.metrics import CallbackGauge
+
+router = APIRouter()
+
+CallbackGauge("model_ready", "모델 로드 및 warm-up 완료 여부", [],
+              lambda: {(): 1 if model_status.state == ModelStatus.READY else 0})
+CallbackGauge("model_startup_seconds", "서버 시작 단계별 소요 시간 (server, import, load, warmup)", ["stage"],
+              lambda: {(stage, ): seconds for stage, seconds in list(model_status.timings.items())})
+
+
+@router.get("/healthz")
+async def get_health():
+    # 프로세스가 요청을 처리할 수 있는지만 확인 (모델 로드 여부와 무관)
+    return JSONResponse(status_code=200, content={"status": 200, "success": True})
+
+
+@router.get("/readyz")
+async def get_readiness(request: Request):
+    status: ModelStatus = request.app.state.model_status
+    ready = request.app.state.model is not None
+    code = 200 if ready else 503
+    return JSONResponse(status_code=code, content={"status": code, "success": ready, "model": status.to_dict()})
@@ -0,0 +1,170 @@
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+from utils.helper import get_logger
+from utils.exception_handlers import ErrorForm
+from api.frame.frame_routes import get_or_create_queue, ingest_base64_image, ingest_image_bytes, run_decode, admit_frames, recorder
+from api.frame.AdmissionController import base64_decoded_size
+from api.diagnosis.diagnosis_routes import run_diagnosis, DiagnosisError, MIN_DIAGNOSIS_FRAMES
+
+import asyncio
+import json
+import struct
+import time
+from typing import Optional
+import config
+
+router = APIRouter()
+logger = get_logger(__name__)
+
+# 바이너리 메시지 = 4바이트 big-endian frameIdx + 이미지 바이트
+FRAME_HEADER = struct.Struct(">I")
+
+
+@router.websocket("/ws/frame")
+async def stream_frames(websocket: WebSocket, device_uid: str = Query(..., alias="deviceUid")):
+    await websocket.accept()
+    session = StreamSession(websocket, device_uid, config.STREAM_DIAGNOSIS_STRIDE)
+    logger.info(f"라즈베리 파이 UID: {device_uid} - 스트리밍 연결")
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            await session.handle_message(message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        session.close()
+        logger.info(f"라즈베리 파이 UID: {device_uid} - 스트리밍 종료")
+
+
+class StreamSession:
+    """WebSocket 연결 하나의 프레임 저장, 진단 push, 백프레셔 처리"""
+
+    def __init__(self, websocket: WebSocket, device_uid: str, stride: int):
+        self.websocket = websocket
+        self.device_uid = device_uid
+        self.stride = max(stride, 1)
+
+        self._frames_since_diagnosis = 0
+        self._diagnosed = False
+        self._diagnosis_task: Optional[asyncio.Task] = None
+        self._send_lock = asyncio.Lock()
+
+    async def handle_message(self, message: dict):
+        arrived_ns = time.time_ns()
+        try:
+            frame_idx, decoder, payload = self._parse_frame(message)
+        except ErrorForm as e:
+            logger.error(f"error_code:{e.code}, {e.message}, stream_frames(디코딩), {e.detail_message}")
+            await self.send_error(e.code, e.message, "stream_frames(디코딩)", e.detail_message)
+            return
+
+        nbytes = len(payload) if isinstance(payload, bytes) else base64_decoded_size(payload)
+        try:
+            if not admit_frames(self.device_uid, [(frame_idx, nbytes)])[0]:
+                # 서버가 밀려 있어 건너뛴 프레임, 응답 없이 다음 프레임을 받음
+                return
+        except ErrorForm as e:
+            logger.warning(f"error_code:{e.code}, {e.message}, stream_frames(입장 제어), {e.detail_message}")
+            await self.send_error(e.code, e.message, "stream_frames(입장 제어)", e.detail_message)
+            return
+
+        try:
+            image = await run_decode(decoder, payload, nbytes=nbytes)
+        except ErrorForm as e:
+            logger.error(f"error_code:{e.code}, {e.message}, stream_frames(디코딩), {e.detail_message}")
+            await self.send_error(e.code, e.message, "stream_frames(디코딩)", e.detail_message)
+            return
+
+        try:
+            queue = get_or_create_queue(self.device_uid)
+        except ErrorForm as e:
+            logger.warning(f"error_code:{e.code}, {e.message}, stream_frames(큐 저장), {e.detail_message}")
+            await self.send_error(e.code, e.message, "stream_frames(큐 저장)", e.detail_message)
+            return
+
+        try:
+            queue.put_nowait((frame_idx, image))
+        except asyncio.QueueFull:
+            # HTTP 429 대신 재전송 가능 시점을 알려주고 연결은 유지
+            await self.send({
+                "type": "backpressure",
+                "frameIdx": frame_idx,
+                "retryAfterMs": round(queue.seconds_until_free() * 1000),
+            })
+            return
+        if recorder is not None:
+            recorder.record_frame(self.device_uid, frame_idx, payload, arrived_ns)
+
+        self._frames_since_diagnosis += 1
+        if self._should_diagnose(queue.qsize()):
+            self._frames_since_diagnosis = 0
+            self._diagnosed = True
+            self._diagnosis_task = asyncio.create_task(self._push_diagnosis())
+
+    def _parse_frame(self, message: dict):
+        """메시지에서 (frameIdx, 디코더, 디코딩할 데이터) 추출, 디코딩은 입장 제어 후에 함"""
+        data = message.get("bytes")
+        if data is not None:
+            if len(data) <= FRAME_HEADER.size:
+                raise ErrorForm(422, "invalid_frame", "바이너리 프레임은 4바이트 frameIdx 헤더 + 이미지 바이트여야 합니다.")
+            (frame_idx,) = FRAME_HEADER.unpack_from(data)
+            return frame_idx, ingest_image_bytes, data[FRAME_HEADER.size:]
+
+        try:
+            payload = json.loads(message.get("text") or "")
+            frame_idx = int(payload["frameIdx"])
+            driver_frame = payload["driverFrame"]
+            if not isinstance(driver_frame, str):
+                raise TypeError("driverFrame 은 base64 문자열이어야 합니다.")
+        except (ValueError, KeyError, TypeError) as e:
+            raise ErrorForm(422, "invalid_parameter", f"텍스트 프레임은 frameIdx, driverFrame 을 담은 JSON 이어야 합니다: {str(e)}")
+        return frame_idx, ingest_base64_image, driver_frame
+
+    def _should_diagnose(self, queue_size: int) -> bool:
+        if queue_size < MIN_DIAGNOSIS_FRAMES:
+            return False
+        if self._diagnosis_task is not None and not self._diagnosis_task.done():
+            return False
+        # 43프레임에 처음 도달했을 때 한 번, 이후에는 stride 마다
+        return not self._diagnosed or self._frames_since_diagnosis >= self.stride
+
+    async def _push_diagnosis(self):
+        try:
+            result = await run_diagnosis(self.websocket.app, self.device_uid, "stream_frames")
+        except DiagnosisError as e:
+            await self.send_error(e.code, e.message, e.method, e.detail_message)
+            return
+
+        await self.send({
+            "type": "diagnosis",
+            "status": 200,
+            "success": True,
+            "isDrowsinessDrive": result.is_drowsiness_drive,
+            "detectionTime": result.detection_time,
+        })
+
+    async def send_error(self, code, message, method, detail_message):
+        await self.send({
+            "type": "error",
+            "success": False,
+            "error": {
+                "code": code,
+                "message": message,
+                "method": method,
+                "detail_message": detail_message,
+            },
+        })
+
+    async def send(self, content: dict):
+        async with self._send_lock:
+            try:
+                await self.websocket.send_json(content)
+            except (WebSocketDisconnect, RuntimeError):
+                # 진단 결과를 보내기 전에 연결이 끊긴 경우
+                pass
+
+    def close(self):
+        if self._diagnosis_task is not None and not self._diagnosis_task.done():
+            self._diagnosis_task.cancel()
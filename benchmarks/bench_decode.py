@@ -0,0 +1,74 @@
+"""저장 시점 이미지 디코딩 마이크로 벤치마크
+
+    python benchmarks/bench_decode.py [--iterations 200]
+
+전체 해상도 디코딩 + resize(기존 방식)와 JPEG draft 모드 축소 디코딩(decode_image_bytes)을 비교한다.
+"""
+from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import argparse
+import time
+from io import BytesIO
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from api.frame.frame_routes import decode_image_bytes
+
+RESOLUTIONS = [(640, 480), (1280, 720), (1920, 1080)]
+
+
+def create_camera_frame(width: int, height: int, seed: int = 0) -> bytes:
+    """그라데이션 + 노이즈로 카메라 프레임과 비슷한 압축률의 JPEG 생성"""
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    frame = np.broadcast_to(gradient, (height, width, 3)) + rng.normal(0, 12, (height, width, 3))
+    buffered = BytesIO()
+    Image.fromarray(np.clip(frame, 0, 255).astype(np.uint8)).save(buffered, format="JPEG", quality=85)
+    return buffered.getvalue()
+
+
+def decode_full_resolution(image_data: bytes) -> np.ndarray:
+    image = Image.open(BytesIO(image_data))
+    image.load()
+    return cv2.resize(np.array(image), (145, 145))
+
+
+def measure(fn, image_data: bytes, iterations: int) -> float:
+    fn(image_data)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(image_data)
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def decoded_size(image_data: bytes, draft: bool) -> int:
+    image = Image.open(BytesIO(image_data))
+    if draft:
+        image.draft("RGB", (145, 145))
+    image.load()
+    return image.width * image.height * len(image.getbands())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'resolution':>12} {'jpeg KB':>8} {'full ms':>8} {'draft ms':>9} {'speedup':>8} {'full MB':>8} {'draft KB':>9}")
+    for width, height in RESOLUTIONS:
+        image_data = create_camera_frame(width, height)
+        full_ms = measure(decode_full_resolution, image_data, args.iterations)
+        draft_ms = measure(decode_image_bytes, image_data, args.iterations)
+        print(
+            f"{width:>6}x{height:<5} {len(image_data) / 1024:>8.1f} {full_ms:>8.2f} {draft_ms:>9.2f} "
+            f"{full_ms / draft_ms:>7.1f}x {decoded_size(image_data, False) / 2**20:>8.2f} "
+            f"{decoded_size(image_data, True) / 1024:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""추론 백엔드별 CPU 지연 시간 벤치마크
+
+    python benchmarks/bench_inference.py [--model ./models/team12.h5] [--batch-sizes 1 4 8] [--iterations 20]
+
+모델 파일이 없으면 같은 입력 크기(48, 145, 145, 3)의 작은 Conv3D 모델로 대신 측정한다.
+각 백엔드는 원본 Keras 모델과의 일치 검사(최대 확률 차이, 판정 일치율)도 함께 출력한다.
+"""
+from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import argparse
+import os
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from inference_backends import KerasBackend, create_backend, load_parity_samples, check_parity
+from api.diagnosis.diagnosis_routes import FRAME_COUNT
+from api.frame.TimedQueue import FRAME_SHAPE
+
+CONFIGURATIONS = [
+    ("keras", {}),
+    ("compiled", {}),
+    ("compiled", {"jit_compile": True}),
+    ("tflite", {}),
+    ("tflite", {"quantization": "dynamic"}),
+    ("tflite", {"quantization": "float16"}),
+]
+
+
+def create_stand_in_model():
+    tf.keras.utils.set_random_seed(0)
+    return tf.keras.Sequential([
+        tf.keras.Input((FRAME_COUNT, *FRAME_SHAPE)),
+        tf.keras.layers.Conv3D(8, 3, strides=2, activation="relu"),
+        tf.keras.layers.Conv3D(16, 3, strides=2, activation="relu"),
+        tf.keras.layers.GlobalAveragePooling3D(),
+        tf.keras.layers.Dense(1, activation="sigmoid"),
+    ])
+
+
+def measure(backend, inputs: np.ndarray, iterations: int) -> float:
+    backend.predict(inputs)  # 그래프 추적 / XLA 컴파일 / 텐서 할당은 측정에서 제외
+    start = time.perf_counter()
+    for _ in range(iterations):
+        backend.predict(inputs)
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="./models/team12.h5")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--parity-samples", default=None, help="전처리된 입력 .npy (없으면 무작위 입력)")
+    args = parser.parse_args()
+
+    if os.path.exists(args.model):
+        model = tf.keras.models.load_model(args.model)
+        print(f"model: {args.model}")
+    else:
+        model = create_stand_in_model()
+        print(f"model: {args.model} 없음, 대체 Conv3D 모델로 측정")
+
+    reference = KerasBackend(model)
+    samples = load_parity_samples(model.input_shape[1:], args.parity_samples)
+    rng = np.random.default_rng(1)
+
+    header = " ".join(f"{f'batch {size} ms':>11}" for size in args.batch_sizes)
+    print(f"{'backend':>24} {'max diff':>9} {'agree':>6} {header}")
+    for name, options in CONFIGURATIONS:
+        label = name + "".join(f" {value if isinstance(value, str) else key}" for key, value in options.items())
+        try:
+            backend = reference if name == "keras" else create_backend(model, name, batch_buckets=args.batch_sizes, **options)
+        except Exception as e:
+            print(f"{label:>24} 생성 실패: {e}")
+            continue
+
+        report = check_parity(reference, backend, samples)
+        timings = []
+        for size in args.batch_sizes:
+            inputs = rng.random((size, *model.input_shape[1:]), dtype=np.float32)
+            timings.append(f"{measure(backend, inputs, args.iterations):>11.1f}")
+        print(f"{label:>24} {report.max_abs_diff:>9.2e} {report.decision_agreement:>6.0%} {' '.join(timings)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""핵심 경로 마이크로 벤치마크 (회귀 확인용)
+
+    python benchmarks/bench_micro.py [--iterations 200] [--save baseline.json] [--check baseline.json --tolerance 0.25]
+
+decode_base64_image, TimedQueue(put / snapshot), preprocess_input_data 의 1회 평균 시간(ms)을 측정한다.
+--check 로 저장해 둔 기준보다 tolerance 비율 이상 느려진 항목이 있으면 종료 코드 1 로 끝낸다.
+"""
+from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import argparse
+import asyncio
+import base64
+import json
+import time
+
+import numpy as np
+
+from benchmarks.bench_decode import create_camera_frame
+from api.frame.frame_routes import decode_base64_image
+from api.frame.TimedQueue import TimedQueue, FRAME_SHAPE
+from api.diagnosis.diagnosis_routes import preprocess_input_data, FRAME_COUNT
+
+
+def measure(fn, iterations: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def run_benchmarks(iterations: int) -> dict:
+    results = {}
+    loop = asyncio.new_event_loop()
+
+    encoded = "data:image/jpeg;base64," + base64.b64encode(create_camera_frame(640, 480)).decode()
+    results["decode_base64_image_640x480"] = measure(lambda: decode_base64_image(encoded), iterations)
+
+    frame = np.zeros(FRAME_SHAPE, dtype=np.uint8)
+    queue = TimedQueue(maxsize=48, window_seconds=2)
+    counter = iter(range(10 ** 9))
+
+    def put():
+        nonlocal queue
+        try:
+            loop.run_until_complete(queue.put((next(counter), frame)))
+        except asyncio.QueueFull:
+            queue = TimedQueue(maxsize=48, window_seconds=2)
+            loop.run_until_complete(queue.put((next(counter), frame)))
+
+    results["timed_queue_put"] = measure(put, iterations)
+
+    full_queue = TimedQueue(maxsize=48, window_seconds=60)
+    loop.run_until_complete(full_queue.put_many([(idx, frame) for idx in range(48)]))
+    results["timed_queue_snapshot_48"] = measure(lambda: loop.run_until_complete(full_queue.snapshot()), iterations)
+
+    window = loop.run_until_complete(full_queue.snapshot())
+    out = np.empty((1, FRAME_COUNT, *FRAME_SHAPE), dtype=np.float32)
+    results["preprocess_input_data_48"] = measure(lambda: preprocess_input_data(window.frame_indices, window.frames, out=out), iterations)
+
+    sparse = slice(None, None, 2)  # 24프레임만 있는 윈도우(보간 비중이 큰 경우)
+    results["preprocess_input_data_24"] = measure(
+        lambda: preprocess_input_data(window.frame_indices[sparse], window.frames[sparse], out=out), iterations)
+
+    loop.close()
+    return {name: round(value, 4) for name, value in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--save", default=None, help="결과를 기준 파일(JSON)로 저장")
+    parser.add_argument("--check", default=None, help="기준 파일(JSON)과 비교")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="허용 느려짐 비율")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.iterations)
+    baseline = json.loads(Path(args.check).read_text()) if args.check else {}
+
+    regressions = []
+    print(f"{'benchmark':>30} {'ms':>9} {'baseline':>9} {'change':>8}")
+    for name, value in results.items():
+        base = baseline.get(name)
+        change = (value - base) / base if base else None
+        print(f"{name:>30} {value:>9.3f} {base if base is not None else '-':>9} "
+              f"{f'{change:+.0%}' if change is not None else '-':>8}")
+        if change is not None and change > args.tolerance:
+            regressions.append(name)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2))
+    if regressions:
+        print(f"느려진 항목 (>{args.tolerance:.0%}): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
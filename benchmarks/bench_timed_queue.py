@@ -0,0 +1,163 @@
+"""TimedQueue 저장 비용 벤치마크 (디바이스 수별 put 1회 평균 시간)
+
+    python benchmarks/bench_timed_queue.py [--devices 10 100 300] [--puts 20000] [--fps 24] [--window-seconds 2]
+
+모든 디바이스가 fps 로 프레임을 보내는 정상 상태를 재현한다. put 마다 1 / (fps x devices) 초씩 흐르는
+가상 시계를 쓰므로, 윈도우가 찬 뒤에는 put 하나마다 가장 오래된 프레임 하나가 만료된다 (실제로 기다리지 않음).
+디바이스들에 round-robin 으로 프레임을 넣으며 다음을 비교한다.
+  legacy     : datetime.utcnow() + deque 기반 이전 구현 (이미지 참조만 보관, 프레임 복사 비용 없음)
+  copy       : 프레임 하나를 (48, 145, 145, 3) 버퍼에 복사하는 비용만 (현재 구현의 하한)
+  scan       : 현재 버퍼 구조에서 put 마다 슬롯 전체를 훑어 만료를 확인하는 방식 (OLDEST_SLOT 포인터 이전)
+  put        : 현재 구현의 async put
+  put_nowait : 현재 구현의 await 없는 빠른 경로
+
+디바이스 하나가 약 3MB(48 x 145 x 145 x 3)를 차지하므로 디바이스 수를 늘릴 때 메모리에 주의.
+"""
+from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import argparse
+import asyncio
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import api.frame.TimedQueue as timed_queue_module
+from api.frame.TimedQueue import TimedQueue, FRAME_SHAPE, EMPTY_STAMP, EXPIRED, LIVE_COUNT
+
+EPOCH = datetime(2000, 1, 1)
+
+
+class SimulatedClock:
+    """advance() 를 호출할 때만 흐르는 시계, TimedQueue 모듈의 time 대신 사용"""
+
+    def __init__(self):
+        self.now_ns = 0
+
+    def advance(self, step_ns: int):
+        self.now_ns += step_ns
+
+    def monotonic_ns(self) -> int:
+        return self.now_ns
+
+    def utcnow(self) -> datetime:
+        return EPOCH + timedelta(microseconds=self.now_ns // 1000)
+
+
+class LegacyTimedQueue:
+    """datetime 기반 이전 TimedQueue (비교용 복사본, datetime.utcnow() 대신 clock.utcnow())"""
+
+    def __init__(self, clock: SimulatedClock, maxsize=48, window_seconds=2):
+        self.clock = clock
+        self.maxsize = maxsize
+        self.window_seconds = window_seconds
+        self._items = deque()
+        self._condition = asyncio.Condition()
+
+    def _purge_expired(self, now: datetime):
+        while self._items and (now - self._items[0][2]).total_seconds() >= self.window_seconds:
+            self._items.popleft()
+
+    async def put(self, item):
+        now = self.clock.utcnow()
+        async with self._condition:
+            self._purge_expired(now)
+
+            if len(self._items) >= self.maxsize:
+                raise asyncio.QueueFull("TimedQueue full 상황")
+
+            self._items.append((item[0], item[1], now))
+            self._condition.notify()
+
+
+class CopyOnlyQueue:
+    """만료 확인 없이 frameIdx % maxsize 슬롯에 프레임만 복사 (비교용)"""
+
+    def __init__(self, clock: SimulatedClock, maxsize=48, window_seconds=2):
+        self.maxsize = maxsize
+        self._frames = np.zeros((maxsize, *FRAME_SHAPE), dtype=np.uint8)
+
+    def put_nowait(self, item):
+        self._frames[item[0] % self.maxsize] = item[1]
+
+
+class ScanningTimedQueue(TimedQueue):
+    """OLDEST_SLOT 포인터 없이 매번 슬롯 전체를 훑는 만료 처리 (비교용)"""
+
+    def _expire(self, now_ns: int):
+        stamps = self._timestamps
+        expired = (stamps <= now_ns - self._window_ns) & (stamps != EMPTY_STAMP)
+        count = int(np.count_nonzero(expired))
+        stamps[expired] = EMPTY_STAMP
+        self._counters[EXPIRED] += count
+        self._counters[LIVE_COUNT] -= count
+
+
+async def measure(queues, clock: SimulatedClock, step_ns: int, puts: int, frame, nowait: bool, frame_indices: list) -> tuple:
+    """(put 1회 평균 us, QueueFull 비율), frame_indices 는 디바이스별 다음 frameIdx (측정 사이에 이어짐)"""
+    rejected = 0
+    start = time.perf_counter()
+    for count in range(puts):
+        clock.advance(step_ns)
+        device = count % len(queues)
+        item = (frame_indices[device], frame)
+        frame_indices[device] += 1
+        try:
+            if nowait:
+                queues[device].put_nowait(item)
+            else:
+                await queues[device].put(item)
+        except asyncio.QueueFull:
+            rejected += 1
+    return (time.perf_counter() - start) / puts * 1_000_000, rejected / puts
+
+
+async def run(args):
+    clock = SimulatedClock()
+    timed_queue_module.time = clock
+
+    frame = np.zeros(FRAME_SHAPE, dtype=np.uint8)
+    variants = {
+        "legacy": (LegacyTimedQueue, False),
+        "copy": (CopyOnlyQueue, True),
+        "scan": (ScanningTimedQueue, False),
+        "put": (TimedQueue, False),
+        "put_nowait": (TimedQueue, True),
+    }
+
+    print(f"{'devices':>8} " + " ".join(f"{name + ' (us)':>16}" for name in variants) + f" {'rejected':>9}")
+    for devices in args.devices:
+        step_ns = -(-1_000_000_000 // int(args.fps * devices))
+        # 윈도우를 한 바퀴 채운 뒤부터 측정
+        warmup = int(args.fps * args.window_seconds * devices) + devices
+        row, rejected = [], 0.0
+        for queue_class, nowait in variants.values():
+            if queue_class in (LegacyTimedQueue, CopyOnlyQueue):
+                queues = [queue_class(clock, maxsize=48, window_seconds=args.window_seconds) for _ in range(devices)]
+            else:
+                queues = [queue_class(maxsize=48, window_seconds=args.window_seconds) for _ in range(devices)]
+            # frameIdx 가 0 부터 다시 시작하지 않도록 워밍업에서 이어서 측정
+            frame_indices = [0] * devices
+            await measure(queues, clock, step_ns, warmup, frame, nowait, frame_indices)
+            elapsed, rejected_ratio = await measure(queues, clock, step_ns, args.puts, frame, nowait, frame_indices)
+            row.append(elapsed)
+            rejected = max(rejected, rejected_ratio)
+            del queues
+        print(f"{devices:>8} " + " ".join(f"{value:>16.2f}" for value in row) + f" {rejected:>9.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--devices", type=int, nargs="+", default=[10, 100, 300])
+    parser.add_argument("--puts", type=int, default=20000)
+    parser.add_argument("--fps", type=float, default=24)
+    parser.add_argument("--window-seconds", type=float, default=2)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""디바이스 여러 대를 흉내 내는 부하 테스트
+
+    python benchmarks/loadtest.py --devices 20 --fps 24 --duration 10
+    python benchmarks/loadtest.py --target http://127.0.0.1:8000 --devices 50 --mode raw
+
+--target 을 주지 않으면 httpx.ASGITransport 로 프로세스 안에서 main.app 을 직접 호출하고,
+team12.h5 대신 --model stub(지연 시간 지정 가능) 또는 --model keras(작은 Conv3D 모델)를 쓴다.
+--decode-mode 로 프레임 디코딩 시점(eager/lazy)을 바꿔 디바이스당 메모리와 디코딩 CPU 를 비교할 수 있다(프로세스 안에서 실행할 때만).
+
+각 디바이스는 fps 간격으로 프레임을 보내고(--drop-rate 확률로 frameIdx 를 건너뜀, 카메라 프레임 누락 흉내),
+--poll-interval 마다 진단 결과를 조회한다. 처리량, 엔드포인트별 p50/p95/p99 지연 시간, 응답 코드,
+윈도우 만료 비율, 디바이스당 메모리를 출력한다.
+"""
+from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import re
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+import httpx
+import numpy as np
+
+
+class StubModel:
+    """배치 하나당 latency_ms 만큼 걸리는 가짜 모델"""
+
+    def __init__(self, latency_ms: float):
+        self.latency_seconds = latency_ms / 1000
+
+    def predict(self, inputs):
+        time.sleep(self.latency_seconds)
+        return np.full((inputs.shape[0], 1), 0.9, dtype=np.float32)
+
+
+def create_model(kind: str, latency_ms: float):
+    if kind == "stub":
+        return StubModel(latency_ms)
+
+    from benchmarks.bench_inference import create_stand_in_model
+    from inference_backends import CompiledBackend
+    return CompiledBackend(create_stand_in_model())
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.dropped = 0
+
+    def record(self, endpoint: str, seconds: float, response: httpx.Response):
+        self.latencies[endpoint].append(seconds)
+        self.statuses[endpoint][response.status_code] += 1
+        if endpoint == "save" and response.status_code == 200 and response.json().get("dropped"):
+            self.dropped += 1
+
+
+async def run_device(client: httpx.AsyncClient, recorder: Recorder, device_uid: str, args, frame: bytes, deadline: float):
+    encoded = "data:image/jpeg;base64," + base64.b64encode(frame).decode()
+    interval = 1 / args.fps
+    frame_idx = 0
+    next_send = time.perf_counter() + random.random() * interval  # 디바이스마다 시작 시점을 흩뜨림
+
+    while next_send < deadline:
+        await asyncio.sleep(max(next_send - time.perf_counter(), 0))
+        next_send += interval
+        if random.random() < args.drop_rate:
+            frame_idx += 1  # 카메라에서 빠진 프레임
+
+        start = time.perf_counter()
+        if args.mode == "raw":
+            response = await client.post("/api/save/frame/raw", content=frame,
+                                         params={"deviceUid": device_uid, "frameIdx": frame_idx},
+                                         headers={"Content-Type": "application/octet-stream"})
+        else:
+            response = await client.post("/api/save/frame",
+                                         json={"deviceUid": device_uid, "frameIdx": frame_idx, "driverFrame": encoded})
+        recorder.record("save", time.perf_counter() - start, response)
+        frame_idx += 1
+
+
+async def run_poller(client: httpx.AsyncClient, recorder: Recorder, device_uid: str, args, deadline: float):
+    # 첫 진단은 윈도우가 찰 즈음부터
+    await asyncio.sleep(2 + random.random() * args.poll_interval)
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get("/api/diagnosis/drowiness", params={"deviceUid": device_uid})
+        recorder.record("diagnosis", time.perf_counter() - start, response)
+        await asyncio.sleep(args.poll_interval)
+
+
+def parse_metric_sum(metrics_text: str, name: str) -> float:
+    pattern = re.compile(rf"^{name}(?:{{[^}}]*}})? (\S+)$", re.MULTILINE)
+    return sum(float(value) for value in pattern.findall(metrics_text))
+
+
+def percentiles(values: List[float]) -> str:
+    if not values:
+        return "-"
+    p50, p95, p99 = np.percentile(np.array(values) * 1000, [50, 95, 99])
+    return f"p50 {p50:7.1f} ms  p95 {p95:7.1f} ms  p99 {p99:7.1f} ms"
+
+
+async def run(args) -> dict:
+    # config 가 FRAME_DECODE_MODE 를 읽기 전에 환경 변수를 설정할 수 있도록 서버 모듈은 여기서 import
+    from benchmarks.bench_decode import create_camera_frame
+    if args.target:
+        client = httpx.AsyncClient(base_url=args.target, timeout=30)
+    else:
+        from main import app
+        app.state.model = create_model(args.model, args.stub_latency_ms)
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=30)
+
+    width, height = args.frame_size
+    frame = create_camera_frame(width, height)
+    recorder = Recorder()
+    device_uids = [f"loadtest-{index:04d}" for index in range(args.devices)]
+
+    async with client:
+        started = time.perf_counter()
+        deadline = started + args.duration
+        tasks = [run_device(client, recorder, uid, args, frame, deadline) for uid in device_uids]
+        if args.poll_interval > 0:
+            tasks += [run_poller(client, recorder, uid, args, deadline) for uid in device_uids]
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+        device_stats = (await client.get("/api/devices/stats")).json()
+        devices, decode = device_stats["devices"], device_stats.get("decode")
+        metrics_text = (await client.get("/metrics")).text
+
+    stored = sum(count for code, count in recorder.statuses["save"].items() if code == 200) - recorder.dropped
+    expired = parse_metric_sum(metrics_text, "frame_queue_expired_total")
+    return {
+        "devices": args.devices,
+        "fps": args.fps,
+        "frameSize": f"{width}x{height}",
+        "frameBytes": len(frame),
+        "seconds": round(elapsed, 2),
+        "saveThroughput": round(len(recorder.latencies["save"]) / elapsed, 1),
+        "storedThroughput": round(stored / elapsed, 1),
+        "diagnosisThroughput": round(len(recorder.latencies["diagnosis"]) / elapsed, 1),
+        "saveStatuses": dict(recorder.statuses["save"]),
+        "diagnosisStatuses": dict(recorder.statuses["diagnosis"]),
+        "dropped": recorder.dropped,
+        "saveLatency": percentiles(recorder.latencies["save"]),
+        "diagnosisLatency": percentiles(recorder.latencies["diagnosis"]),
+        "expiredRatio": round(expired / stored, 3) if stored else 0.0,
+        "memoryBytesPerDevice": devices["memoryBytes"] // devices["active"] if devices["active"] else 0,
+        "decode": decode,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--target", default=None, help="예: http://127.0.0.1:8000 (없으면 프로세스 안에서 실행)")
+    parser.add_argument("--devices", type=int, default=10)
+    parser.add_argument("--fps", type=float, default=24)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--frame-size", type=int, nargs=2, default=(640, 480), metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--mode", choices=("base64", "raw"), default="base64")
+    parser.add_argument("--drop-rate", type=float, default=0.02, help="frameIdx 를 건너뛸 확률")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="진단 조회 간격(초), 0 이면 조회 안 함")
+    parser.add_argument("--decode-mode", choices=("eager", "lazy"), default=None, help="FRAME_DECODE_MODE (프로세스 안에서 실행할 때만)")
+    parser.add_argument("--model", choices=("stub", "keras"), default="stub")
+    parser.add_argument("--stub-latency-ms", type=float, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 으로 출력")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    if args.decode_mode:
+        os.environ["FRAME_DECODE_MODE"] = args.decode_mode
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False))
+        return
+    for key, value in report.items():
+        print(f"{key:>22}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""기록해 둔 프레임 스트림(RECORD_ENABLED=1) 재생
+
+    python benchmarks/replay.py ./recordings [--speed 1.0] [--target http://127.0.0.1:8000]
+
+큐 저장까지 성공한 프레임만 기록되므로 입장 제어, 디코딩, QueueFull 로 거절된 프레임은 다시 보내지 않는다.
+세그먼트의 프레임을 원래 도착 간격대로(--speed 2 면 두 배 빠르게, 0 이면 기다리지 않고) save_frame(base64) 또는
+save_frame/raw 로 다시 보내고, 기록된 진단 조회 시점에 get_diagnosis_result 를 호출해 기록 당시 결과와 비교한다.
+--target 을 주지 않으면 loadtest.py 와 같이 프로세스 안에서 main.app 을 stub/keras 모델로 실행한다.
+"""
+from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.loadtest import Recorder, create_model, percentiles
+from recording import read_recording, Record, KIND_FRAME_BASE64, KIND_FRAME_RAW, KIND_DIAGNOSIS
+
+
+class ReplayResult:
+    def __init__(self):
+        self.status_mismatches = 0
+        self.result_mismatches = 0
+        self.compared = 0
+
+
+async def send(client: httpx.AsyncClient, recorder: Recorder, result: ReplayResult, record: Record):
+    start = time.perf_counter()
+    if record.kind == KIND_FRAME_BASE64:
+        response = await client.post("/api/save/frame", json={
+            "deviceUid": record.device_uid, "frameIdx": record.frame_idx, "driverFrame": record.payload.decode("ascii")})
+        recorder.record("save", time.perf_counter() - start, response)
+    elif record.kind == KIND_FRAME_RAW:
+        response = await client.post("/api/save/frame/raw", content=record.payload,
+                                     params={"deviceUid": record.device_uid, "frameIdx": record.frame_idx},
+                                     headers={"Content-Type": "application/octet-stream"})
+        recorder.record("save", time.perf_counter() - start, response)
+    elif record.kind == KIND_DIAGNOSIS:
+        response = await client.get("/api/diagnosis/drowiness", params={"deviceUid": record.device_uid})
+        recorder.record("diagnosis", time.perf_counter() - start, response)
+
+        result.compared += 1
+        if response.status_code != record.status:
+            result.status_mismatches += 1
+        elif record.result >= 0 and int(response.json()["isDrowsinessDrive"]) != record.result:
+            result.result_mismatches += 1
+
+
+async def run(args) -> dict:
+    records = read_recording(args.directory)
+    if not records:
+        raise SystemExit(f"기록이 없음: {args.directory}")
+
+    if args.target:
+        client = httpx.AsyncClient(base_url=args.target, timeout=30)
+    else:
+        from main import app
+        app.state.model = create_model(args.model, args.stub_latency_ms)
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://replay", timeout=30)
+
+    recorder = Recorder()
+    result = ReplayResult()
+    first_ns = records[0].time_ns
+    recorded_seconds = (records[-1].time_ns - first_ns) / 1e9
+
+    async with client:
+        started = time.perf_counter()
+        tasks = []
+        for record in records:
+            if args.speed > 0:
+                delay = started + (record.time_ns - first_ns) / 1e9 / args.speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send(client, recorder, result, record)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    kinds = Counter(record.kind for record in records)
+    return {
+        "records": len(records),
+        "devices": len({record.device_uid for record in records}),
+        "frames": kinds[KIND_FRAME_BASE64] + kinds[KIND_FRAME_RAW],
+        "diagnoses": kinds[KIND_DIAGNOSIS],
+        "recordedSeconds": round(recorded_seconds, 2),
+        "replaySeconds": round(elapsed, 2),
+        "saveStatuses": dict(recorder.statuses["save"]),
+        "diagnosisStatuses": dict(recorder.statuses["diagnosis"]),
+        "saveLatency": percentiles(recorder.latencies["save"]),
+        "diagnosisLatency": percentiles(recorder.latencies["diagnosis"]),
+        "statusMismatches": result.status_mismatches,
+        "resultMismatches": result.result_mismatches,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory", help="RECORD_DIR")
+    parser.add_argument("--speed", type=float, default=1.0, help="재생 속도 배율, 0 이면 간격 없이 전송")
+    parser.add_argument("--target", default=None, help="예: http://127.0.0.1:8000 (없으면 프로세스 안에서 실행)")
+    parser.add_argument("--model", choices=("stub", "keras"), default="stub")
+    parser.add_argument("--stub-latency-ms", type=float, default=20)
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 으로 출력")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False))
+        return
+    for key, value in report.items():
+        print(f"{key:>18}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import os
+
+
+def _get_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def _get_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+# 추론 배치 스케줄러: 여러 디바이스의 진단 요청을 모아 한 번에 model.predict
+INFERENCE_MAX_BATCH_SIZE = _get_int("INFERENCE_MAX_BATCH_SIZE", 8)
+INFERENCE_MAX_WAIT_MS = _get_float("INFERENCE_MAX_WAIT_MS", 10.0)
+
+# 추론 전용 실행기: 모델 하나를 공유하는 추론 스레드 수와 대기 가능한 진단 요청 수
+INFERENCE_WORKERS = _get_int("INFERENCE_WORKERS", 2)
+INFERENCE_MAX_PENDING = _get_int("INFERENCE_MAX_PENDING", 64)
+
+# WebSocket 스트리밍: 진단 가능(43프레임) 이후 새 프레임 N개마다 진단 결과를 push
+STREAM_DIAGNOSIS_STRIDE = _get_int("STREAM_DIAGNOSIS_STRIDE", 24)
+
+# 이미지 디코딩 실행기: 워커 수와 동시에 디코딩 대기 가능한 프레임 수
+DECODE_WORKERS = _get_int("DECODE_WORKERS", 4)
+DECODE_MAX_PENDING = _get_int("DECODE_MAX_PENDING", 256)
+
+# 미들웨어 본문 로깅: 라우트별 방식(full/truncate/hash/size/none), 최대 길이, 샘플링 비율
+LOG_BODY_DEFAULT = {"mode": "truncate", "max_bytes": 1024, "sample_rate": 1.0}
+LOG_BODY_POLICIES = {
+    "/api/save/frame": {"mode": "size", "sample_rate": 0.05},
+    "/api/save/frame/raw": {"mode": "size", "sample_rate": 0.05},
+    "/api/save/frames": {"mode": "size", "sample_rate": 0.05},
+}
+
+# 디바이스 레지스트리: 최대 디바이스 수, 유휴 디바이스 정리 기준과 주기
+MAX_DEVICES = _get_int("MAX_DEVICES", 1000)
+DEVICE_IDLE_TIMEOUT_SECONDS = _get_float("DEVICE_IDLE_TIMEOUT_SECONDS", 300.0)
+DEVICE_SWEEP_INTERVAL_SECONDS = _get_float("DEVICE_SWEEP_INTERVAL_SECONDS", 30.0)
+
+# 프레임 저장소: memory(프로세스 내, 기본값) 또는 shared(여러 uvicorn 워커가 공유 메모리를 함께 사용)
+FRAME_STORE_BACKEND = os.getenv("FRAME_STORE_BACKEND", "memory")
+SHARED_FRAME_STORE_NAME = os.getenv("SHARED_FRAME_STORE_NAME", "ai_server_frames")
+SHARED_FRAME_STORE_MAX_DEVICES = _get_int("SHARED_FRAME_STORE_MAX_DEVICES", 128)
+# 공유 저장소 잠금을 다른 워커가 잡고 있을 때 재시도하는 최대 시간(초), 넘으면 503 frame_store_busy
+SHARED_FRAME_STORE_LOCK_TIMEOUT_SECONDS = _get_float("SHARED_FRAME_STORE_LOCK_TIMEOUT_SECONDS", 0.5)
+
+# 프레임 디코딩 시점: eager(저장 시 145x145 로 디코딩, 기본값) 또는 lazy(헤더만 확인하고 압축 바이트를 보관,
+# 진단 시점에 윈도우 전체를 디코딩 실행기에서 병렬 디코딩), lazy 는 FRAME_STORE_BACKEND=memory 일 때만 사용
+FRAME_DECODE_MODE = os.getenv("FRAME_DECODE_MODE", "eager")
+
+# uvicorn 워커 프로세스 수, 2개 이상은 FRAME_STORE_BACKEND=shared 일 때만 사용
+SERVER_WORKERS = _get_int("SERVER_WORKERS", 1)
+
+# 실행 방식: server(진단 서버, 기본값) 또는 gateway(deviceUid 해시로 GATEWAY_BACKENDS 중 한 서버에 요청 전달), 포트
+SERVER_MODE = os.getenv("SERVER_MODE", "server")
+SERVER_PORT = _get_int("SERVER_PORT", 8000)
+
+# 게이트웨이: 백엔드 주소 목록(쉼표 구분), 백엔드당 해시 링 가상 노드 수, keep-alive 연결 풀 크기, 전달 timeout(초), 헬스 체크 주기(초)
+GATEWAY_BACKENDS = [backend.strip() for backend in os.getenv("GATEWAY_BACKENDS", "").split(",") if backend.strip()]
+GATEWAY_VIRTUAL_NODES = _get_int("GATEWAY_VIRTUAL_NODES", 64)
+GATEWAY_MAX_CONNECTIONS = _get_int("GATEWAY_MAX_CONNECTIONS", 100)
+GATEWAY_TIMEOUT_SECONDS = _get_float("GATEWAY_TIMEOUT_SECONDS", 10.0)
+GATEWAY_HEALTH_INTERVAL_SECONDS = _get_float("GATEWAY_HEALTH_INTERVAL_SECONDS", 2.0)
+
+# 추론 백엔드: keras(model.predict), compiled(고정 입력 시그니처 tf.function, INFERENCE_XLA=1 이면 XLA),
+# tflite(INFERENCE_TFLITE_QUANTIZATION=none/dynamic/float16)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "keras")
+INFERENCE_XLA = _get_int("INFERENCE_XLA", 0) == 1
+INFERENCE_TFLITE_QUANTIZATION = os.getenv("INFERENCE_TFLITE_QUANTIZATION", "none")
+
+# keras 외 백엔드 사용 시 원본 모델과의 일치 검사: 샘플(.npy, 비우면 무작위 입력), 샘플 수, 허용 확률 차이
+INFERENCE_PARITY_SAMPLES = os.getenv("INFERENCE_PARITY_SAMPLES", "")
+INFERENCE_PARITY_COUNT = _get_int("INFERENCE_PARITY_COUNT", 4)
+INFERENCE_PARITY_TOLERANCE = _get_float("INFERENCE_PARITY_TOLERANCE", 0.02)
+
+# 모델 파일 경로와 변경 감시 주기(초, 0 이면 감시 안 함), 파일이 바뀌면 무중단으로 새 버전 로드
+MODEL_PATH = os.getenv("MODEL_PATH", "./models/team12.h5")
+MODEL_WATCH_INTERVAL_SECONDS = _get_float("MODEL_WATCH_INTERVAL_SECONDS", 5.0)
+
+# 관리용 API(/api/admin/...) 토큰, 비우면 관리용 API 비활성화
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# 느린 요청 추적: TRACE_SLOW_REQUEST_MS 이상 걸린 요청의 단계별 시간을 최근 TRACE_MAX_TRACES 개까지 보관
+# (0 이면 추적하지 않음, PUT /api/admin/traces 로 실행 중 변경 가능), 관리용 프로파일링 최대 시간(초)
+TRACE_SLOW_REQUEST_MS = _get_float("TRACE_SLOW_REQUEST_MS", 0)
+TRACE_MAX_TRACES = _get_int("TRACE_MAX_TRACES", 100)
+PROFILE_MAX_SECONDS = _get_float("PROFILE_MAX_SECONDS", 60)
+
+# 서버 측 연속 진단: 43프레임 이상인 디바이스마다 새 프레임 STRIDE 개마다 서버가 직접 진단해 최신 결과를 저장,
+# GET /api/diagnosis/drowiness 는 MAX_AGE 이내의 최신 결과를 바로 반환
+CONTINUOUS_DIAGNOSIS_ENABLED = _get_int("CONTINUOUS_DIAGNOSIS_ENABLED", 0) == 1
+CONTINUOUS_DIAGNOSIS_STRIDE = _get_int("CONTINUOUS_DIAGNOSIS_STRIDE", 12)
+CONTINUOUS_DIAGNOSIS_INTERVAL_MS = _get_float("CONTINUOUS_DIAGNOSIS_INTERVAL_MS", 100.0)
+CONTINUOUS_DIAGNOSIS_MAX_IN_FLIGHT = _get_int("CONTINUOUS_DIAGNOSIS_MAX_IN_FLIGHT", 32)
+CONTINUOUS_DIAGNOSIS_MAX_AGE_SECONDS = _get_float("CONTINUOUS_DIAGNOSIS_MAX_AGE_SECONDS", 2.0)
+
+# 진단 건너뛰기: 마지막으로 추론한 윈도우와 현재 윈도우의 썸네일 변화 점수(0~255 밝기 평균 차이)가 THRESHOLD 미만이면
+# 모델을 다시 돌리지 않고 이전 결과 재사용, 마지막 추론 후 MAX_AGE 초가 지나면 변화가 없어도 다시 추론
+DIAGNOSIS_SKIP_ENABLED = _get_int("DIAGNOSIS_SKIP_ENABLED", 0) == 1
+DIAGNOSIS_SKIP_THRESHOLD = _get_float("DIAGNOSIS_SKIP_THRESHOLD", 3.0)
+DIAGNOSIS_SKIP_MAX_AGE_SECONDS = _get_float("DIAGNOSIS_SKIP_MAX_AGE_SECONDS", 10.0)
+
+# 프레임 스트림 기록: 큐에 저장된 프레임과 진단 결과를 RECORD_DIR 의 세그먼트 파일에 기록 (benchmarks/replay.py 로 재생),
+# 세그먼트 하나의 최대 크기와 쓰기 대기 레코드 수 (넘치면 기록하지 않고 버림)
+RECORD_ENABLED = _get_int("RECORD_ENABLED", 0) == 1
+RECORD_DIR = os.getenv("RECORD_DIR", "./recordings")
+RECORD_SEGMENT_BYTES = _get_int("RECORD_SEGMENT_BYTES", 256 << 20)
+RECORD_MAX_PENDING = _get_int("RECORD_MAX_PENDING", 1024)
+
+# 재시작 시 윈도우 보존: 종료할 때 디바이스 윈도우를 WINDOW_SNAPSHOT_DIR 에 저장하고 시작할 때 아직 유효한 프레임을 복원
+# (비어 있으면 사용 안 함, FRAME_STORE_BACKEND=memory 일 때만), 종료 시 진행 중인 디코딩/추론을 기다리는 최대 시간(초)
+WINDOW_SNAPSHOT_DIR = os.getenv("WINDOW_SNAPSHOT_DIR", "")
+SHUTDOWN_DRAIN_SECONDS = _get_float("SHUTDOWN_DRAIN_SECONDS", 5.0)
+
+# 프레임 저장 입장 제어: 디바이스별 초당 프레임 수와 버스트, 디코딩 전 프레임 최대 크기, 동시에 디코딩 중인 바이트 합 한도,
+# 디코딩 대기열이 ADMISSION_DROP_START 비율 이상 차면 frameIdx 기준 k 프레임 중 하나만 저장 (k 는 최대 ADMISSION_MAX_KEEP_EVERY)
+ADMISSION_DEVICE_RATE = _get_float("ADMISSION_DEVICE_RATE", 30.0)
+ADMISSION_DEVICE_BURST = _get_float("ADMISSION_DEVICE_BURST", 60)
+ADMISSION_MAX_FRAME_BYTES = _get_int("ADMISSION_MAX_FRAME_BYTES", 1 << 20)
+ADMISSION_DECODE_BUDGET_BYTES = _get_int("ADMISSION_DECODE_BUDGET_BYTES", 64 << 20)
+ADMISSION_DROP_START = _get_float("ADMISSION_DROP_START", 0.5)
+ADMISSION_MAX_KEEP_EVERY = _get_int("ADMISSION_MAX_KEEP_EVERY", 4)
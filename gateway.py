@@ -0,0 +1,314 @@
+"""deviceUid 기준으로 여러 진단 서버에 요청을 나눠 보내는 게이트웨이 (SERVER_MODE=gateway python main.py 또는 python gateway.py)
+
+디바이스 윈도우는 한 프로세스의 uid_queues 에만 있으므로 같은 deviceUid 요청은 항상 같은 서버로 가야 한다.
+일관된 해시 링(서버당 가상 노드 virtual_nodes 개)으로 서버를 고르므로 서버가 빠지면 그 서버의 디바이스만,
+서버가 추가되면 새 서버가 맡게 된 디바이스만 옮겨 간다.
+게이트웨이 프로세스는 모델, 프레임 저장소, 실행기를 만들지 않도록 진단 서버 모듈(api.frame, api.diagnosis 등)을
+import 하지 않는다 (utils, config, 메트릭 라우터만 사용).
+
+로컬에서 여러 포트로 실행하는 예:
+    SERVER_PORT=8001 python main.py
+    SERVER_PORT=8002 python main.py
+    SERVER_MODE=gateway SERVER_PORT=8000 GATEWAY_BACKENDS=http://127.0.0.1:8001,http://127.0.0.1:8002 python main.py
+"""
+import asyncio
+import bisect
+import hashlib
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Header, Query, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+from api.metrics.metrics_routes import router as metrics_router
+from utils.admin_auth import check_admin_token
+from utils.exception_handlers import validation_exception_handler, http_exception_handler, generic_exception_handler
+from utils.helper import create_error_response, get_logger
+from utils.metrics import Counter
+import config
+
+logger = get_logger(__name__)
+
+GATEWAY_REQUESTS_TOTAL = Counter("gateway_requests_total", "게이트웨이 전달 결과 (forwarded, rerouted, failed)", ["backend", "outcome"])
+
+# 백엔드로 그대로 전달하는 요청 헤더
+FORWARD_HEADERS = ("content-type", "x-device-uid", "x-frame-idx")
+
+
+def _ring_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """일관된 해시 링, 백엔드마다 virtual_nodes 개의 위치를 가짐"""
+
+    def __init__(self, backends: Iterable[str] = (), virtual_nodes: int = 64):
+        self.virtual_nodes = virtual_nodes
+        self._positions: List[int] = []
+        self._owners: List[str] = []
+        self._backends: set = set()
+        for backend in backends:
+            self.add(backend)
+
+    @property
+    def backends(self) -> List[str]:
+        return sorted(self._backends)
+
+    def __contains__(self, backend: str) -> bool:
+        return backend in self._backends
+
+    def __len__(self) -> int:
+        return len(self._backends)
+
+    def add(self, backend: str):
+        if backend in self._backends:
+            return
+        self._backends.add(backend)
+        for replica in range(self.virtual_nodes):
+            position = _ring_hash(f"{backend}#{replica}")
+            index = bisect.bisect(self._positions, position)
+            self._positions.insert(index, position)
+            self._owners.insert(index, backend)
+
+    def remove(self, backend: str):
+        if backend not in self._backends:
+            return
+        self._backends.discard(backend)
+        keep = [index for index, owner in enumerate(self._owners) if owner != backend]
+        self._positions = [self._positions[index] for index in keep]
+        self._owners = [self._owners[index] for index in keep]
+
+    def lookup(self, key: str) -> Optional[str]:
+        """key 를 맡는 백엔드, 링이 비어 있으면 None"""
+        if not self._positions:
+            return None
+        index = bisect.bisect(self._positions, _ring_hash(key)) % len(self._positions)
+        return self._owners[index]
+
+
+class Gateway:
+    """백엔드 목록(members) 중 헬스 체크를 통과한 백엔드로 해시 링을 구성하고 요청을 전달
+
+    연결 자체가 실패한 백엔드는 바로 링에서 빼고 다음 백엔드로 한 번 다시 보낸다.
+    빠진 백엔드는 헬스 체크(/healthz)가 다시 성공하면 링에 돌아온다.
+    """
+
+    def __init__(self, backends: Iterable[str], virtual_nodes: int = 64, timeout_seconds: float = 10.0,
+                 max_connections: int = 100, client: Optional[httpx.AsyncClient] = None):
+        self.members: List[str] = []
+        self.ring = HashRing(virtual_nodes=virtual_nodes)
+        for backend in backends:
+            self.add_backend(backend)
+
+        # 모든 백엔드가 keep-alive 연결 풀 하나를 함께 사용
+        self.client = client if client is not None else httpx.AsyncClient(
+            timeout=timeout_seconds,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def add_backend(self, backend: str):
+        backend = backend.rstrip("/")
+        if backend not in self.members:
+            self.members.append(backend)
+        self.ring.add(backend)
+
+    def remove_backend(self, backend: str) -> bool:
+        backend = backend.rstrip("/")
+        if backend not in self.members:
+            return False
+        self.members.remove(backend)
+        self.ring.remove(backend)
+        return True
+
+    def _mark_down(self, backend: str):
+        if backend in self.ring:
+            logger.warning(f"백엔드 연결 실패, 해시 링에서 제외: {backend}")
+            self.ring.remove(backend)
+
+    def _count(self, backend: str, outcome: str):
+        counts = self._counts.setdefault(backend, {"forwarded": 0, "rerouted": 0, "failed": 0})
+        counts[outcome] += 1
+        GATEWAY_REQUESTS_TOTAL.labels(backend, outcome).inc()
+
+    async def forward(self, request: Request, device_uid: str, body: bytes, method: str) -> Response:
+        """device_uid 를 맡는 백엔드로 요청을 그대로 보내고 응답을 그대로 반환"""
+        headers = {name: request.headers[name] for name in FORWARD_HEADERS if name in request.headers}
+        path = request.url.path + (f"?{request.url.query}" if request.url.query else "")
+
+        for attempt in range(2):
+            backend = self.ring.lookup(device_uid)
+            if backend is None:
+                logger.error(f"error_code:503, no_backend, {method}, 사용 가능한 백엔드 없음")
+                return create_error_response(503, "no_backend", method, "요청을 처리할 수 있는 서버가 없습니다.")
+            try:
+                response = await self.client.request(request.method, backend + path, content=body, headers=headers)
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                # 요청이 전달되지 않았으므로 다른 백엔드로 다시 보내도 중복 처리되지 않음
+                self._count(backend, "failed")
+                self._mark_down(backend)
+                logger.warning(f"{method}, {backend} 연결 실패 ({type(e).__name__}), 재시도 {attempt + 1}")
+                continue
+            except httpx.TransportError as e:
+                self._count(backend, "failed")
+                logger.error(f"error_code:502, bad_gateway, {method}, {backend}: {type(e).__name__}")
+                return create_error_response(502, "bad_gateway", method, f"서버 응답을 받지 못했습니다: {backend}")
+
+            self._count(backend, "rerouted" if attempt else "forwarded")
+            return Response(
+                content=response.content,
+                status_code=response.status_code,
+                media_type=response.headers.get("content-type"),
+            )
+
+        logger.error(f"error_code:503, no_backend, {method}, 재시도 후에도 연결 실패")
+        return create_error_response(503, "no_backend", method, "요청을 처리할 수 있는 서버가 없습니다.")
+
+    async def check_health(self, timeout_seconds: float = 1.0):
+        """members 전체에 /healthz 를 보내 해시 링을 갱신"""
+        async def probe(backend: str) -> Tuple[str, bool]:
+            try:
+                response = await self.client.get(f"{backend}/healthz", timeout=timeout_seconds)
+                return backend, response.status_code == 200
+            except httpx.HTTPError:
+                return backend, False
+
+        for backend, healthy in await asyncio.gather(*(probe(backend) for backend in list(self.members))):
+            if backend not in self.members:
+                continue
+            if healthy and backend not in self.ring:
+                logger.info(f"백엔드 복구, 해시 링에 추가: {backend}")
+                self.ring.add(backend)
+            elif not healthy:
+                self._mark_down(backend)
+
+    async def run_health_checker(self, interval_seconds: float):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.check_health()
+            except Exception as e:
+                logger.error(f"백엔드 헬스 체크 중 오류: {str(e)}")
+
+    async def close(self):
+        await self.client.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "members": list(self.members),
+            "healthy": self.ring.backends,
+            "virtualNodes": self.ring.virtual_nodes,
+            "backends": {backend: dict(counts) for backend, counts in self._counts.items()},
+        }
+
+
+def json_device_uid(body: bytes) -> Optional[str]:
+    try:
+        device_uid = json.loads(body).get("deviceUid")
+    except (ValueError, AttributeError):
+        return None
+    return device_uid if isinstance(device_uid, str) else None
+
+
+def create_gateway_app(gateway: Gateway, health_interval_seconds: float = 2.0) -> FastAPI:
+    app = FastAPI()
+    app.state.gateway = gateway
+    app.include_router(metrics_router, tags=["모니터링"])
+
+    def invalid_parameter(method: str) -> JSONResponse:
+        logger.error(f"error_code:422, invalid_parameter, {method}, deviceUid 누락")
+        return create_error_response(422, "invalid_parameter", method, "deviceUid 를 전달해야 합니다.")
+
+    @app.post("/api/save/frame")
+    @app.post("/api/save/frames")
+    async def forward_json_frames(request: Request):
+        method = "save_frame(게이트웨이)"
+        body = await request.body()
+        device_uid = json_device_uid(body)
+        if device_uid is None:
+            return invalid_parameter(method)
+        return await gateway.forward(request, device_uid, body, method)
+
+    @app.post("/api/save/frame/raw")
+    async def forward_raw_frame(
+        request: Request,
+        device_uid: Optional[str] = Query(None, alias="deviceUid"),
+        header_device_uid: Optional[str] = Header(None, alias="X-Device-Uid"),
+    ):
+        method = "save_raw_frame(게이트웨이)"
+        device_uid = device_uid if device_uid is not None else header_device_uid
+        if device_uid is None:
+            return invalid_parameter(method)
+        return await gateway.forward(request, device_uid, await request.body(), method)
+
+    @app.get("/api/diagnosis/drowiness")
+    async def forward_diagnosis(request: Request, device_uid: Optional[str] = Query(None, alias="deviceUid")):
+        method = "get_diagnosis_result(게이트웨이)"
+        if device_uid is None:
+            return invalid_parameter(method)
+        return await gateway.forward(request, device_uid, b"", method)
+
+    @app.get("/healthz")
+    async def get_health():
+        return JSONResponse(status_code=200, content={"status": 200, "success": True})
+
+    @app.get("/api/gateway/stats")
+    async def get_gateway_stats():
+        return JSONResponse(status_code=200, content={"status": 200, "success": True, "gateway": gateway.stats()})
+
+    @app.put("/api/gateway/backends")
+    async def add_backend(url: str = Query(...), token: Optional[str] = Header(None, alias="X-Admin-Token")):
+        error = check_admin_token(token, "add_backend(토큰 확인)")
+        if error is not None:
+            return error
+        gateway.add_backend(url)
+        logger.info(f"백엔드 추가: {url}")
+        return JSONResponse(status_code=200, content={"status": 200, "success": True, "gateway": gateway.stats()})
+
+    @app.delete("/api/gateway/backends")
+    async def remove_backend(url: str = Query(...), token: Optional[str] = Header(None, alias="X-Admin-Token")):
+        error = check_admin_token(token, "remove_backend(토큰 확인)")
+        if error is not None:
+            return error
+        if not gateway.remove_backend(url):
+            logger.error(f"error_code:404, backend_not_found, remove_backend(백엔드 확인), {url}")
+            return create_error_response(404, "backend_not_found", "remove_backend(백엔드 확인)", f"등록되지 않은 백엔드: {url}")
+        logger.info(f"백엔드 제거: {url}")
+        return JSONResponse(status_code=200, content={"status": 200, "success": True, "gateway": gateway.stats()})
+
+    app.add_exception_handler(RequestValidationError, validation_exception_handler)
+    app.add_exception_handler(StarletteHTTPException, http_exception_handler)
+    app.add_exception_handler(Exception, generic_exception_handler)
+
+    @app.on_event("startup")
+    async def startup_event():
+        await gateway.check_health()
+        app.state.health_checker = asyncio.create_task(gateway.run_health_checker(health_interval_seconds))
+
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        app.state.health_checker.cancel()
+        await gateway.close()
+
+    return app
+
+
+def run_gateway():
+    if not config.GATEWAY_BACKENDS:
+        raise ValueError("SERVER_MODE=gateway 는 GATEWAY_BACKENDS 가 필요함")
+    gateway = Gateway(
+        config.GATEWAY_BACKENDS,
+        virtual_nodes=config.GATEWAY_VIRTUAL_NODES,
+        timeout_seconds=config.GATEWAY_TIMEOUT_SECONDS,
+        max_connections=config.GATEWAY_MAX_CONNECTIONS,
+    )
+    gateway_app = create_gateway_app(gateway, health_interval_seconds=config.GATEWAY_HEALTH_INTERVAL_SECONDS)
+    uvicorn.run(gateway_app, host="0.0.0.0", port=config.SERVER_PORT)
+
+
+if __name__ == "__main__":
+    run_gateway()
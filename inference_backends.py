@@ -0,0 +1,173 @@
+import threading
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+import tensorflow as tf
+
+BACKENDS = ("keras", "compiled", "tflite")
+QUANTIZATIONS = ("none", "dynamic", "float16")
+
+
+class InferenceBackend:
+    """app.state.model 로 쓰이는 추론 백엔드, BatchScheduler 는 predict(float32 배치) 만 호출"""
+
+    name = "base"
+
+    def predict(self, inputs: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def describe(self) -> dict:
+        return {"backend": self.name}
+
+    def weight_bytes(self) -> Optional[int]:
+        """모델 가중치가 차지하는 바이트 수"""
+        return None
+
+
+def _keras_weight_bytes(model) -> int:
+    return sum(int(np.prod(weight.shape)) * np.dtype(weight.dtype).itemsize for weight in model.weights)
+
+
+class KerasBackend(InferenceBackend):
+    """원본 Keras 모델의 model.predict 를 그대로 사용"""
+
+    name = "keras"
+
+    def __init__(self, model):
+        self.model = model
+
+    def predict(self, inputs: np.ndarray) -> np.ndarray:
+        return self.model.predict(inputs, verbose=0)
+
+    def weight_bytes(self) -> int:
+        return _keras_weight_bytes(self.model)
+
+
+class CompiledBackend(InferenceBackend):
+    """입력 시그니처를 고정한 tf.function 그래프, model.predict 의 데이터 파이프라인 구성 비용이 없음
+
+    XLA 는 배치 크기마다 다시 컴파일하므로 jit_compile 일 때는 배치를 batch_buckets 크기로 0 패딩한다.
+    """
+
+    name = "compiled"
+
+    def __init__(self, model, jit_compile: bool = False, batch_buckets: Sequence[int] = (1, 2, 4, 8)):
+        self.model = model
+        self.jit_compile = jit_compile
+        self.batch_buckets = tuple(sorted(batch_buckets))
+        self.input_shape = tuple(model.input_shape[1:])
+
+        spec = tf.TensorSpec((None, *self.input_shape), tf.float32)
+        self._fn = tf.function(lambda x: model(x, training=False), input_signature=[spec], jit_compile=jit_compile)
+        self._local = threading.local()
+
+    def _padded(self, inputs: np.ndarray) -> np.ndarray:
+        count = len(inputs)
+        size = next((bucket for bucket in self.batch_buckets if bucket >= count), count)
+        if size == count:
+            return inputs
+
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None or len(buffer) < size:
+            buffer = np.zeros((size, *self.input_shape), dtype=np.float32)
+            self._local.buffer = buffer
+        buffer[:count] = inputs
+        buffer[count:size] = 0
+        return buffer[:size]
+
+    def predict(self, inputs: np.ndarray) -> np.ndarray:
+        batch = self._padded(inputs) if self.jit_compile else inputs
+        return self._fn(tf.convert_to_tensor(batch, dtype=tf.float32)).numpy()[:len(inputs)]
+
+    def describe(self) -> dict:
+        return {"backend": self.name, "jitCompile": self.jit_compile}
+
+    def weight_bytes(self) -> int:
+        return _keras_weight_bytes(self.model)
+
+
+class TFLiteBackend(InferenceBackend):
+    """TFLite 로 변환한 모델, quantization 은 none / dynamic(가중치 int8) / float16
+
+    Interpreter 는 스레드 안전하지 않으므로 추론 워커 스레드마다 하나씩 만든다.
+    """
+
+    name = "tflite"
+
+    def __init__(self, model, quantization: str = "none", num_threads: Optional[int] = None):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"지원하지 않는 TFLite 양자화 방식: {quantization}")
+        self.quantization = quantization
+        self.num_threads = num_threads
+
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        if quantization != "none":
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if quantization == "float16":
+            converter.target_spec.supported_types = [tf.float16]
+        self.model_content = converter.convert()
+        self._local = threading.local()
+
+    def _interpreter(self, batch_size: int):
+        interpreter = getattr(self._local, "interpreter", None)
+        if interpreter is None:
+            interpreter = tf.lite.Interpreter(model_content=self.model_content, num_threads=self.num_threads)
+            self._local.interpreter = interpreter
+            self._local.batch_size = None
+
+        if self._local.batch_size != batch_size:
+            input_index = interpreter.get_input_details()[0]["index"]
+            interpreter.resize_tensor_input(input_index, [batch_size, *interpreter.get_input_details()[0]["shape"][1:]])
+            interpreter.allocate_tensors()
+            self._local.batch_size = batch_size
+        return interpreter
+
+    def predict(self, inputs: np.ndarray) -> np.ndarray:
+        interpreter = self._interpreter(len(inputs))
+        interpreter.set_tensor(interpreter.get_input_details()[0]["index"], np.ascontiguousarray(inputs, dtype=np.float32))
+        interpreter.invoke()
+        return interpreter.get_tensor(interpreter.get_output_details()[0]["index"]).copy()
+
+    def describe(self) -> dict:
+        return {"backend": self.name, "quantization": self.quantization, "modelBytes": len(self.model_content)}
+
+    def weight_bytes(self) -> int:
+        return len(self.model_content)
+
+
+def create_backend(model, name: str = "keras", jit_compile: bool = False, quantization: str = "none",
+                   batch_buckets: Sequence[int] = (1, 2, 4, 8)) -> InferenceBackend:
+    if name == "keras":
+        return KerasBackend(model)
+    if name == "compiled":
+        return CompiledBackend(model, jit_compile=jit_compile, batch_buckets=batch_buckets)
+    if name == "tflite":
+        return TFLiteBackend(model, quantization=quantization)
+    raise ValueError(f"지원하지 않는 추론 백엔드: {name} (가능: {', '.join(BACKENDS)})")
+
+
+class ParityReport(NamedTuple):
+    samples: int
+    max_abs_diff: float
+    mean_abs_diff: float
+    decision_agreement: float  # 0.5 기준 졸음 판정이 원본과 같은 비율
+
+    def passed(self, tolerance: float) -> bool:
+        return self.max_abs_diff <= tolerance
+
+
+def load_parity_samples(input_shape: Sequence[int], path: Optional[str] = None, count: int = 4) -> np.ndarray:
+    """일치 검사용 입력, path(.npy, 전처리된 (n, 48, 145, 145, 3) 배열)가 없으면 고정 시드의 무작위 입력"""
+    if path:
+        return np.load(path).astype(np.float32, copy=False)
+    rng = np.random.default_rng(0)
+    return rng.random((count, *input_shape), dtype=np.float32)
+
+
+def check_parity(reference: InferenceBackend, candidate: InferenceBackend, samples: np.ndarray,
+                 threshold: float = 0.5) -> ParityReport:
+    expected = np.asarray(reference.predict(samples), dtype=np.float32).reshape(len(samples), -1)
+    actual = np.asarray(candidate.predict(samples), dtype=np.float32).reshape(len(samples), -1)
+    diff = np.abs(expected - actual)
+    agreement = np.mean((expected[:, 0] > threshold) == (actual[:, 0] > threshold))
+    return ParityReport(len(samples), float(diff.max()), float(diff.mean()), float(agreement))
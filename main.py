@@ -1,46 +1,200 @@
 from pathlib import Path
 import sys
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import time
 module_path = Path(__file__).parent
 sys.path.append(str(module_path))
 
+import config
+
+if __name__ == "__main__" and config.SERVER_MODE == "gateway":
+    # 게이트웨이는 진단 서버(모델, 프레임 저장소, 실행기)를 만들지 않도록 아래 서버 모듈을 import 하기 전에 분기
+    from gateway import run_gateway
+    run_gateway()
+    sys.exit(0)
+
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
-from api.frame.frame_routes import router as frame_router
-from api.diagnosis.diagnosis_routes import router as diagnosis_router
+from api.frame.frame_routes import router as frame_router, decode_executor, uid_queues, recorder, decode_image_bytes
+from api.stream.stream_routes import router as stream_router
+from api.metrics.metrics_routes import router as metrics_router
+from api.diagnosis.diagnosis_routes import router as diagnosis_router, preprocess_input_data, FRAME_COUNT
+from api.frame.TimedQueue import FRAME_SHAPE
+from api.frame.SharedFrameStore import SharedFrameStore
+from api.diagnosis.BatchScheduler import BatchScheduler
+from api.diagnosis.DiagnosisCache import DiagnosisCache
+from api.diagnosis.ContinuousDiagnosis import ContinuousDiagnosis
+from api.diagnosis.ChangeDetector import ChangeDetector
 from utils.helper import get_logger
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
-from utils.logging_middleware import log_request
+from utils.logging_middleware import LoggingMiddleware, BodyLogPolicy
+from utils.bounded_executor import BoundedExecutor
+from utils.tracing import TraceStore
 from utils.exception_handlers import validation_exception_handler, http_exception_handler, generic_exception_handler
 
-from model_loader import load_model
+from api.health.health_routes import router as health_router
+from api.admin.admin_routes import router as admin_router
+from model_loader import model_status, batch_buckets
+from model_registry import ModelRegistry
+from window_snapshot import save_window_snapshot, restore_window_snapshot
 
 logger = get_logger(__name__)
+app_import_started = time.perf_counter()
 app = FastAPI()
-app.add_middleware(BaseHTTPMiddleware, dispatch=log_request)
+app.state.traces = TraceStore(threshold_ms=config.TRACE_SLOW_REQUEST_MS, max_traces=config.TRACE_MAX_TRACES)
+app.add_middleware(
+    LoggingMiddleware,
+    policies={path: BodyLogPolicy(**policy) for path, policy in config.LOG_BODY_POLICIES.items()},
+    default_policy=BodyLogPolicy(**config.LOG_BODY_DEFAULT),
+    traces=app.state.traces,
+)
+app.state.profiler = None
+app.state.model = None
+app.state.model_status = model_status
+app.state.inference_executor = BoundedExecutor(
+    "inference",
+    max_workers=config.INFERENCE_WORKERS,
+    max_pending=config.INFERENCE_MAX_PENDING,
+)
+app.state.batch_scheduler = BatchScheduler(
+    lambda: app.state.model,
+    app.state.inference_executor,
+    preprocess_input_data,
+    (FRAME_COUNT, *FRAME_SHAPE),
+    max_batch_size=config.INFERENCE_MAX_BATCH_SIZE,
+    max_wait_seconds=config.INFERENCE_MAX_WAIT_MS / 1000,
+)
+app.state.model_registry = ModelRegistry(
+    app.state.inference_executor,
+    (FRAME_COUNT, *FRAME_SHAPE),
+    batch_buckets(config.INFERENCE_MAX_BATCH_SIZE),
+    on_activate=lambda model: activate_model(model),
+    status=model_status,
+)
+app.state.diagnosis_cache = DiagnosisCache()
+
+def activate_model(model):
+    app.state.model = model
+    # 이전 버전이 계산한 결과가 캐시 적중으로 반환되지 않도록 비움
+    app.state.diagnosis_cache.clear()
+    for _, queue in uid_queues.items():
+        queue.clear_result()
+
+uid_queues.add_eviction_listener(app.state.diagnosis_cache.discard)
+app.state.continuous_diagnosis = None
+if config.CONTINUOUS_DIAGNOSIS_ENABLED:
+    app.state.continuous_diagnosis = ContinuousDiagnosis(
+        app,
+        uid_queues,
+        stride=config.CONTINUOUS_DIAGNOSIS_STRIDE,
+        interval_seconds=config.CONTINUOUS_DIAGNOSIS_INTERVAL_MS / 1000,
+        max_in_flight=config.CONTINUOUS_DIAGNOSIS_MAX_IN_FLIGHT,
+    )
+    uid_queues.add_eviction_listener(app.state.continuous_diagnosis.discard)
+
+app.state.change_detector = None
+if config.DIAGNOSIS_SKIP_ENABLED:
+    app.state.change_detector = ChangeDetector(
+        threshold=config.DIAGNOSIS_SKIP_THRESHOLD,
+        max_age_seconds=config.DIAGNOSIS_SKIP_MAX_AGE_SECONDS,
+        seconds_per_diagnosis=app.state.batch_scheduler.seconds_per_request,
+    )
 
 app.include_router(frame_router, tags=["진단용 이미지 저장"])
 app.include_router(diagnosis_router, tags=["진단 결과 조회"])
+app.include_router(stream_router, tags=["실시간 스트리밍"])
+app.include_router(metrics_router, tags=["모니터링"])
+app.include_router(health_router, tags=["모니터링"])
+app.include_router(admin_router, tags=["관리"])
 
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(StarletteHTTPException, http_exception_handler)
 app.add_exception_handler(Exception, generic_exception_handler)
 
-async def load_model_async():
-    loop = asyncio.get_running_loop()
-    with ThreadPoolExecutor() as pool:
-        model = await loop.run_in_executor(pool, load_model)
-    return model
-
 @app.on_event("startup")
 async def startup_event():
-    app.state.model = await load_model_async()
+    app.state.model_status.timings["server"] = round(time.perf_counter() - app_import_started, 3)
+    app.state.device_sweeper = asyncio.create_task(uid_queues.run_sweeper(config.DEVICE_SWEEP_INTERVAL_SECONDS))
+    # 모델 로드를 기다리지 않고 바로 요청을 받음, 로드 중 진단 요청은 503 model_loading
+    app.state.model_loader = asyncio.create_task(app.state.model_registry.reload(config.MODEL_PATH))
+    app.state.model_watcher = None
+    if config.MODEL_WATCH_INTERVAL_SECONDS > 0:
+        app.state.model_watcher = asyncio.create_task(
+            app.state.model_registry.run_watcher(config.MODEL_PATH, config.MODEL_WATCH_INTERVAL_SECONDS))
+    app.state.continuous_diagnosis_task = None
+    if app.state.continuous_diagnosis is not None:
+        app.state.continuous_diagnosis_task = asyncio.create_task(app.state.continuous_diagnosis.run())
+    # 모델 로드(추론 실행기 스레드)와 동시에 이전 프로세스가 남긴 윈도우를 복원
+    app.state.window_restorer = None
+    if window_snapshot_enabled():
+        app.state.window_restorer = asyncio.create_task(restore_windows())
+
+def window_snapshot_enabled() -> bool:
+    # 공유 메모리 저장소는 워커가 재시작되어도 마스터 프로세스에 윈도우가 남아 있음
+    return bool(config.WINDOW_SNAPSHOT_DIR) and not isinstance(uid_queues, SharedFrameStore)
+
+async def restore_windows():
+    try:
+        result = await restore_window_snapshot(uid_queues, config.WINDOW_SNAPSHOT_DIR, decoder=decode_image_bytes,
+                                              executor=decode_executor)
+    except Exception as e:
+        logger.error(f"윈도우 스냅샷 복원 실패: {str(e)}")
+        return
+    if result["devices"] or result["expired"]:
+        logger.info(f"윈도우 스냅샷 복원: {result}")
+
+async def drain_executors():
+    """진행 중인 프레임 저장(디코딩)과 진단(추론)이 끝나기를 기다림"""
+    executors = (decode_executor, app.state.inference_executor)
+    drained = await asyncio.gather(*(executor.drain(config.SHUTDOWN_DRAIN_SECONDS) for executor in executors))
+    for executor, done in zip(executors, drained):
+        if not done:
+            logger.warning(f"{executor.name} 실행기 작업이 {config.SHUTDOWN_DRAIN_SECONDS}초 안에 끝나지 않은 상태로 종료: "
+                           f"{executor.stats()}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    app.state.device_sweeper.cancel()
+    app.state.model_loader.cancel()
+    if app.state.model_watcher is not None:
+        app.state.model_watcher.cancel()
+    if app.state.continuous_diagnosis_task is not None:
+        app.state.continuous_diagnosis_task.cancel()
+        app.state.continuous_diagnosis.close()
+    if app.state.window_restorer is not None:
+        app.state.window_restorer.cancel()
+    await drain_executors()
+    if window_snapshot_enabled():
+        try:
+            result = save_window_snapshot(uid_queues, config.WINDOW_SNAPSHOT_DIR)
+            logger.info(f"윈도우 스냅샷 저장: {result}")
+        except Exception as e:
+            logger.error(f"윈도우 스냅샷 저장 실패: {str(e)}")
+    app.state.inference_executor.shutdown()
+    decode_executor.shutdown()
+    if recorder is not None:
+        recorder.close()
 
 def main():
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    if config.SERVER_MODE != "server":
+        raise ValueError(f"지원하지 않는 실행 방식: {config.SERVER_MODE}")
+
+    workers = config.SERVER_WORKERS
+    if workers > 1 and not isinstance(uid_queues, SharedFrameStore):
+        logger.warning(f"FRAME_STORE_BACKEND={config.FRAME_STORE_BACKEND} 는 워커 간 프레임을 공유하지 않아 워커 1개로 실행")
+        workers = 1
+
+    try:
+        if workers > 1:
+            # 워커는 main:app 을 import 하며 마스터가 만든 공유 메모리 세그먼트에 붙음
+            uvicorn.run("main:app", host="0.0.0.0", port=config.SERVER_PORT, workers=workers,
+                        timeout_graceful_shutdown=config.SHUTDOWN_DRAIN_SECONDS)
+        else:
+            uvicorn.run(app, host="0.0.0.0", port=config.SERVER_PORT, timeout_graceful_shutdown=config.SHUTDOWN_DRAIN_SECONDS)
+    finally:
+        if isinstance(uid_queues, SharedFrameStore):
+            uid_queues.unlink()
 
 if __name__ == "__main__":
     main()
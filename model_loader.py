@@ -1,13 +1,110 @@
 import os
-import tensorflow as tf
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Sequence
+import numpy as np
 from utils.helper import get_logger
+import config
+
+# TensorFlow 는 import 만으로 수 초가 걸리므로 모듈 최상단에서 import 하지 않음
+# (HTTP/프레임 저장 쪽이 먼저 뜨고, 모델은 백그라운드에서 로드)
 
 logger = get_logger(__name__)
 
+
+class ModelStatus:
+    """모델 로드 진행 상태와 단계별(import/load/warmup) 소요 시간, /readyz 와 진단 요청의 503 판단에 사용"""
+
+    PENDING = "pending"
+    LOADING = "loading"
+    WARMING_UP = "warming_up"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __init__(self):
+        self.state = self.PENDING
+        self.timings = {}
+        self.error: Optional[str] = None
+
+    @property
+    def loading(self) -> bool:
+        return self.state in (self.LOADING, self.WARMING_UP)
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round(time.perf_counter() - start, 3)
+
+    def fail(self, error: Exception):
+        self.state = self.FAILED
+        self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> dict:
+        return {"state": self.state, "timings": dict(self.timings), "error": self.error}
+
+
+model_status = ModelStatus()
+
+
+def import_inference_runtime():
+    import tensorflow  # noqa: F401
+    import inference_backends  # noqa: F401
+
 def load_model(model_path: str = "./models/team12.h5"):
+    import tensorflow as tf
+
     if not os.path.exists(model_path):
         raise FileNotFoundError(f"해당 경로에서 모델을 찾을 수 없음 {model_path}")
 
     model = tf.keras.models.load_model(model_path)
     logger.info("모델 로드 성공")
     return model
+
+def load_inference_backend(model_path: str = config.MODEL_PATH, backend: str = config.INFERENCE_BACKEND):
+    """모델을 로드해 설정된 추론 백엔드로 감쌈, 원본 모델과 결과가 다르면 keras 백엔드로 대체"""
+    from inference_backends import KerasBackend, create_backend, load_parity_samples, check_parity
+
+    model = load_model(model_path)
+    reference = KerasBackend(model)
+    if backend == "keras":
+        return reference
+
+    candidate = create_backend(
+        model,
+        backend,
+        jit_compile=config.INFERENCE_XLA,
+        quantization=config.INFERENCE_TFLITE_QUANTIZATION,
+        batch_buckets=batch_buckets(config.INFERENCE_MAX_BATCH_SIZE),
+    )
+    samples = load_parity_samples(model.input_shape[1:], config.INFERENCE_PARITY_SAMPLES, config.INFERENCE_PARITY_COUNT)
+    report = check_parity(reference, candidate, samples)
+    logger.info(f"추론 백엔드 일치 검사 {candidate.describe()}: {report._asdict()}")
+
+    if not report.passed(config.INFERENCE_PARITY_TOLERANCE):
+        logger.error(f"추론 백엔드 {backend} 결과가 원본과 허용 오차({config.INFERENCE_PARITY_TOLERANCE}) 이상 달라 keras 백엔드 사용")
+        return reference
+    return candidate
+
+def warm_up(model, input_shape: Sequence[int], batch_sizes: Sequence[int], barrier: Optional[threading.Barrier] = None):
+    """추론 워커 스레드에서 배치 크기별로 한 번씩 predict, 그래프 추적/텐서 할당 비용을 실제 요청 전에 치름
+
+    barrier 로 모든 워커 스레드가 동시에 들어오게 해 스레드별 상태(TFLite Interpreter 등)도 미리 만든다.
+    """
+    if barrier is not None:
+        try:
+            barrier.wait(timeout=30)
+        except threading.BrokenBarrierError:
+            pass
+
+    for batch_size in batch_sizes:
+        model.predict(np.zeros((batch_size, *input_shape), dtype=np.float32))
+
+def batch_buckets(max_batch_size: int):
+    buckets = [1]
+    while buckets[-1] < max_batch_size:
+        buckets.append(min(buckets[-1] * 2, max_batch_size))
+    return buckets
@@ -0,0 +1,243 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from model_loader import ModelStatus, import_inference_runtime, load_inference_backend, warm_up
+from utils.bounded_executor import BoundedExecutor
+from utils.helper import get_logger
+from utils.metrics import Histogram, CallbackGauge, MetricsRegistry, registry as default_metrics_registry
+
+logger = get_logger(__name__)
+
+MODEL_PREDICT_SECONDS = Histogram("model_predict_seconds", "모델 버전별 배치 predict 시간", ["version"])
+
+
+def model_version_name(model_path: str) -> str:
+    """파일 내용 기준 버전 이름 (파일명-sha256 앞 12자리), 같은 파일을 다시 올리면 같은 버전"""
+    digest = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return f"{Path(model_path).stem}-{digest.hexdigest()[:12]}"
+
+
+def _rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class VersionStats:
+    """모델 버전 하나의 로드 정보와 추론 지연 시간 집계, 버전이 교체된 뒤에도 비교용으로 남음"""
+
+    def __init__(self, version: str, path: str, backend: dict, weight_bytes: Optional[int],
+                 rss_delta_bytes: Optional[int], timings: Dict[str, float]):
+        self.version = version
+        self.path = path
+        self.backend = backend
+        self.weight_bytes = weight_bytes
+        self.rss_delta_bytes = rss_delta_bytes
+        self.timings = timings
+        self.loaded_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.state = "loaded"
+
+        self.batches = 0
+        self.rows = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, rows: int, seconds: float):
+        with self._lock:
+            self.batches += 1
+            self.rows += rows
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+        MODEL_PREDICT_SECONDS.labels(self.version).observe(seconds)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            batches, rows, total, maximum = self.batches, self.rows, self.total_seconds, self.max_seconds
+        return {
+            "version": self.version,
+            "path": self.path,
+            "state": self.state,
+            "loadedAt": self.loaded_at,
+            "backend": self.backend,
+            "weightBytes": self.weight_bytes,
+            "rssDeltaBytes": self.rss_delta_bytes,
+            "timings": self.timings,
+            "batches": batches,
+            "rows": rows,
+            "avgBatchMs": round(total / batches * 1000, 3) if batches else 0.0,
+            "avgRowMs": round(total / rows * 1000, 3) if rows else 0.0,
+            "maxBatchMs": round(maximum * 1000, 3),
+        }
+
+
+class VersionedModel:
+    """app.state.model 에 들어가는 모델, 추론 백엔드를 감싸 버전별 지연 시간을 기록
+
+    교체된 뒤에도 이미 배치를 시작한 요청은 이 객체를 들고 있으므로 이전 버전으로 끝까지 처리된다.
+    """
+
+    def __init__(self, backend, stats: VersionStats):
+        self.backend = backend
+        self.stats = stats
+
+    @property
+    def version(self) -> str:
+        return self.stats.version
+
+    def predict(self, inputs: np.ndarray) -> np.ndarray:
+        start = time.perf_counter()
+        predictions = self.backend.predict(inputs)
+        self.stats.record(len(inputs), time.perf_counter() - start)
+        return predictions
+
+    def describe(self) -> dict:
+        return {**self.backend.describe(), "version": self.version}
+
+
+class ModelRegistry:
+    """모델 버전 로드 → warm-up → app.state.model 교체를 담당, 교체 중에도 이전 버전으로 계속 진단"""
+
+    def __init__(self, executor: BoundedExecutor, input_shape: Sequence[int], batch_sizes: Sequence[int],
+                 on_activate: Callable[[VersionedModel], None], status: Optional[ModelStatus] = None,
+                 metrics_registry: MetricsRegistry = default_metrics_registry):
+        self.executor = executor
+        self.input_shape = tuple(input_shape)
+        self.batch_sizes = list(batch_sizes)
+        self.on_activate = on_activate
+        # 첫 버전이 활성화되기 전까지는 서버 준비 상태(/readyz)로도 쓰임
+        self.status = status or ModelStatus()
+
+        self.active: Optional[VersionedModel] = None
+        self.versions: Dict[str, VersionStats] = {}
+        self.reload_status: Optional[ModelStatus] = None
+        self._reload_lock = asyncio.Lock()
+
+        CallbackGauge("model_active_version", "현재 진단에 사용 중인 모델 버전", ["version"],
+                      lambda: {(self.active.version, ): 1} if self.active else {}, metrics_registry=metrics_registry)
+        CallbackGauge("model_weight_bytes", "모델 버전별 가중치 크기(바이트)", ["version"],
+                      lambda: {(version, ): stats.weight_bytes for version, stats in list(self.versions.items())
+                               if stats.weight_bytes is not None}, metrics_registry=metrics_registry)
+
+    @property
+    def reloading(self) -> bool:
+        return self._reload_lock.locked()
+
+    async def load(self, model_path: str, status: ModelStatus) -> VersionedModel:
+        """import → 로드 → warm-up, 활성화는 하지 않음
+
+        첫 로드 중에는 진단 요청이 추론 실행기를 쓰지 않으므로 모든 추론 워커에서 동시에 warm-up 해 스레드별 상태까지 만든다.
+        교체(reload) 중에는 실행 중이거나 대기 중인 배치를 막지 않도록 추론 워커 대신 로드용 스레드에서 warm-up 하고,
+        추론 워커의 스레드별 상태(TFLite Interpreter 등)는 교체 후 첫 배치에서 만들어진다.
+        """
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-load") as pool:
+            with status.stage("import"):
+                await loop.run_in_executor(pool, import_inference_runtime)
+            with status.stage("load"):
+                version, backend, rss_delta = await loop.run_in_executor(pool, self._load_backend, model_path)
+
+            status.state = ModelStatus.WARMING_UP
+            with status.stage("warmup"):
+                if self.active is None:
+                    barrier = threading.Barrier(self.executor.max_workers)
+                    await asyncio.gather(*(
+                        self.executor.run(warm_up, backend, self.input_shape, self.batch_sizes, barrier)
+                        for _ in range(self.executor.max_workers)
+                    ))
+                else:
+                    await loop.run_in_executor(pool, warm_up, backend, self.input_shape, self.batch_sizes)
+
+        stats = VersionStats(version, model_path, backend.describe(), backend.weight_bytes(), rss_delta, dict(status.timings))
+        self.versions[version] = stats
+        return VersionedModel(backend, stats)
+
+    @staticmethod
+    def _load_backend(model_path: str):
+        version = model_version_name(model_path)
+        rss_before = _rss_bytes()
+        backend = load_inference_backend(model_path)
+        rss_after = _rss_bytes()
+        rss_delta = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+        return version, backend, rss_delta
+
+    def activate(self, model: VersionedModel):
+        previous = self.active
+        self.active = model
+        model.stats.state = "active"
+        if previous is not None and previous.stats is not model.stats:
+            previous.stats.state = "retired"
+        self.on_activate(model)
+        logger.info(f"모델 버전 활성화: {model.version} (이전: {previous.version if previous else None})")
+
+    async def reload(self, model_path: str, force: bool = False) -> Optional[VersionedModel]:
+        """새 버전을 로드해 교체, 실패하면 기존 버전을 유지하고 None 반환 (예외를 올리지 않음)"""
+        async with self._reload_lock:
+            status = self.status if self.active is None else ModelStatus()
+            status.state = ModelStatus.LOADING
+            self.reload_status = status
+            try:
+                if not force and self.active is not None:
+                    version = await asyncio.get_running_loop().run_in_executor(None, model_version_name, model_path)
+                    if version == self.active.version:
+                        logger.info(f"모델 파일 내용이 현재 버전({version})과 같아 교체하지 않음")
+                        status.state = ModelStatus.READY
+                        return self.active
+
+                model = await self.load(model_path, status)
+            except Exception as e:
+                status.fail(e)
+                logger.error(f"모델 로드 실패, 기존 버전 유지 ({self.active.version if self.active else None}): {status.error}")
+                return None
+
+            self.activate(model)
+            status.state = ModelStatus.READY
+            logger.info(f"모델 버전 {model.version} 로드 완료, 단계별 소요 시간(초): {status.timings}")
+            return model
+
+    async def run_watcher(self, model_path: str, interval_seconds: float):
+        """모델 파일의 mtime/크기 변경을 주기적으로 확인해 reload, 복사 중인 파일은 한 주기 더 기다림"""
+        last = _file_signature(model_path)
+        while True:
+            await asyncio.sleep(interval_seconds)
+            signature = _file_signature(model_path)
+            if signature is None or signature == last:
+                continue
+
+            await asyncio.sleep(interval_seconds)
+            if _file_signature(model_path) != signature:
+                continue
+
+            last = signature
+            logger.info(f"모델 파일 변경 감지: {model_path}")
+            await self.reload(model_path)
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active.version if self.active else None,
+            "reloading": self.reloading,
+            "lastReload": self.reload_status.to_dict() if self.reload_status else None,
+            "versions": [stats.to_dict() for stats in self.versions.values()],
+        }
@@ -0,0 +1,227 @@
+"""디바이스 프레임 스트림 기록과 재생용 세그먼트 파일
+
+기록 디렉터리에는 세그먼트마다 두 파일이 생긴다.
+  segment-000001.dat : 미리 크기를 잡아 둔 mmap 데이터 파일, 레코드마다 deviceUid 바이트 + 페이로드(이미지)를 이어 붙임
+                       (닫을 때 실제 사용한 길이로 잘라냄)
+  segment-000001.idx : 고정 길이(INDEX_DTYPE) 색인 레코드를 이어 붙인 파일, np.fromfile / np.memmap 으로 바로 읽음
+
+요청 처리 경로에서는 레코드를 큐에 넣기만 하고(가득 차면 버리고 dropped 집계) 파일 쓰기는 별도 스레드가 한다.
+"""
+import atexit
+import mmap
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, Union
+
+import numpy as np
+
+from utils.helper import get_logger
+from utils.metrics import Counter
+
+logger = get_logger(__name__)
+
+RECORDED_FRAMES_TOTAL = Counter("recorded_frames_total", "프레임 스트림 기록 결과 (recorded, dropped)", ["outcome"])
+
+# 레코드 종류
+KIND_FRAME_BASE64, KIND_FRAME_RAW, KIND_DIAGNOSIS = 1, 2, 3
+
+INDEX_DTYPE = np.dtype([
+    ("kind", np.uint8),
+    ("result", np.int8),      # 진단 결과 (1 졸음, 0 정상, -1 없음/오류)
+    ("status", np.int16),     # 진단 응답 HTTP 상태 코드, 프레임은 0
+    ("uid_length", np.int32),
+    ("frame_idx", np.int64),
+    ("time_ns", np.int64),    # 도착 시각 time.time_ns()
+    ("offset", np.int64),     # 데이터 파일 안에서 deviceUid 가 시작하는 위치
+    ("length", np.int64),     # 페이로드 길이
+])
+
+
+class Record(NamedTuple):
+    kind: int
+    device_uid: str
+    frame_idx: int
+    time_ns: int
+    status: int
+    result: int
+    payload: bytes
+
+
+class SegmentWriter:
+    """세그먼트 하나(데이터 + 색인 파일)에 레코드를 이어 씀, 기록 스레드에서만 사용"""
+
+    def __init__(self, directory: Path, number: int, size_bytes: int):
+        self.data_path = directory / f"segment-{number:06d}.dat"
+        self.index_path = directory / f"segment-{number:06d}.idx"
+        self.size_bytes = size_bytes
+
+        self._data_file = open(self.data_path, "w+b")
+        self._data_file.truncate(size_bytes)
+        self._data = mmap.mmap(self._data_file.fileno(), size_bytes)
+        self._index_file = open(self.index_path, "wb")
+        self._offset = 0
+        self.records = 0
+
+    def fits(self, nbytes: int) -> bool:
+        return self._offset + nbytes <= self.size_bytes
+
+    def append(self, kind: int, device_uid: bytes, frame_idx: int, time_ns: int, status: int, result: int, payload: bytes):
+        offset = self._offset
+        self._data[offset:offset + len(device_uid)] = device_uid
+        self._data[offset + len(device_uid):offset + len(device_uid) + len(payload)] = payload
+        self._offset += len(device_uid) + len(payload)
+
+        entry = np.array([(kind, result, status, len(device_uid), frame_idx, time_ns, offset, len(payload))], dtype=INDEX_DTYPE)
+        self._index_file.write(entry.tobytes())
+        self.records += 1
+
+    def flush(self):
+        self._index_file.flush()
+
+    def close(self):
+        self._data.flush()
+        self._data.close()
+        self._data_file.truncate(self._offset)
+        self._data_file.close()
+        self._index_file.close()
+
+
+class FrameRecorder:
+    """수신한 프레임과 진단 결과를 세그먼트 파일에 기록 (opt-in, RECORD_ENABLED)
+
+    record_frame / record_diagnosis 는 이벤트 루프에서 호출되며 큐에 넣기만 한다.
+    세그먼트가 segment_bytes 를 넘으면 새 세그먼트로 넘어간다.
+    """
+
+    def __init__(self, directory: Union[str, Path], segment_bytes: int = 256 << 20, max_pending: int = 1024,
+                 flush_interval_seconds: float = 1.0):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.flush_interval_seconds = flush_interval_seconds
+
+        self._pending: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max_pending)
+        self._segment: Optional[SegmentWriter] = None
+        self._next_segment = self._first_segment_number()
+        self._recorded = 0
+        self._dropped = 0
+        self._bytes = 0
+        self._segments = 0
+
+        self._thread = threading.Thread(target=self._run, name="frame-recorder", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _first_segment_number(self) -> int:
+        # 같은 디렉터리에 이전 기록이 있으면 이어서 번호를 매김
+        numbers = [int(path.stem.split("-")[1]) for path in self.directory.glob("segment-*.idx")]
+        return max(numbers, default=0) + 1
+
+    def record_frame(self, device_uid: str, frame_idx: int, payload: Union[str, bytes], arrived_ns: Optional[int] = None):
+        """payload 가 str 이면 base64(data URL 접두어 포함 가능), bytes 면 이미지 바이트 그대로
+
+        저장이 끝난 뒤 기록하는 경우 arrived_ns 로 요청 도착 시각(time.time_ns())을 넘겨 재생 간격을 맞춘다.
+        """
+        kind = KIND_FRAME_BASE64 if isinstance(payload, str) else KIND_FRAME_RAW
+        self._offer((kind, device_uid, frame_idx, time.time_ns() if arrived_ns is None else arrived_ns, 0, -1, payload))
+
+    def record_diagnosis(self, device_uid: str, status: int, is_drowsiness_drive: Optional[bool]):
+        result = -1 if is_drowsiness_drive is None else int(is_drowsiness_drive)
+        self._offer((KIND_DIAGNOSIS, device_uid, -1, time.time_ns(), status, result, b""))
+
+    def _offer(self, item: tuple):
+        try:
+            self._pending.put_nowait(item)
+        except queue.Full:
+            self._dropped += 1
+            RECORDED_FRAMES_TOTAL.labels("dropped").inc()
+
+    def _run(self):
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self._pending.get(timeout=self.flush_interval_seconds)
+            except queue.Empty:
+                item = ()
+            if item is None:
+                break
+            if item:
+                try:
+                    self._write(*item)
+                except Exception as e:
+                    logger.error(f"프레임 기록 중 오류: {str(e)}")
+            if self._segment is not None and time.monotonic() - last_flush >= self.flush_interval_seconds:
+                self._segment.flush()
+                last_flush = time.monotonic()
+
+        if self._segment is not None:
+            self._segment.close()
+
+    def _write(self, kind: int, device_uid: str, frame_idx: int, time_ns: int, status: int, result: int,
+               payload: Union[str, bytes]):
+        uid = device_uid.encode("utf-8")
+        data = payload.encode("ascii") if isinstance(payload, str) else payload
+        nbytes = len(uid) + len(data)
+        if self._segment is None or not self._segment.fits(nbytes):
+            if self._segment is not None:
+                self._segment.close()
+            self._segment = SegmentWriter(self.directory, self._next_segment, max(self.segment_bytes, nbytes))
+            self._next_segment += 1
+            self._segments += 1
+
+        self._segment.append(kind, uid, frame_idx, time_ns, status, result, data)
+        self._recorded += 1
+        self._bytes += nbytes
+        RECORDED_FRAMES_TOTAL.labels("recorded").inc()
+
+    def close(self, timeout_seconds: float = 5.0):
+        """남은 레코드를 모두 쓰고 세그먼트를 닫음"""
+        if not self._thread.is_alive():
+            return
+        self._pending.put(None)
+        self._thread.join(timeout_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "directory": str(self.directory),
+            "pending": self._pending.qsize(),
+            "recorded": self._recorded,
+            "dropped": self._dropped,
+            "bytes": self._bytes,
+            "segments": self._segments,
+        }
+
+
+def read_segment(index_path: Union[str, Path]) -> Iterator[Record]:
+    """색인 파일 하나의 레코드를 기록 순서대로 읽음, 데이터 파일은 mmap 으로 필요한 부분만 읽음"""
+    index_path = Path(index_path)
+    index = np.fromfile(index_path, dtype=INDEX_DTYPE)
+    data_path = index_path.with_suffix(".dat")
+    if not len(index) or os.path.getsize(data_path) == 0:
+        return
+
+    with open(data_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for entry in index:
+            offset, uid_length, length = int(entry["offset"]), int(entry["uid_length"]), int(entry["length"])
+            # 비정상 종료로 데이터보다 색인이 앞선 레코드는 건너뜀
+            if offset + uid_length + length > len(data):
+                break
+            yield Record(
+                kind=int(entry["kind"]),
+                device_uid=data[offset:offset + uid_length].decode("utf-8"),
+                frame_idx=int(entry["frame_idx"]),
+                time_ns=int(entry["time_ns"]),
+                status=int(entry["status"]),
+                result=int(entry["result"]),
+                payload=data[offset + uid_length:offset + uid_length + length],
+            )
+
+
+def read_recording(directory: Union[str, Path]) -> List[Record]:
+    """디렉터리의 모든 세그먼트 레코드를 도착 시각 순으로 반환"""
+    records = [record for index_path in sorted(Path(directory).glob("segment-*.idx")) for record in read_segment(index_path)]
+    records.sort(key=lambda record: record.time_ns)
+    return records
@@ -0,0 +1,85 @@
+import base64
+import pytest
+from httpx import AsyncClient
+from httpx import ASGITransport
+from main import app
+from api.frame import frame_routes
+from api.frame.AdmissionController import AdmissionController, base64_decoded_size
+from utils.bounded_executor import BoundedExecutor
+from utils.exception_handlers import ErrorForm
+
+
+def create_controller(**kwargs):
+    return AdmissionController(BoundedExecutor("test_decode", max_workers=1, max_pending=4), **kwargs)
+
+
+def test_token_bucket_limits_each_device(monkeypatch): # 디바이스별 token bucket 테스트
+    now = [100.0]
+    monkeypatch.setattr("api.frame.AdmissionController.time.monotonic", lambda: now[0])
+    controller = create_controller(device_rate=10, device_burst=3)
+
+    controller.acquire("a", 3)
+    with pytest.raises(ErrorForm) as exc_info:
+        controller.acquire("a")
+    assert exc_info.value.code == 429
+    controller.acquire("b")  # 다른 디바이스는 영향 없음
+
+    now[0] += 0.15  # 0.1초에 1 토큰 충전
+    controller.acquire("a")
+    assert controller.stats()["rate_limited"] == 1
+
+
+def test_size_limit_and_decode_budget(): # 디코딩 전 크기 제한과 전역 디코딩 예산 테스트
+    controller = create_controller(max_frame_bytes=100, decode_budget_bytes=150)
+    assert base64_decoded_size("data:image/jpeg;base64," + base64.b64encode(b"x" * 90).decode()) == 90
+
+    with pytest.raises(ErrorForm) as exc_info:
+        controller.check_size(101)
+    assert exc_info.value.code == 413
+
+    with controller.decode_budget(100):
+        with pytest.raises(ErrorForm) as exc_info:
+            with controller.decode_budget(100):
+                pass
+        assert exc_info.value.code == 503
+    with controller.decode_budget(200):  # 진행 중인 디코딩이 없으면 예산보다 커도 허용
+        pass
+
+
+def test_adaptive_drop_keeps_every_kth_frame(): # 디코딩 대기열 사용률에 따른 적응형 드롭 테스트
+    controller = create_controller(drop_start=0.5, max_keep_every=4)
+    assert controller.keep_every() == 1
+
+    reservations = [controller.decode_executor.reserve() for _ in range(4)]
+    for reservation in reservations:
+        reservation.__enter__()
+    try:
+        assert controller.keep_every() == 4
+        kept = [idx for idx in range(8) if not controller.should_drop(idx)]
+        assert kept == [0, 4]
+    finally:
+        for reservation in reservations:
+            reservation.__exit__(None, None, None)
+
+    assert controller.stats()["dropped"] == 6
+
+
+@pytest.mark.asyncio
+async def test_save_frame_rejects_oversized_and_flooding_devices(monkeypatch): # 라우트 입장 제어 테스트
+    controller = AdmissionController(frame_routes.decode_executor, device_rate=0.001, device_burst=1, max_frame_bytes=1000)
+    monkeypatch.setattr(frame_routes, "admission", controller)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        oversized = await ac.post("/api/save/frame", json={
+            "deviceUid": "admission_device", "frameIdx": 0, "driverFrame": base64.b64encode(b"x" * 2000).decode()})
+        first = await ac.post("/api/save/frame/raw", params={"deviceUid": "admission_device", "frameIdx": 1},
+                              content=b"not an image")
+        flooded = await ac.post("/api/save/frame/raw", params={"deviceUid": "admission_device", "frameIdx": 2},
+                                content=b"not an image")
+
+    assert oversized.status_code == 413
+    assert oversized.json()["error"]["message"] == "frame_too_large"
+    assert first.status_code == 422  # 입장은 허용되고 디코딩에서 실패
+    assert flooded.status_code == 429
+    assert flooded.json()["error"]["method"] == "save_raw_frame(입장 제어)"
@@ -0,0 +1,70 @@
+import time
+import pytest
+import numpy as np
+from httpx import AsyncClient
+from httpx import ASGITransport
+from main import app
+from api.diagnosis import diagnosis_routes
+from api.diagnosis.ChangeDetector import ChangeDetector
+from api.diagnosis.DiagnosisCache import CachedDiagnosis
+from api.frame.DeviceRegistry import DeviceRegistry
+from api.frame.TimedQueue import TimedQueue, FRAME_SHAPE, SIGNATURE_SHAPE
+
+
+class StubModel:
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, inputs):
+        self.calls += 1
+        return np.full((inputs.shape[0], 1), 0.9, dtype=np.float32)
+
+
+def create_entry(detector: ChangeDetector, signatures: np.ndarray, age_seconds: float = 0.0) -> CachedDiagnosis:
+    return CachedDiagnosis(0, False, "2026-01-01T00:00:00+00:00", time.monotonic() - age_seconds, detector.reference(signatures))
+
+
+def test_reusable_outcomes(): # 변화 없음/일부 구간 변화/재확인 주기 초과 판정 테스트
+    detector = ChangeDetector(threshold=3.0, max_age_seconds=10.0, seconds_per_diagnosis=lambda: 0.05)
+    still = np.full((48, *SIGNATURE_SHAPE), 100, dtype=np.uint8)
+    assert detector.reusable(None, still) is False
+    assert detector.reusable(create_entry(detector, still), still + 1) is True
+
+    # 마지막 1/8 구간만 바뀌어도 다시 추론
+    moved = still.copy()
+    moved[-6:] = 160
+    assert detector.reusable(create_entry(detector, still), moved) is False
+    assert detector.reusable(create_entry(detector, still, age_seconds=11), still) is False
+
+    stats = detector.stats()
+    assert (stats["skipped"], stats["changed"], stats["forced"], stats["no_reference"]) == (1, 1, 1, 1)
+    assert stats["estimatedSecondsSaved"] == pytest.approx(0.05)
+
+
+@pytest.mark.asyncio
+async def test_diagnosis_reuses_result_for_still_window(monkeypatch): # 윈도우가 거의 같으면 모델을 다시 돌리지 않는지 테스트
+    devices = DeviceRegistry(queue_factory=lambda: TimedQueue(maxsize=48, window_seconds=2, signatures=True))
+    monkeypatch.setattr(diagnosis_routes, "uid_queues", devices)
+    monkeypatch.setattr(app.state, "change_detector", ChangeDetector(threshold=3.0, max_age_seconds=10.0))
+    model = StubModel()
+    app.state.model = model
+
+    queue = devices.get_or_create("still_device")
+    frame = np.full(FRAME_SHAPE, 80, dtype=np.uint8)
+    await queue.put_many([(idx, frame) for idx in range(43)])
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        first = await ac.get("/api/diagnosis/drowiness", params={"deviceUid": "still_device"})
+        await queue.put((43, frame))
+        second = await ac.get("/api/diagnosis/drowiness", params={"deviceUid": "still_device"})
+        assert model.calls == 1
+        assert second.json()["detectionTime"] == first.json()["detectionTime"]
+
+        await queue.put_many([(idx, np.full(FRAME_SHAPE, 200, dtype=np.uint8)) for idx in range(44, 48)])
+        await ac.get("/api/diagnosis/drowiness", params={"deviceUid": "still_device"})
+        assert model.calls == 2
+
+        stats = (await ac.get("/api/diagnosis/stats")).json()["skip"]
+    assert stats["skipped"] == 1
+    assert stats["changed"] == 1
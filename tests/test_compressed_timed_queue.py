@@ -0,0 +1,92 @@
+import asyncio
+import base64
+import pytest
+import numpy as np
+from io import BytesIO
+from PIL import Image
+from httpx import AsyncClient
+from httpx import ASGITransport
+from main import app
+import config
+from api.frame import frame_routes
+from api.diagnosis import diagnosis_routes
+from api.frame.frame_routes import decode_image_bytes, validate_image_bytes
+from api.frame.DeviceRegistry import DeviceRegistry
+from api.frame.CompressedTimedQueue import CompressedTimedQueue
+from api.frame.TimedQueue import FRAME_SHAPE
+from utils.bounded_executor import BoundedExecutor
+from utils.exception_handlers import ErrorForm
+
+
+def create_jpeg(color) -> bytes:
+    buffered = BytesIO()
+    Image.new("RGB", (320, 240), color=color).save(buffered, format="JPEG")
+    return buffered.getvalue()
+
+
+class StubModel:
+    def predict(self, inputs):
+        return np.full((inputs.shape[0], 1), 0.9, dtype=np.float32)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_decodes_window_in_parallel(): # 압축 바이트로 보관하다 스냅샷 시점에 병렬 디코딩되는지 테스트
+    executor = BoundedExecutor("test_lazy_decode", max_workers=3, max_pending=4)
+    queue = CompressedTimedQueue(decode_image_bytes, executor, maxsize=48, window_seconds=2)
+    payloads = [create_jpeg((idx * 20, 0, 0)) for idx in range(10)]
+    queue.put_many_nowait(list(zip(range(10), payloads)))
+    assert queue.nbytes < 10 * np.prod(FRAME_SHAPE)
+
+    window = await queue.snapshot()
+    assert window.frame_indices.tolist() == list(range(10))
+    assert window.frames.shape == (10, *FRAME_SHAPE)
+    assert window.frames.dtype == np.uint8
+    assert abs(int(window.frames[5, 0, 0, 0]) - 100) <= 3
+    assert window.fingerprint == queue.fingerprint()
+    assert queue.decode_stats()["decoded"] == 10
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_expired_payloads_are_released(): # 만료된 프레임의 압축 바이트가 정리되는지 테스트
+    queue = CompressedTimedQueue(decode_image_bytes, maxsize=4, window_seconds=0.05)
+    empty_nbytes = queue.nbytes
+    queue.put_nowait((0, create_jpeg((0, 0, 0))))
+    assert queue.nbytes > empty_nbytes
+
+    await asyncio.sleep(0.1)
+    assert queue.qsize() == 0
+    assert queue.nbytes == empty_nbytes
+
+
+def test_validate_rejects_truncated_jpeg(): # 헤더만 확인하는 검증이 잘린 JPEG 를 거절하는지 테스트
+    data = create_jpeg((0, 0, 0))
+    assert validate_image_bytes(data) is data
+
+    with pytest.raises(ErrorForm) as e:
+        validate_image_bytes(data[:len(data) // 2])
+    assert e.value.code == 422
+
+
+@pytest.mark.asyncio
+async def test_lazy_mode_save_and_diagnose(monkeypatch): # lazy 모드에서 저장 후 진단까지 되는지 테스트
+    devices = DeviceRegistry(queue_factory=lambda: CompressedTimedQueue(decode_image_bytes, frame_routes.decode_executor))
+    monkeypatch.setattr(config, "FRAME_DECODE_MODE", "lazy")
+    monkeypatch.setattr(frame_routes, "uid_queues", devices)
+    monkeypatch.setattr(diagnosis_routes, "uid_queues", devices)
+    app.state.model = StubModel()
+
+    encoded = base64.b64encode(create_jpeg((255, 0, 0))).decode()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        for idx in range(43):
+            response = await ac.post("/api/save/frame", json={
+                "deviceUid": "lazy_device", "frameIdx": idx, "driverFrame": f"data:image/jpeg;base64,{encoded}"})
+            assert response.status_code == 200
+        response = await ac.get("/api/diagnosis/drowiness", params={"deviceUid": "lazy_device"})
+        stats = (await ac.get("/api/devices/stats")).json()["decode"]
+
+    assert response.status_code == 200
+    assert isinstance(devices["lazy_device"]._payloads[0], bytes)
+    assert stats["mode"] == "lazy"
+    assert stats["decoded"] == 43
@@ -0,0 +1,173 @@
+import asyncio
+import uuid
+import pytest
+import numpy as np
+from httpx import AsyncClient
+from httpx import ASGITransport
+from main import app
+from api.diagnosis import diagnosis_routes
+from api.frame.DeviceRegistry import DeviceRegistry
+from api.frame.SharedFrameStore import SharedFrameStore
+from api.frame.TimedQueue import TimedQueue, FRAME_SHAPE
+from api.diagnosis.ContinuousDiagnosis import ContinuousDiagnosis
+
+
+class StubModel:
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict(self, inputs):
+        self.batch_sizes.append(inputs.shape[0])
+        return np.full((inputs.shape[0], 1), 0.9, dtype=np.float32)
+
+
+def create_devices(monkeypatch) -> DeviceRegistry:
+    # 다른 테스트가 만든 디바이스와 섞이지 않도록 진단 경로가 보는 레지스트리를 교체
+    devices = DeviceRegistry(queue_factory=lambda: TimedQueue(maxsize=48, window_seconds=2))
+    monkeypatch.setattr(diagnosis_routes, "uid_queues", devices)
+    return devices
+
+
+async def put_frames(queue: TimedQueue, start: int, count: int):
+    frame = np.zeros(FRAME_SHAPE, dtype=np.uint8)
+    await queue.put_many([(idx, frame) for idx in range(start, start + count)])
+
+
+async def wait_for_tasks(scheduler: ContinuousDiagnosis):
+    while scheduler.stats()["inFlight"]:
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_diagnoses_every_stride_and_coalesces(monkeypatch): # stride 마다 진단, 여러 디바이스를 한 배치로 묶는지 테스트
+    model = StubModel()
+    app.state.model = model
+    devices = create_devices(monkeypatch)
+    scheduler = ContinuousDiagnosis(app, devices, stride=4, interval_seconds=0.01, max_in_flight=8)
+
+    # 윈도우가 43프레임 미만이면 진단하지 않음
+    await put_frames(devices.get_or_create("continuous_a"), 0, 42)
+    assert scheduler.tick() == 0
+
+    await put_frames(devices["continuous_a"], 42, 1)
+    await put_frames(devices.get_or_create("continuous_b"), 0, 43)
+    assert scheduler.tick() == 2
+    await wait_for_tasks(scheduler)
+    assert model.batch_sizes == [2]
+
+    # 새 프레임이 없거나 stride 미만이면 건너뜀
+    assert scheduler.tick() == 0
+    await put_frames(devices["continuous_a"], 43, 3)
+    assert scheduler.tick() == 0
+    await put_frames(devices["continuous_a"], 46, 1)
+    assert scheduler.tick() == 1
+    await wait_for_tasks(scheduler)
+
+    stats = scheduler.stats()
+    assert stats["completed"] == 3
+    assert stats["unchanged"] >= 2
+
+
+@pytest.mark.asyncio
+async def test_sheds_fairly_when_in_flight_limit_reached(monkeypatch): # 동시 진단 수 초과 시 오래된 디바이스부터 처리 테스트
+    app.state.model = StubModel()
+    devices = create_devices(monkeypatch)
+    scheduler = ContinuousDiagnosis(app, devices, stride=1, interval_seconds=0.01, max_in_flight=1)
+
+    for uid in ("fair_a", "fair_b"):
+        await put_frames(devices.get_or_create(uid), 0, 43)
+
+    assert scheduler.tick() == 1
+    await wait_for_tasks(scheduler)
+    first = next(uid for uid in ("fair_a", "fair_b") if app.state.diagnosis_cache.latest(uid, 10))
+
+    for uid in ("fair_a", "fair_b"):
+        await put_frames(devices[uid], 43, 1)
+    assert scheduler.tick() == 1
+    await wait_for_tasks(scheduler)
+
+    # 두 번째 주기에는 아직 진단하지 않은 디바이스가 먼저 처리됨
+    second = ({"fair_a", "fair_b"} - {first}).pop()
+    assert app.state.diagnosis_cache.latest(second, 10) is not None
+    assert scheduler.stats()["deferred"] == 2
+
+
+@pytest.mark.asyncio
+async def test_get_returns_latest_result_in_continuous_mode(monkeypatch): # 연속 진단 모드에서 최신 결과 조회 테스트
+    app.state.model = None
+    monkeypatch.setattr(app.state, "continuous_diagnosis", object(), raising=False)
+    app.state.diagnosis_cache.put("latest_device", 0, True, "2026-01-01T00:00:00+00:00")
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get("/api/diagnosis/drowiness", params={"deviceUid": "latest_device"})
+
+    assert response.status_code == 200
+    assert response.json()["isDrowsinessDrive"] is True
+    assert response.json()["detectionTime"] == "2026-01-01T00:00:00+00:00"
+
+
+@pytest.mark.asyncio
+async def test_workers_sharing_store_diagnose_each_window_once(monkeypatch): # 공유 저장소를 쓰는 워커 둘이 같은 윈도우를 한 번만 진단하는지 테스트
+    name = f"test_frames_{uuid.uuid4().hex[:8]}"
+    first, second = SharedFrameStore(name, max_devices=2, maxsize=48), SharedFrameStore(name, max_devices=2, maxsize=48)
+    try:
+        model = StubModel()
+        app.state.model = model
+        monkeypatch.setattr(diagnosis_routes, "uid_queues", first)
+        schedulers = [ContinuousDiagnosis(app, store, stride=4, interval_seconds=0.01, max_in_flight=8)
+                      for store in (first, second)]
+
+        await put_frames(first.get_or_create("shared_a"), 0, 43)
+        assert sum(scheduler.tick() for scheduler in schedulers) == 1
+        for scheduler in schedulers:
+            await wait_for_tasks(scheduler)
+        assert sum(model.batch_sizes) == 1
+
+        # stride 미만이면 어느 워커도 진단하지 않고, stride 를 채우면 다시 한 워커만 진단
+        await put_frames(second["shared_a"], 43, 3)
+        assert sum(scheduler.tick() for scheduler in schedulers) == 0
+        await put_frames(second["shared_a"], 46, 1)
+        assert sum(scheduler.tick() for scheduler in reversed(schedulers)) == 1
+        for scheduler in schedulers:
+            await wait_for_tasks(scheduler)
+        assert sum(model.batch_sizes) == 2
+    finally:
+        first.close()
+        second.close()
+        first.unlink()
+
+
+@pytest.mark.asyncio
+async def test_get_reads_result_diagnosed_by_other_worker(monkeypatch): # 다른 워커가 연속 진단한 결과를 공유 저장소에서 바로 조회하는지 테스트
+    name = f"test_frames_{uuid.uuid4().hex[:8]}"
+    first, second = SharedFrameStore(name, max_devices=2, maxsize=48), SharedFrameStore(name, max_devices=2, maxsize=48)
+    try:
+        app.state.model = StubModel()
+        monkeypatch.setattr(diagnosis_routes, "uid_queues", first)
+        scheduler = ContinuousDiagnosis(app, first, stride=4, interval_seconds=0.01, max_in_flight=8)
+        await put_frames(first.get_or_create("shared_latest"), 0, 43)
+        assert scheduler.tick() == 1
+        await wait_for_tasks(scheduler)
+        detection_time = app.state.diagnosis_cache.peek("shared_latest").detection_time
+
+        # 진단하지 않은 워커: 로컬 캐시에 결과가 없고 모델도 없어도 공유 카운터의 결과를 반환
+        app.state.diagnosis_cache.discard("shared_latest")
+        app.state.model = None
+        monkeypatch.setattr(diagnosis_routes, "uid_queues", second)
+        monkeypatch.setattr(app.state, "continuous_diagnosis", object(), raising=False)
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            response = await ac.get("/api/diagnosis/drowiness", params={"deviceUid": "shared_latest"})
+
+        assert response.status_code == 200
+        assert response.json()["isDrowsinessDrive"] is False
+        assert response.json()["detectionTime"] == detection_time
+
+        # 모델 교체 후에는 이전 모델의 결과를 반환하지 않음
+        second["shared_latest"].clear_result()
+        assert first["shared_latest"].latest_result(10) is None
+    finally:
+        first.close()
+        second.close()
+        first.unlink()
@@ -0,0 +1,52 @@
+import time
+import pytest
+import numpy as np
+from api.frame.DeviceRegistry import DeviceRegistry
+from api.frame.TimedQueue import TimedQueue, FRAME_SHAPE
+from utils.exception_handlers import ErrorForm
+
+
+def create_registry(**kwargs):
+    return DeviceRegistry(queue_factory=lambda: TimedQueue(maxsize=4, window_seconds=2), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_full_registry_evicts_empty_lru_or_rejects(): # 최대 디바이스 수 도달 시 빈 디바이스 정리 또는 거절 테스트
+    registry = create_registry(max_devices=2)
+    evicted = []
+    registry.add_eviction_listener(evicted.append)
+
+    await registry.get_or_create("a").put((0, np.zeros(FRAME_SHAPE, dtype=np.uint8)))
+    registry.get_or_create("b")
+
+    registry.get_or_create("c")  # 프레임이 없는 b 를 정리하고 등록
+    assert evicted == ["b"]
+    assert "a" in registry and "c" in registry
+
+    await registry["c"].put((0, np.zeros(FRAME_SHAPE, dtype=np.uint8)))
+    with pytest.raises(ErrorForm) as exc_info:
+        registry.get_or_create("d")
+    assert exc_info.value.code == 503
+    assert exc_info.value.message == "device_limit"
+
+    stats = registry.stats()
+    assert stats["active"] == 2
+    assert stats["evicted"] == 1
+    assert stats["rejected"] == 1
+    assert stats["memoryBytes"] == 2 * registry["a"].nbytes
+
+
+def test_sweep_evicts_idle_devices(monkeypatch): # 유휴 시간이 지난 디바이스만 정리되는지 테스트
+    registry = create_registry(idle_timeout_seconds=10)
+    now = time.monotonic()
+
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    registry.get_or_create("idle")
+    monkeypatch.setattr(time, "monotonic", lambda: now + 8)
+    registry.get_or_create("active")
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+    assert registry.sweep() == 1
+    assert "idle" not in registry
+    assert "active" in registry
+    assert registry.stats(include_devices=True)["devices"]["active"]["idleSeconds"] == 3
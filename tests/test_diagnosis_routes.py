@@ -0,0 +1,144 @@
+import asyncio
+import pytest
+import numpy as np
+from httpx import AsyncClient
+from httpx import ASGITransport
+from main import app
+from PIL import Image
+from api.frame.frame_routes import get_or_create_queue
+from api.diagnosis.BatchScheduler import BatchScheduler
+from api.diagnosis.diagnosis_routes import preprocess_input_data
+from api.frame.TimedQueue import FRAME_SHAPE
+from utils.bounded_executor import BoundedExecutor
+
+
+class StubModel:
+    def __init__(self, value=0.9):
+        self.value = value
+        self.batch_sizes = []
+
+    def predict(self, inputs):
+        self.batch_sizes.append(inputs.shape[0])
+        return np.full((inputs.shape[0], 1), self.value, dtype=np.float32)
+
+
+class EchoModel(StubModel):
+    def predict(self, inputs):
+        # 배치 내 순서를 확인할 수 있도록 입력 값을 그대로 돌려줌
+        self.batch_sizes.append(inputs.shape[0])
+        return inputs[:, :1].copy()
+
+
+def fill_row(value, out):
+    out[:] = value
+
+
+async def fill_queue(device_uid: str, count: int = 48):
+    queue = get_or_create_queue(device_uid)
+    image = Image.new("RGB", (100, 100), color="red")
+    for i in range(count):
+        await queue.put((i, image))
+
+
+@pytest.mark.asyncio
+async def test_diagnosis_success(): # 200 테스트
+    app.state.model = StubModel(value=0.9)
+    await fill_queue("diag_device")
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get("/api/diagnosis/drowiness", params={"deviceUid": "diag_device"})
+
+    assert response.status_code == 200
+    json_resp = response.json()
+    assert json_resp["success"] is True
+    assert json_resp["isDrowsinessDrive"] is False
+
+
+@pytest.mark.asyncio
+async def test_diagnosis_model_not_loaded(): # 모델 미로드 테스트
+    app.state.model = None
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get("/api/diagnosis/drowiness", params={"deviceUid": "diag_device"})
+
+    assert response.status_code == 500
+    assert response.json()["error"]["message"] == "model_not_loaded"
+
+
+@pytest.mark.asyncio
+async def test_batch_scheduler_groups_requests(): # 동시 요청이 하나의 배치로 묶이는지 테스트
+    model = EchoModel()
+    executor = BoundedExecutor("test_inference", max_workers=1, max_pending=8)
+    scheduler = BatchScheduler(lambda: model, executor, fill_row, (2,), max_batch_size=4, max_wait_seconds=0.05)
+
+    results = await asyncio.gather(*(scheduler.submit(i) for i in range(6)))
+
+    assert [float(r.flatten()[0]) for r in results] == [0, 1, 2, 3, 4, 5]
+    assert model.batch_sizes == [4, 2]
+
+    stats = scheduler.stats()
+    assert stats["totalRequests"] == 6
+    assert stats["totalBatches"] == 2
+    assert stats["batchSizeCounts"] == {"2": 1, "4": 1}
+
+
+@pytest.mark.asyncio
+async def test_diagnosis_rejected_when_executor_saturated(monkeypatch): # 추론 실행기 포화 시 503 테스트
+    app.state.model = StubModel()
+    executor = BoundedExecutor("test_saturated", max_workers=1, max_pending=1)
+    monkeypatch.setattr(app.state, "inference_executor", executor)
+
+    transport = ASGITransport(app=app)
+    with executor.reserve():
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            response = await ac.get("/api/diagnosis/drowiness", params={"deviceUid": "diag_saturated_device"})
+
+    assert response.status_code == 503
+    assert response.json()["error"]["message"] == "inference_busy"
+    assert executor.stats()["rejected"] == 1
+
+
+def test_preprocess_interpolates_missing_frame_idx(): # 빠진 frameIdx 를 앞뒤 프레임 보간으로 채우는지 테스트
+    frame_indices = np.array([0, 2, 3])
+    frames = np.stack([np.full(FRAME_SHAPE, value, dtype=np.uint8) for value in (0, 255, 51)])
+
+    input_array = preprocess_input_data(frame_indices, frames)
+
+    assert input_array.shape == (1, 48, *FRAME_SHAPE)
+    assert input_array.dtype == np.float32
+    assert np.allclose(input_array[0, :4, 0, 0, 0], [0.0, 0.5, 1.0, 0.2])
+    # 마지막 프레임 이후 구간은 0 이 아니라 마지막 프레임으로 채움
+    assert np.allclose(input_array[0, 4:, 0, 0, 0], 0.2)
+
+
+def test_preprocess_uses_most_recent_window_and_out_buffer(): # 최근 48개 구간을 주어진 버퍼에 채우는지 테스트
+    frame_indices = np.arange(10, 70, 2)
+    frames = np.stack([np.full(FRAME_SHAPE, i, dtype=np.uint8) for i in range(len(frame_indices))])
+    out = np.empty((1, 48, *FRAME_SHAPE), dtype=np.float32)
+
+    result = preprocess_input_data(frame_indices, frames, out=out)
+
+    assert result is out
+    assert np.isclose(out[0, -1, 0, 0, 0], 29 / 255.0)
+    assert np.isclose(out[0, 0, 0, 0, 0], 5.5 / 255.0)
+
+
+@pytest.mark.asyncio
+async def test_diagnosis_cached_while_window_unchanged(): # 윈도우가 그대로면 모델을 다시 호출하지 않는지 테스트
+    model = StubModel(value=0.1)
+    app.state.model = model
+    await fill_queue("diag_cache_device", count=47)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        first = await ac.get("/api/diagnosis/drowiness", params={"deviceUid": "diag_cache_device"})
+        second = await ac.get("/api/diagnosis/drowiness", params={"deviceUid": "diag_cache_device"})
+
+        await get_or_create_queue("diag_cache_device").put((47, Image.new("RGB", (100, 100))))
+        third = await ac.get("/api/diagnosis/drowiness", params={"deviceUid": "diag_cache_device"})
+
+    assert first.json() == second.json()
+    assert third.status_code == 200
+    assert len(model.batch_sizes) == 2
@@ -5,7 +5,10 @@ from main import app
 import base64
 from PIL import Image
 from io import BytesIO
-from api.frame.frame_routes import uid_queues, get_or_create_queue, decode_base64_image
+from api.frame import frame_routes
+from api.frame.frame_routes import uid_queues, get_or_create_queue, decode_base64_image, decode_image_bytes
+from utils.bounded_executor import BoundedExecutor
+from recording import FrameRecorder, read_recording
 
 
 @pytest.mark.asyncio
@@ -94,6 +97,111 @@ async def test_queue_full_raises_custom_error(monkeypatch): # 강제로 큐를 
     assert json_resp["error"]["message"] == "queue_full"
     assert json_resp["error"]["method"] == "save_frame(큐 저장)"
 
+@pytest.mark.asyncio
+async def test_save_raw_frame_success(): # 바이너리 업로드 200 테스트
+    image_bytes = base64.b64decode(create_test_image_base64())
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        by_query = await ac.post(
+            "/api/save/frame/raw",
+            params={"deviceUid": "raw_device", "frameIdx": 1},
+            content=image_bytes,
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        by_header = await ac.post(
+            "/api/save/frame/raw",
+            content=image_bytes,
+            headers={"Content-Type": "application/octet-stream", "X-Device-Uid": "raw_device", "X-Frame-Idx": "2"},
+        )
+
+    assert by_query.status_code == 200
+    assert by_header.status_code == 200
+    assert uid_queues["raw_device"].qsize() == 2
+
+@pytest.mark.asyncio
+async def test_save_raw_frame_missing_params_and_invalid_image(): # 파라미터 누락 및 이미지 아닌 바이너리 테스트
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        missing = await ac.post("/api/save/frame/raw", params={"deviceUid": "raw_device_invalid"}, content=b"x")
+        invalid = await ac.post("/api/save/frame/raw", params={"deviceUid": "raw_device_invalid", "frameIdx": 1}, content=b"it is not an image")
+
+    assert missing.status_code == 422
+    assert missing.json()["error"]["message"] == "invalid_parameter"
+    assert invalid.status_code == 422
+    assert invalid.json()["error"]["message"] == "invalid_image"
+
+@pytest.mark.asyncio
+async def test_save_frames_batch_is_atomic(): # 배치 업로드 시 하나라도 실패하면 아무것도 저장하지 않는지 테스트
+    img_str = create_test_image_base64()
+    valid = {"deviceUid": "batch_device", "frames": [{"frameIdx": i, "driverFrame": img_str} for i in range(3)]}
+    invalid = {
+        "deviceUid": "batch_device_invalid",
+        "frames": [{"frameIdx": 0, "driverFrame": img_str}, {"frameIdx": 1, "driverFrame": "it-is-not-base64-encoding-form"}],
+    }
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        ok = await ac.post("/api/save/frames", json=valid)
+        failed = await ac.post("/api/save/frames", json=invalid)
+
+    assert ok.status_code == 200
+    assert uid_queues["batch_device"].qsize() == 3
+
+    assert failed.status_code == 422
+    assert failed.json()["error"]["message"] == "invalid_base64"
+    assert "frames[1]" in failed.json()["error"]["detail_message"]
+    assert "batch_device_invalid" not in uid_queues
+
+def test_decode_downscales_large_jpeg_at_ingest(): # 큰 JPEG 도 저장 시점에 (145, 145, 3) 으로 디코딩되는지 테스트
+    buffered = BytesIO()
+    Image.new("RGB", (1280, 720), color=(0, 0, 255)).save(buffered, format="JPEG")
+
+    frame = decode_image_bytes(buffered.getvalue())
+
+    assert frame.shape == (145, 145, 3)
+    assert frame.dtype.name == "uint8"
+    assert frame[72, 72, 2] > 240
+
+@pytest.mark.asyncio
+async def test_decode_rejected_when_executor_saturated(monkeypatch): # 디코딩 실행기 포화 시 503 테스트
+    executor = BoundedExecutor("test_decode", max_workers=1, max_pending=1)
+    monkeypatch.setattr(frame_routes, "decode_executor", executor)
+    payload = {"deviceUid": "decode_busy_device", "frameIdx": 0, "driverFrame": create_test_image_base64()}
+
+    transport = ASGITransport(app=app)
+    with executor.reserve():
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            response = await ac.post("/api/save/frame", json=payload)
+
+    assert response.status_code == 503
+    assert response.json()["error"]["message"] == "decode_busy"
+
+@pytest.mark.asyncio
+async def test_recorder_keeps_only_stored_frames(monkeypatch, tmp_path): # 큐에 저장된 프레임만 기록되고 거절된 프레임은 빠지는지 테스트
+    recorder = FrameRecorder(tmp_path)
+    monkeypatch.setattr(frame_routes, "recorder", recorder)
+    image_b64 = create_test_image_base64()
+    invalid_b64 = base64.b64encode(b"it is not an image").decode("utf-8")
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.post("/api/save/frame", json={"deviceUid": "recorded_device", "frameIdx": 0, "driverFrame": image_b64})
+        assert response.status_code == 200  # 200 테스트
+        response = await ac.post("/api/save/frame", json={"deviceUid": "recorded_device", "frameIdx": 1, "driverFrame": invalid_b64})
+        assert response.status_code == 422  # 422 테스트
+        response = await ac.post("/api/save/frames", json={"deviceUid": "recorded_device", "frames": [
+            {"frameIdx": 2, "driverFrame": image_b64}, {"frameIdx": 3, "driverFrame": invalid_b64}]})
+        assert response.status_code == 422  # 배치 중 하나라도 실패하면 기록하지 않음
+        response = await ac.post("/api/save/frame/raw", content=base64.b64decode(image_b64),
+                                 params={"deviceUid": "recorded_device", "frameIdx": 4})
+        assert response.status_code == 200  # 200 테스트
+    recorder.close()
+
+    records = read_recording(tmp_path)
+    assert [record.frame_idx for record in records] == [0, 4]
+    assert records[0].payload == image_b64.encode("ascii")
+
 def create_test_image_base64():
     image = Image.new("RGB", (100, 100), color="red")
     buffered = BytesIO()
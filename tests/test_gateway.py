@@ -0,0 +1,134 @@
+import subprocess
+import sys
+import pytest
+import httpx
+from fastapi import FastAPI, Query, Request
+from httpx import AsyncClient, ASGITransport
+from gateway import HashRing, Gateway, create_gateway_app
+
+
+def create_backend(name: str) -> FastAPI:
+    backend = FastAPI()
+    backend.state.device_uids = []
+
+    @backend.post("/api/save/frame")
+    async def save_frame(request: Request):
+        backend.state.device_uids.append((await request.json())["deviceUid"])
+        return {"backend": name}
+
+    @backend.post("/api/save/frame/raw")
+    async def save_raw_frame(request: Request, device_uid: str = Query(..., alias="deviceUid")):
+        backend.state.device_uids.append(device_uid)
+        return {"backend": name, "bytes": len(await request.body()), "contentType": request.headers["content-type"]}
+
+    @backend.get("/api/diagnosis/drowiness")
+    async def get_diagnosis_result(device_uid: str = Query(..., alias="deviceUid")):
+        backend.state.device_uids.append(device_uid)
+        return {"backend": name}
+
+    @backend.get("/healthz")
+    async def get_health():
+        return {"status": 200}
+
+    return backend
+
+
+def refuse_connection(request: httpx.Request):
+    raise httpx.ConnectError("connection refused", request=request)
+
+
+def test_hash_ring_moves_only_affected_devices(): # 백엔드 추가/제거 시 해당 백엔드의 디바이스만 옮겨지는지 테스트
+    devices = [f"device_{index}" for index in range(2000)]
+    ring = HashRing(["http://a", "http://b", "http://c"])
+    before = {device: ring.lookup(device) for device in devices}
+    assert set(before.values()) == {"http://a", "http://b", "http://c"}
+
+    ring.add("http://d")
+    after_join = {device: ring.lookup(device) for device in devices}
+    moved = [device for device in devices if after_join[device] != before[device]]
+    assert all(after_join[device] == "http://d" for device in moved)
+    assert 0.1 < len(moved) / len(devices) < 0.4
+
+    ring.remove("http://b")
+    after_leave = {device: ring.lookup(device) for device in devices}
+    moved = [device for device in devices if after_leave[device] != after_join[device]]
+    assert all(after_join[device] == "http://b" for device in moved)
+    assert HashRing().lookup("device_0") is None
+
+
+@pytest.mark.asyncio
+async def test_gateway_keeps_device_on_one_backend(): # 같은 deviceUid 의 저장/진단 요청이 같은 백엔드로 전달되는지 테스트
+    backends = {"http://backend-a": create_backend("a"), "http://backend-b": create_backend("b")}
+    client = AsyncClient(mounts={url: ASGITransport(app=backend) for url, backend in backends.items()})
+    gateway = Gateway(backends, client=client)
+    app = create_gateway_app(gateway)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://gateway") as ac:
+        for index in range(20):
+            device_uid = f"device_{index}"
+            owner = gateway.ring.lookup(device_uid)
+            response = await ac.post("/api/save/frame", json={"deviceUid": device_uid, "frameIdx": 0, "driverFrame": "AAAA"})
+            assert response.status_code == 200  # 200 테스트
+            assert "http://backend-" + response.json()["backend"] == owner
+
+            response = await ac.post("/api/save/frame/raw", content=b"\xff\xd8abc", params={"deviceUid": device_uid, "frameIdx": 1},
+                                     headers={"Content-Type": "application/octet-stream"})
+            assert response.json() == {"backend": owner[-1], "bytes": 5, "contentType": "application/octet-stream"}
+
+            response = await ac.get("/api/diagnosis/drowiness", params={"deviceUid": device_uid})
+            assert "http://backend-" + response.json()["backend"] == owner
+
+        response = await ac.post("/api/save/frame", json={"frameIdx": 0, "driverFrame": "AAAA"})
+        assert response.status_code == 422  # 422 테스트
+        assert response.json()["error"]["message"] == "invalid_parameter"
+
+        stats = (await ac.get("/api/gateway/stats")).json()["gateway"]
+        assert sum(counts["forwarded"] for counts in stats["backends"].values()) == 60
+
+    for url, backend in backends.items():
+        assert all(gateway.ring.lookup(device_uid) == url for device_uid in backend.state.device_uids)
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_gateway_reroutes_when_backend_is_down(): # 연결이 안 되는 백엔드를 링에서 빼고 다른 백엔드로 보내는지 테스트
+    backend = create_backend("a")
+    client = AsyncClient(mounts={
+        "http://backend-a": ASGITransport(app=backend),
+        "http://backend-down": httpx.MockTransport(refuse_connection),
+    })
+    gateway = Gateway(["http://backend-a", "http://backend-down"], client=client)
+    app = create_gateway_app(gateway)
+    device_uid = next(f"device_{index}" for index in range(100) if gateway.ring.lookup(f"device_{index}") == "http://backend-down")
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://gateway") as ac:
+        response = await ac.get("/api/diagnosis/drowiness", params={"deviceUid": device_uid})
+        assert response.status_code == 200  # 200 테스트
+        assert response.json()["backend"] == "a"
+        assert gateway.ring.backends == ["http://backend-a"]
+        assert gateway.members == ["http://backend-a", "http://backend-down"]
+
+        gateway.remove_backend("http://backend-a")
+        response = await ac.get("/api/diagnosis/drowiness", params={"deviceUid": device_uid})
+        assert response.status_code == 503  # 503 테스트
+        assert response.json()["error"]["message"] == "no_backend"
+
+    # 헬스 체크가 성공하면 링에 다시 추가
+    gateway.add_backend("http://backend-a")
+    gateway.ring.remove("http://backend-a")
+    await gateway.check_health()
+    assert gateway.ring.backends == ["http://backend-a"]
+    await client.aclose()
+
+
+def test_gateway_does_not_import_server_modules(): # 게이트웨이 프로세스가 모델, 프레임 저장소 등 진단 서버 모듈을 import 하지 않는지 테스트
+    code = (
+        "import sys, gateway; "
+        "loaded = [name for name in sys.modules if name.split('.')[0] in "
+        "('main', 'model_registry', 'model_loader', 'tensorflow', 'window_snapshot') "
+        "or name.startswith(('api.frame', 'api.diagnosis', 'api.admin', 'api.stream'))]; "
+        "print(loaded); sys.exit(1 if loaded else 0)"
+    )
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=60)
+    assert completed.returncode == 0, completed.stdout + completed.stderr
+
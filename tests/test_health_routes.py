@@ -0,0 +1,75 @@
+import threading
+import pytest
+import numpy as np
+from httpx import AsyncClient
+from httpx import ASGITransport
+import main
+import model_registry
+from main import app
+from model_loader import ModelStatus, warm_up
+
+
+class StubModel:
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, inputs):
+        self.calls.append((threading.current_thread().name, inputs.shape[0]))
+        return np.full((inputs.shape[0], 1), 0.9, dtype=np.float32)
+
+
+@pytest.mark.asyncio
+async def test_readyz_while_loading_and_after_ready(): # 모델 로드 중 503, 로드 후 200 테스트
+    app.state.model = None
+    app.state.model_status.state = ModelStatus.LOADING
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        health = await ac.get("/healthz")
+        not_ready = await ac.get("/readyz")
+        diagnosis = await ac.get("/api/diagnosis/drowiness", params={"deviceUid": "loading_device"})
+
+        app.state.model = StubModel()
+        app.state.model_status.state = ModelStatus.READY
+        ready = await ac.get("/readyz")
+
+    app.state.model_status.state = ModelStatus.PENDING
+    assert health.status_code == 200
+    assert not_ready.status_code == 503
+    assert not_ready.json()["model"]["state"] == "loading"
+    assert diagnosis.status_code == 503
+    assert diagnosis.json()["error"]["message"] == "model_loading"
+    assert ready.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_initial_load_warms_every_worker(monkeypatch, tmp_path): # 모든 추론 워커에서 배치 크기별 warm-up 후 ready 테스트
+    model = StubModel()
+    model.describe = lambda: {"backend": "stub"}
+    model.weight_bytes = lambda: None
+    monkeypatch.setattr(model_registry, "import_inference_runtime", lambda: None)
+    monkeypatch.setattr(model_registry, "load_inference_backend", lambda path: model)
+    model_path = tmp_path / "team12.h5"
+    model_path.write_bytes(b"weights")
+
+    registry = app.state.model_registry
+    app.state.model = None
+    registry.active = None
+    await registry.reload(str(model_path))
+
+    status = app.state.model_status
+    assert status.state == ModelStatus.READY
+    assert set(status.timings) >= {"import", "load", "warmup"}
+    assert app.state.model.backend is model
+
+    executor = app.state.inference_executor
+    assert len({thread for thread, _ in model.calls}) == executor.max_workers
+    assert sorted({size for _, size in model.calls}) == main.batch_buckets(main.config.INFERENCE_MAX_BATCH_SIZE)
+    status.state = ModelStatus.PENDING
+    registry.active = None
+
+
+def test_warm_up_without_barrier(): # 단일 스레드 warm-up 테스트
+    model = StubModel()
+    warm_up(model, (2, 2, 3), [1, 4])
+    assert [size for _, size in model.calls] == [1, 4]
@@ -0,0 +1,43 @@
+import pytest
+import numpy as np
+import tensorflow as tf
+from inference_backends import KerasBackend, create_backend, load_parity_samples, check_parity
+
+INPUT_SHAPE = (4, 8, 8, 3)
+
+
+@pytest.fixture(scope="module")
+def model():
+    tf.keras.utils.set_random_seed(0)
+    return tf.keras.Sequential([
+        tf.keras.Input(INPUT_SHAPE),
+        tf.keras.layers.Conv3D(4, 3, padding="same", activation="relu"),
+        tf.keras.layers.GlobalAveragePooling3D(),
+        tf.keras.layers.Dense(1, activation="sigmoid"),
+    ])
+
+
+@pytest.mark.parametrize("name, options", [
+    ("compiled", {}),
+    ("compiled", {"jit_compile": True}),
+    ("tflite", {}),
+    ("tflite", {"quantization": "float16"}),
+])
+def test_backend_matches_keras_model(model, name, options): # 백엔드별 원본 모델과의 결과 일치 테스트
+    backend = create_backend(model, name, batch_buckets=(1, 4), **options)
+    samples = load_parity_samples(INPUT_SHAPE, count=3)
+
+    report = check_parity(KerasBackend(model), backend, samples)
+    assert report.samples == 3
+    assert report.passed(0.01)
+    assert report.decision_agreement == 1.0
+
+    # 배치 크기가 바뀌어도(패딩/텐서 크기 변경) 행 수와 값이 유지되는지
+    single = backend.predict(samples[:1])
+    assert single.shape == (1, 1)
+    np.testing.assert_allclose(single, backend.predict(samples)[:1], atol=1e-3)
+
+
+def test_unknown_backend_rejected(model): # 지원하지 않는 백엔드 이름 테스트
+    with pytest.raises(ValueError):
+        create_backend(model, "onnx")
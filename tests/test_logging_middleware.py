@@ -0,0 +1,57 @@
+import logging
+import pytest
+from httpx import AsyncClient
+from httpx import ASGITransport
+from main import app
+from utils.helper import get_middleware_logger
+from utils.logging_middleware import BodyLogPolicy
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def test_body_log_policies(): # 본문 로깅 방식별 기록 내용 테스트
+    body = b"x" * 2000
+
+    truncated = BodyLogPolicy("truncate", max_bytes=10).recorder()
+    truncated.feed(body)
+    assert truncated.describe() == "x" * 10 + "... (truncated, 2000 bytes)"
+
+    size_only = BodyLogPolicy("size").recorder()
+    size_only.feed(body)
+    assert size_only.describe() == "(2000 bytes)"
+
+    hashed = BodyLogPolicy("hash").recorder()
+    hashed.feed(body[:1000])
+    hashed.feed(body[1000:])
+    assert hashed.describe().startswith("sha256=") and hashed.describe().endswith("(2000 bytes)")
+
+    assert BodyLogPolicy("none").sampled() is False
+    assert BodyLogPolicy("size", sample_rate=0.0).sampled() is False
+
+
+@pytest.mark.asyncio
+async def test_frame_body_not_logged_in_full(monkeypatch): # 프레임 저장 요청의 base64 본문이 그대로 기록되지 않는지 테스트
+    handler = ListHandler()
+    middleware_logger = get_middleware_logger()
+    middleware_logger.addHandler(handler)
+    monkeypatch.setattr(BodyLogPolicy, "sampled", lambda self: self.mode != "none")
+
+    payload = {"deviceUid": "log_device", "frameIdx": 0, "driverFrame": "A" * 4000}
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            response = await ac.post("/api/save/frame", json=payload)
+    finally:
+        middleware_logger.removeHandler(handler)
+
+    assert response.status_code == 422
+    assert not any("A" * 100 in message for message in handler.messages)
+    assert any("Request Body: (" in message and "bytes)" in message for message in handler.messages)
+    assert any("Processed by endpoint: save_frame (status: 422)" in message for message in handler.messages)
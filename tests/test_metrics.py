@@ -0,0 +1,41 @@
+import pytest
+from httpx import AsyncClient
+from httpx import ASGITransport
+from main import app
+from utils.metrics import MetricsRegistry, Counter, Histogram, CallbackGauge
+
+
+def test_registry_renders_prometheus_text(): # Prometheus 텍스트 포맷 출력 테스트
+    metrics_registry = MetricsRegistry()
+    requests = Counter("test_requests_total", "요청 수", ["route"], metrics_registry=metrics_registry)
+    latency = Histogram("test_latency_seconds", "지연 시간", buckets=(0.1, 1.0), metrics_registry=metrics_registry)
+    CallbackGauge("test_depth", "큐 길이", ["device_uid"], lambda: {("a",): 3}, metrics_registry=metrics_registry)
+
+    requests.labels("/api/save/frame").inc()
+    requests.labels("/api/save/frame").inc(2)
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    text = metrics_registry.render()
+    assert '# TYPE test_requests_total counter' in text
+    assert 'test_requests_total{route="/api/save/frame"} 3.0' in text
+    assert 'test_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'test_latency_seconds_bucket{le="+Inf"} 3' in text
+    assert 'test_latency_seconds_count 3' in text
+    assert 'test_depth{device_uid="a"} 3.0' in text
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(): # /metrics 라우트 테스트
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        await ac.post("/api/save/frame", json={"deviceUid": "metrics_device", "frameIdx": 0, "driverFrame": "bad"})
+        response = await ac.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE frame_decode_seconds histogram" in response.text
+    assert "# TYPE frame_queue_depth gauge" in response.text
+    assert "# TYPE inference_seconds histogram" in response.text
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import pytest
+import numpy as np
+import tensorflow as tf
+from httpx import AsyncClient
+from httpx import ASGITransport
+import config
+from main import app
+from api.diagnosis.DiagnosisCache import DiagnosisCache
+from model_loader import ModelStatus
+from model_registry import ModelRegistry
+from utils.bounded_executor import BoundedExecutor
+from utils.metrics import MetricsRegistry
+
+INPUT_SHAPE = (2, 4, 4, 3)
+
+
+def save_model(path, bias: float):
+    model = tf.keras.Sequential([
+        tf.keras.Input(INPUT_SHAPE),
+        tf.keras.layers.Flatten(),
+        tf.keras.layers.Dense(1, activation="sigmoid", kernel_initializer="zeros",
+                              bias_initializer=tf.keras.initializers.Constant(bias)),
+    ])
+    model.save(path)
+
+
+@pytest.mark.asyncio
+async def test_reload_swaps_version_and_keeps_stats(tmp_path): # 새 버전 로드 후 교체, 이전 버전 통계 유지 테스트
+    model_path = str(tmp_path / "team12.h5")
+    save_model(model_path, bias=-2.0)
+
+    holder = {}
+    registry = ModelRegistry(
+        BoundedExecutor("test_inference", max_workers=2, max_pending=4),
+        INPUT_SHAPE, [1, 2],
+        on_activate=lambda model: holder.update(model=model),
+        metrics_registry=MetricsRegistry(),
+    )
+    first = await registry.reload(model_path)
+    old_model = holder["model"]
+    assert old_model is first
+    assert old_model.predict(np.zeros((1, *INPUT_SHAPE), dtype=np.float32))[0, 0] < 0.5
+
+    # 내용이 같으면 교체하지 않음
+    assert await registry.reload(model_path) is first
+
+    save_model(model_path, bias=2.0)
+    second = await registry.reload(model_path)
+    assert second.version != first.version
+    assert holder["model"] is second
+    assert second.predict(np.zeros((1, *INPUT_SHAPE), dtype=np.float32))[0, 0] > 0.5
+
+    # 교체 전에 모델을 잡은 요청은 이전 버전으로 끝까지 처리됨
+    assert old_model.predict(np.zeros((1, *INPUT_SHAPE), dtype=np.float32))[0, 0] < 0.5
+
+    versions = {stats["version"]: stats for stats in registry.stats()["versions"]}
+    assert versions[first.version]["state"] == "retired"
+    assert versions[second.version]["state"] == "active"
+    assert versions[first.version]["batches"] >= 2  # warm-up + 직접 호출
+    assert versions[second.version]["weightBytes"] == (2 * 4 * 4 * 3 + 1) * 4
+
+    # 로드 실패 시 기존 버전 유지
+    assert await registry.reload(str(tmp_path / "missing.h5")) is None
+    assert holder["model"] is second
+    assert registry.reload_status.state == ModelStatus.FAILED
+
+
+@pytest.mark.asyncio
+async def test_admin_reload_requires_token(monkeypatch, tmp_path): # 관리용 토큰 확인 테스트
+    monkeypatch.setattr(config, "MODEL_PATH", str(tmp_path / "team12.h5"))
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        monkeypatch.setattr(config, "ADMIN_TOKEN", "")
+        disabled = await ac.post("/api/admin/model/reload")
+
+        monkeypatch.setattr(config, "ADMIN_TOKEN", "secret")
+        unauthorized = await ac.post("/api/admin/model/reload", headers={"X-Admin-Token": "wrong"})
+        outside = await ac.post("/api/admin/model/reload", params={"modelPath": "/etc/passwd"},
+                                headers={"X-Admin-Token": "secret"})
+        versions = await ac.get("/api/admin/model", headers={"X-Admin-Token": "secret"})
+
+    assert disabled.status_code == 403
+    assert unauthorized.status_code == 401
+    assert outside.status_code == 422
+    assert versions.status_code == 200
+    assert "versions" in versions.json()["registry"]
+
+
+@pytest.mark.asyncio
+async def test_reload_does_not_wait_for_busy_inference_workers(tmp_path): # 추론 워커가 모두 바빠도 교체 warm-up 이 끝나는지 테스트
+    model_path = str(tmp_path / "team12.h5")
+    save_model(model_path, bias=-2.0)
+    executor = BoundedExecutor("test_inference", max_workers=2, max_pending=4)
+    registry = ModelRegistry(executor, INPUT_SHAPE, [1, 2], on_activate=lambda model: None, metrics_registry=MetricsRegistry())
+    first = await registry.reload(model_path)
+
+    release = threading.Event()
+    busy = [asyncio.create_task(executor.run(release.wait, 30)) for _ in range(executor.max_workers)]
+    try:
+        save_model(model_path, bias=2.0)
+        second = await asyncio.wait_for(registry.reload(model_path), timeout=20)
+        assert second is not None and second.version != first.version
+    finally:
+        release.set()
+        await asyncio.gather(*busy)
+
+
+def test_cache_clear_drops_results_started_before_swap(): # 모델 교체로 캐시를 비운 뒤 이전 추론 결과가 저장되지 않는지 테스트
+    cache = DiagnosisCache()
+    cache.put("device_a", 1, True, "t0")
+    generation = cache.generation
+    cache.clear()
+    cache.put("device_a", 2, False, "t1", generation=generation)
+    assert cache.peek("device_a") is None
+    cache.put("device_a", 3, False, "t2", generation=cache.generation)
+    assert cache.get("device_a", 3).detection_time == "t2"
@@ -0,0 +1,25 @@
+from recording import FrameRecorder, read_recording, KIND_FRAME_BASE64, KIND_FRAME_RAW, KIND_DIAGNOSIS
+
+
+def test_records_round_trip_across_segments(tmp_path): # 기록한 프레임/진단이 세그먼트를 넘어가도 순서대로 읽히는지 테스트
+    recorder = FrameRecorder(tmp_path, segment_bytes=64)
+    recorder.record_frame("device_a", 0, "data:image/jpeg;base64,AAAA")
+    recorder.record_frame("device_a", 1, b"\xff\xd8" + b"x" * 60 + b"\xff\xd9")
+    recorder.record_diagnosis("device_a", 200, True)
+    recorder.record_diagnosis("device_b", 404, None)
+    recorder.close()
+
+    assert recorder.stats()["recorded"] == 4
+    assert recorder.stats()["segments"] == 3  # 세그먼트보다 큰 레코드는 그 크기의 세그먼트를 따로 씀
+    records = read_recording(tmp_path)
+    assert [record.kind for record in records] == [KIND_FRAME_BASE64, KIND_FRAME_RAW, KIND_DIAGNOSIS, KIND_DIAGNOSIS]
+    assert records[0].payload == b"data:image/jpeg;base64,AAAA"
+    assert records[1].payload.endswith(b"\xff\xd9") and records[1].frame_idx == 1
+    assert (records[2].device_uid, records[2].status, records[2].result) == ("device_a", 200, 1)
+    assert (records[3].device_uid, records[3].status, records[3].result) == ("device_b", 404, -1)
+
+    # 같은 디렉터리에 다시 기록하면 이어지는 세그먼트 번호 사용
+    recorder = FrameRecorder(tmp_path)
+    recorder.record_frame("device_c", 0, "AAAA")
+    recorder.close()
+    assert len(read_recording(tmp_path)) == 5
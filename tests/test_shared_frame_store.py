@@ -0,0 +1,126 @@
+import multiprocessing
+import time
+import uuid
+import asyncio
+import pytest
+import numpy as np
+from api.frame.SharedFrameStore import SharedFrameStore
+from api.frame.TimedQueue import FRAME_SHAPE, LIVE_COUNT, OLDEST_SLOT
+from utils.exception_handlers import ErrorForm
+
+
+@pytest.fixture
+def store_name():
+    name = f"test_frames_{uuid.uuid4().hex[:8]}"
+    owner = SharedFrameStore(name, max_devices=2, maxsize=4)
+    yield name
+    owner.close()
+    owner.unlink()
+
+
+def _put_frames(name, device_uid):
+    store = SharedFrameStore(name, max_devices=2, maxsize=4)
+    frames = [(idx, np.full(FRAME_SHAPE, idx, dtype=np.uint8)) for idx in range(3)]
+    asyncio.run(store.get_or_create(device_uid).put_many(frames))
+    store.close()
+
+
+def _hold_lock(name, device_uid, locked, release):
+    store = SharedFrameStore(name, max_devices=2, maxsize=4)
+    queue = store.get_or_create(device_uid)
+    with store._locked(queue.slot):
+        locked.set()
+        release.wait(10)
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_frames_are_shared_between_processes(store_name): # 다른 프로세스가 저장한 프레임 조회 테스트
+    process = multiprocessing.get_context("fork").Process(target=_put_frames, args=(store_name, "pi-1"))
+    process.start()
+    process.join(10)
+    assert process.exitcode == 0
+
+    store = SharedFrameStore(store_name, max_devices=2, maxsize=4)
+    try:
+        assert "pi-1" in store
+        window = await store["pi-1"].snapshot()
+        assert window.frame_indices.tolist() == [0, 1, 2]
+        assert window.frames[2, 0, 0, 0] == 2
+        assert store.stats()["created"] == 1
+    finally:
+        store.close()
+
+
+@pytest.mark.asyncio
+async def test_eviction_is_visible_to_other_workers(store_name): # 한 워커가 정리한 디바이스가 다른 워커에서도 사라지는지 테스트
+    first = SharedFrameStore(store_name, max_devices=2, maxsize=4)
+    second = SharedFrameStore(store_name, max_devices=2, maxsize=4)
+    try:
+        await first.get_or_create("a").put((0, np.zeros(FRAME_SHAPE, dtype=np.uint8)))
+        first.get_or_create("b")
+        fingerprint = second["a"].fingerprint()
+
+        evicted = []
+        second.add_eviction_listener(evicted.append)
+        second.get_or_create("c")  # 프레임이 없는 b 를 정리하고 등록
+        assert evicted == ["b"]
+        assert "b" not in first and "c" in first
+
+        await first["c"].put((0, np.zeros(FRAME_SHAPE, dtype=np.uint8)))
+        with pytest.raises(ErrorForm) as exc_info:
+            second.get_or_create("d")
+        assert exc_info.value.message == "device_limit"
+
+        # 같은 uid 가 재등록되면 세대가 달라져 이전 진단 캐시가 재사용되지 않음
+        first.evict("a")
+        second.get_or_create("a")
+        assert first["a"].qsize() == 0
+        assert first["a"].fingerprint() != fingerprint
+    finally:
+        first.close()
+        second.close()
+
+
+def test_lock_timeout_returns_busy(store_name): # 다른 프로세스가 슬롯 잠금을 놓지 않으면 기다리지 않고 503 인지 테스트
+    context = multiprocessing.get_context("fork")
+    locked, release = context.Event(), context.Event()
+    process = context.Process(target=_hold_lock, args=(store_name, "pi-1", locked, release))
+    process.start()
+    store = SharedFrameStore(store_name, max_devices=2, maxsize=4, lock_timeout_seconds=0.05)
+    try:
+        assert locked.wait(10)
+        started = time.monotonic()
+        with pytest.raises(ErrorForm) as exc_info:
+            store["pi-1"].put_nowait((0, np.zeros(FRAME_SHAPE, dtype=np.uint8)))
+        assert exc_info.value.code == 503 and exc_info.value.message == "frame_store_busy"
+        assert time.monotonic() - started < 1
+
+        release.set()
+        process.join(10)
+        store["pi-1"].put_nowait((0, np.zeros(FRAME_SHAPE, dtype=np.uint8)))
+        assert store["pi-1"].qsize() == 1
+    finally:
+        release.set()
+        process.join(10)
+        store.close()
+
+
+@pytest.mark.asyncio
+async def test_corrupted_counters_are_recounted(store_name): # 저장 도중 종료된 워커가 남긴 카운터로 만료 확인이 멈추지 않는지 테스트
+    store = SharedFrameStore(store_name, max_devices=2, maxsize=4, window_seconds=0.05)
+    try:
+        queue = store.get_or_create("pi-1")
+        queue.put_many_nowait([(idx, np.zeros(FRAME_SHAPE, dtype=np.uint8)) for idx in range(2)])
+        queue._counters[LIVE_COUNT], queue._counters[OLDEST_SLOT] = 100, 7
+        queue.put_nowait((2, np.zeros(FRAME_SHAPE, dtype=np.uint8)))  # 가득 찬 것처럼 보이면 다시 세어 저장
+        assert queue.qsize() == 3
+
+        await asyncio.sleep(0.1)
+        queue._counters[LIVE_COUNT] = 100
+        assert queue.qsize() == 0
+        assert queue.expired_count == 3
+        queue.put_many_nowait([(idx, np.zeros(FRAME_SHAPE, dtype=np.uint8)) for idx in range(4)])
+        assert queue.qsize() == 4
+    finally:
+        store.close()
@@ -0,0 +1,56 @@
+import struct
+import numpy as np
+from io import BytesIO
+from PIL import Image
+from starlette.testclient import TestClient
+from main import app
+from api.frame.frame_routes import uid_queues
+
+
+class StubModel:
+    def predict(self, inputs):
+        return np.full((inputs.shape[0], 1), 0.9, dtype=np.float32)
+
+
+def create_binary_frame(frame_idx: int) -> bytes:
+    buffered = BytesIO()
+    Image.new("RGB", (100, 100), color="red").save(buffered, format="JPEG")
+    return struct.pack(">I", frame_idx) + buffered.getvalue()
+
+
+def test_stream_pushes_diagnosis_at_threshold(): # 43 프레임에 도달하면 진단 결과를 push 하는지 테스트
+    app.state.model = StubModel()
+    client = TestClient(app)
+
+    with client.websocket_connect("/ws/frame?deviceUid=stream_device") as ws:
+        for i in range(43):
+            ws.send_bytes(create_binary_frame(i))
+        message = ws.receive_json()
+
+    assert message["type"] == "diagnosis"
+    assert message["isDrowsinessDrive"] is False
+    assert uid_queues["stream_device"].qsize() == 43
+
+
+def test_stream_reports_invalid_frame_and_backpressure(): # 잘못된 프레임과 큐 초과 시 메시지 테스트
+    app.state.model = None
+    client = TestClient(app)
+
+    with client.websocket_connect("/ws/frame?deviceUid=stream_full_device") as ws:
+        ws.send_bytes(b"\x00\x00")
+        invalid = ws.receive_json()
+
+        for i in range(48):
+            ws.send_bytes(create_binary_frame(i))
+        # 43 프레임 도달 시 진단을 시도하지만 모델이 없어 에러가 push 됨
+        model_error = ws.receive_json()
+
+        ws.send_bytes(create_binary_frame(48))
+        backpressure = ws.receive_json()
+
+    assert invalid["type"] == "error"
+    assert invalid["error"]["message"] == "invalid_frame"
+    assert model_error["error"]["message"] == "model_not_loaded"
+    assert backpressure["type"] == "backpressure"
+    assert backpressure["frameIdx"] == 48
+    assert backpressure["retryAfterMs"] > 0
@@ -0,0 +1,127 @@
+import asyncio
+import pytest
+import numpy as np
+from PIL import Image
+from api.frame.TimedQueue import TimedQueue, FRAME_SHAPE
+
+
+@pytest.mark.asyncio
+async def test_put_stores_resized_uint8_frame(): # 저장 시점에 (145, 145, 3) uint8 로 변환되는지 테스트
+    queue = TimedQueue(maxsize=48, window_seconds=2)
+    await queue.put((5, Image.new("RGB", (320, 240), color=(255, 0, 0))))
+
+    frame_indices, frames, _ = await queue.snapshot()
+    assert frame_indices.tolist() == [5]
+    assert frames.shape == (1, *FRAME_SHAPE)
+    assert frames.dtype == np.uint8
+    assert frames[0, 0, 0].tolist() == [255, 0, 0]
+
+
+@pytest.mark.asyncio
+async def test_snapshot_sorted_by_frame_idx(): # 도착 순서와 무관하게 frameIdx 순으로 반환되는지 테스트
+    queue = TimedQueue(maxsize=48, window_seconds=2)
+    for idx in [3, 1, 2]:
+        await queue.put((idx, np.full(FRAME_SHAPE, idx, dtype=np.uint8)))
+
+    frame_indices, frames, _ = await queue.snapshot()
+    assert frame_indices.tolist() == [1, 2, 3]
+    assert frames[:, 0, 0, 0].tolist() == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_expired_frames_leave_window(): # 윈도우 시간이 지나면 프레임이 만료되는지 테스트
+    queue = TimedQueue(maxsize=48, window_seconds=0.05)
+    await queue.put((0, np.zeros(FRAME_SHAPE, dtype=np.uint8)))
+    assert queue.qsize() == 1
+
+    await asyncio.sleep(0.1)
+    assert queue.qsize() == 0
+    await queue.put((1, np.zeros(FRAME_SHAPE, dtype=np.uint8)))
+    assert queue.qsize() == 1
+
+
+@pytest.mark.asyncio
+async def test_fingerprint_changes_only_with_window(): # 윈도우가 바뀔 때만 fingerprint 가 바뀌는지 테스트
+    queue = TimedQueue(maxsize=48, window_seconds=2)
+    await queue.put((0, np.zeros(FRAME_SHAPE, dtype=np.uint8)))
+
+    first = queue.fingerprint()
+    assert queue.fingerprint() == first
+    assert (await queue.snapshot()).fingerprint == first
+
+    await queue.put((1, np.zeros(FRAME_SHAPE, dtype=np.uint8)))
+    assert queue.fingerprint() != first
+
+
+@pytest.mark.asyncio
+async def test_expiry_accounting_with_overwrite(): # 같은 슬롯을 쓰는 프레임과 만료 후에도 qsize/expired_count 가 맞는지 테스트
+    queue = TimedQueue(maxsize=4, window_seconds=0.05)
+    queue.put_many_nowait([(idx, np.zeros(FRAME_SHAPE, dtype=np.uint8)) for idx in range(3)])
+    queue.put_nowait((2, np.ones(FRAME_SHAPE, dtype=np.uint8)))  # 같은 frameIdx 는 교체
+    queue.put_nowait((4, np.zeros(FRAME_SHAPE, dtype=np.uint8)))  # 0번 슬롯의 0번 프레임은 남기고 빈 슬롯에 저장
+    assert queue.qsize() == 4
+    assert queue.snapshot_nowait().frame_indices.tolist() == [0, 1, 2, 4]
+
+    await asyncio.sleep(0.1)
+    assert queue.qsize() == 0
+    assert queue.expired_count == 4
+
+
+@pytest.mark.asyncio
+async def test_frame_index_reset_keeps_window(): # frameIdx 가 0 부터 다시 시작해도 윈도우의 프레임이 사라지지 않는지 테스트
+    queue = TimedQueue(maxsize=48, window_seconds=2)
+    queue.put_many_nowait([(idx, np.zeros(FRAME_SHAPE, dtype=np.uint8)) for idx in range(100, 140)])
+    queue.put_many_nowait([(idx, np.ones(FRAME_SHAPE, dtype=np.uint8)) for idx in range(5)])
+
+    assert queue.qsize() == 45
+    assert queue.snapshot_nowait().frame_indices.tolist() == list(range(5)) + list(range(100, 140))
+    assert (queue.expired_count, queue.rejected_count) == (0, 0)
+
+    queue.put_nowait((4, np.full(FRAME_SHAPE, 4, dtype=np.uint8)))  # 빈 슬롯으로 옮겨진 4번을 다시 보내면 교체
+    window = queue.snapshot_nowait()
+    assert window.frame_indices.tolist() == list(range(5)) + list(range(100, 140))
+    assert window.frames[4, 0, 0, 0] == 4
+
+    queue.put_many_nowait([(idx, np.ones(FRAME_SHAPE, dtype=np.uint8)) for idx in range(5, 8)])
+    with pytest.raises(asyncio.QueueFull):
+        queue.put_nowait((8, np.ones(FRAME_SHAPE, dtype=np.uint8)))
+    assert (queue.qsize(), queue.rejected_count) == (48, 1)
+
+
+@pytest.mark.asyncio
+async def test_put_nowait_full_and_wakes_getter(): # 빠른 경로의 QueueFull 과 get_one 대기자 깨우기 테스트
+    queue = TimedQueue(maxsize=2, window_seconds=2)
+    getter = asyncio.create_task(queue.get_one())
+    await asyncio.sleep(0)
+
+    queue.put_nowait((7, np.zeros(FRAME_SHAPE, dtype=np.uint8)))
+    frame_idx, _ = await asyncio.wait_for(getter, timeout=1)
+    assert frame_idx == 7
+
+    queue.put_many_nowait([(0, np.zeros(FRAME_SHAPE, dtype=np.uint8)), (1, np.zeros(FRAME_SHAPE, dtype=np.uint8))])
+    with pytest.raises(asyncio.QueueFull):
+        queue.put_nowait((2, np.zeros(FRAME_SHAPE, dtype=np.uint8)))
+    assert queue.rejected_count == 1
+    assert queue.seconds_until_free() > 0
+
+
+@pytest.mark.asyncio
+async def test_out_of_order_frames_expire_exactly(): # 링 순서와 다르게 남은 만료 프레임도 조회와 저장에서 빠지는지 테스트
+    reader, writer = TimedQueue(maxsize=4, window_seconds=0.2), TimedQueue(maxsize=3, window_seconds=0.2)
+    for queue in (reader, writer):
+        queue.put_many_nowait([(0, np.zeros(FRAME_SHAPE, dtype=np.uint8)), (1, np.ones(FRAME_SHAPE, dtype=np.uint8))])
+    await asyncio.sleep(0.1)
+    # 만료 확인을 시작하는 0번 슬롯을 같은 frameIdx 의 새 프레임으로 교체해서 1번 슬롯이 먼저 만료되게 함
+    for queue in (reader, writer):
+        queue.put_nowait((0, np.full(FRAME_SHAPE, 4, dtype=np.uint8)))
+    writer.put_nowait((2, np.full(FRAME_SHAPE, 2, dtype=np.uint8)))
+    await asyncio.sleep(0.14)
+
+    # 링 순서상 앞선 0번 슬롯이 윈도우 안이어도 qsize 는 뒤에 남은 만료 프레임을 세지 않음
+    assert (reader.qsize(), writer.qsize()) == (1, 2)
+    assert reader.snapshot_nowait().frame_indices.tolist() == [0]
+    assert reader.expired_count == 1
+
+    writer.put_nowait((3, np.full(FRAME_SHAPE, 3, dtype=np.uint8)))  # 가득 찬 것처럼 보여도 만료된 1번을 비우고 저장
+    assert writer.snapshot_nowait().frame_indices.tolist() == [0, 2, 3]
+    assert (writer.expired_count, writer.rejected_count) == (1, 0)
@@ -0,0 +1,71 @@
+import pytest
+import numpy as np
+from httpx import AsyncClient
+from httpx import ASGITransport
+from main import app
+import config
+from api.diagnosis import diagnosis_routes
+from api.frame.DeviceRegistry import DeviceRegistry
+from api.frame.TimedQueue import TimedQueue, FRAME_SHAPE
+from utils.tracing import TraceStore, span
+
+ADMIN_HEADERS = {"X-Admin-Token": "secret"}
+
+
+class StubModel:
+    def predict(self, inputs):
+        return np.full((inputs.shape[0], 1), 0.9, dtype=np.float32)
+
+
+def test_span_without_trace_is_noop(): # 추적이 꺼져 있으면 trace 를 만들지 않는지 테스트
+    traces = TraceStore(threshold_ms=0)
+    assert traces.begin("uuid", "GET", "/") is None
+    with span("anything"):
+        pass
+    assert span("a") is span("b")
+
+
+@pytest.mark.asyncio
+async def test_slow_request_trace_has_stages(monkeypatch): # 기준보다 느린 진단 요청의 단계별 trace 가 보관되는지 테스트
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "secret")
+    devices = DeviceRegistry(queue_factory=lambda: TimedQueue(maxsize=48, window_seconds=2))
+    monkeypatch.setattr(diagnosis_routes, "uid_queues", devices)
+    app.state.model = StubModel()
+    await devices.get_or_create("trace_device").put_many(
+        [(idx, np.zeros(FRAME_SHAPE, dtype=np.uint8)) for idx in range(48)])
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        enabled = await ac.put("/api/admin/traces", params={"thresholdMs": 0.001}, headers=ADMIN_HEADERS)
+        assert enabled.json()["tracing"]["thresholdMs"] == 0.001
+
+        await ac.get("/api/diagnosis/drowiness", params={"deviceUid": "trace_device"})
+        listed = (await ac.get("/api/admin/traces", headers=ADMIN_HEADERS)).json()["traces"]
+        diagnosis_trace = next(trace for trace in listed if trace["path"] == "/api/diagnosis/drowiness")
+        single = await ac.get(f"/api/admin/traces/{diagnosis_trace['requestUuid']}", headers=ADMIN_HEADERS)
+        missing = await ac.get("/api/admin/traces/unknown", headers=ADMIN_HEADERS)
+
+        await ac.put("/api/admin/traces", params={"thresholdMs": 0}, headers=ADMIN_HEADERS)
+
+    stages = {item["stage"] for item in single.json()["trace"]["spans"]}
+    assert {"queue_read", "inference_queue_wait", "preprocess.interpolate_index", "preprocess.blend_normalize",
+            "model_predict(batch=1)", "response_serialize", "response_send"} <= stages
+    assert missing.status_code == 404
+    assert not app.state.traces.enabled
+
+
+@pytest.mark.asyncio
+async def test_profile_returns_samples(monkeypatch): # 관리용 프로파일링이 샘플과 folded stack 을 반환하는지 테스트
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "secret")
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.post("/api/admin/profile", params={"seconds": 0.2, "intervalMs": 5}, headers=ADMIN_HEADERS)
+        invalid = await ac.post("/api/admin/profile", params={"seconds": 0}, headers=ADMIN_HEADERS)
+        unauthorized = await ac.post("/api/admin/profile", params={"seconds": 0.1})
+
+    profile = response.json()["profile"]
+    assert response.status_code == 200
+    assert profile["samples"] > 0
+    assert profile["folded"]
+    assert invalid.status_code == 422
+    assert unauthorized.status_code == 401
@@ -0,0 +1,98 @@
+import json
+import threading
+import pytest
+import numpy as np
+from io import BytesIO
+from PIL import Image
+from api.frame.DeviceRegistry import DeviceRegistry
+from api.frame.CompressedTimedQueue import CompressedTimedQueue
+from api.frame.TimedQueue import TimedQueue, FRAME_SHAPE
+from api.frame.frame_routes import decode_image_bytes
+from utils.bounded_executor import BoundedExecutor
+from window_snapshot import save_window_snapshot, restore_window_snapshot
+
+
+def create_jpeg(color) -> bytes:
+    buffered = BytesIO()
+    Image.new("RGB", (320, 240), color=color).save(buffered, format="JPEG")
+    return buffered.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_snapshot_round_trip(tmp_path): # 저장한 윈도우가 frameIdx, 프레임, 경과 시간까지 그대로 복원되는지 테스트
+    registry = DeviceRegistry(queue_factory=lambda: TimedQueue(maxsize=48, window_seconds=2))
+    for idx in range(5):
+        registry.get_or_create("device_a").put_nowait((idx, np.full(FRAME_SHAPE, idx, dtype=np.uint8)))
+    registry.get_or_create("device_b").put_nowait((7, np.full(FRAME_SHAPE, 70, dtype=np.uint8)))
+    registry.get_or_create("device_empty")
+
+    result = save_window_snapshot(registry, tmp_path / "windows")
+    assert (result["devices"], result["frames"]) == (2, 6)
+    assert np.load(tmp_path / "windows" / "frames.npy", mmap_mode="r").shape == (6, *FRAME_SHAPE)
+
+    restored = DeviceRegistry(queue_factory=lambda: TimedQueue(maxsize=48, window_seconds=2))
+    result = await restore_window_snapshot(restored, tmp_path / "windows")
+    assert (result["devices"], result["frames"], result["expired"]) == (2, 6, 0)
+    assert "device_empty" not in restored
+    assert not (tmp_path / "windows").exists()  # 복원한 스냅샷은 지움
+
+    frame_indices, frames, _ = restored["device_a"].snapshot_nowait()
+    assert frame_indices.tolist() == [0, 1, 2, 3, 4]
+    assert frames[:, 0, 0, 0].tolist() == [0, 1, 2, 3, 4]
+    assert restored["device_b"].snapshot_nowait().frames[0, 0, 0, 0] == 70
+
+    # 복원한 프레임의 경과 시간은 원래 저장 시각부터 계산됨
+    _, _, saved_ages_ns = registry["device_a"].export_window()
+    _, _, restored_ages_ns = restored["device_a"].export_window()
+    assert np.abs(restored_ages_ns - saved_ages_ns).max() < 50_000_000
+
+
+@pytest.mark.asyncio
+async def test_restore_drops_frames_older_than_window(tmp_path): # 저장 후 흐른 시간까지 포함해 만료된 프레임은 복원하지 않는지 테스트
+    registry = DeviceRegistry(queue_factory=lambda: TimedQueue(maxsize=48, window_seconds=2))
+    registry.get_or_create("device_a").put_nowait((0, np.zeros(FRAME_SHAPE, dtype=np.uint8)))
+    registry.get_or_create("device_b").put_nowait((0, np.zeros(FRAME_SHAPE, dtype=np.uint8)))
+    save_window_snapshot(registry, tmp_path / "windows")
+
+    # device_a 프레임이 3초 전에 저장된 것으로 바꿈
+    index = np.load(tmp_path / "windows" / "index.npy")
+    index["time_ns"][index["device"] == 0] -= 3_000_000_000
+    np.save(tmp_path / "windows" / "index.npy", index)
+
+    restored = DeviceRegistry(queue_factory=lambda: TimedQueue(maxsize=48, window_seconds=2))
+    restored.get_or_create("device_b").put_nowait((9, np.zeros(FRAME_SHAPE, dtype=np.uint8)))
+    result = await restore_window_snapshot(restored, tmp_path / "windows")
+    assert (result["devices"], result["expired"], result["skipped"]) == (0, 1, 1)
+    assert "device_a" not in restored
+    assert restored["device_b"].snapshot_nowait().frame_indices.tolist() == [9]  # 새로 들어온 프레임은 덮어쓰지 않음
+
+
+@pytest.mark.asyncio
+async def test_lazy_payloads_restore_into_either_mode(tmp_path): # 압축 바이트 윈도우가 lazy/eager 큐 모두로 복원되는지 테스트
+    executor = BoundedExecutor("test_restore", max_workers=1, max_pending=4)
+    decode_threads = []
+
+    def decoder(image_data: bytes):
+        decode_threads.append(threading.current_thread().name)
+        return decode_image_bytes(image_data)
+
+    registry = DeviceRegistry(queue_factory=lambda: CompressedTimedQueue(decode_image_bytes, maxsize=48, window_seconds=2))
+    registry.get_or_create("device_a").put_many_nowait([(0, create_jpeg((255, 0, 0))), (1, create_jpeg((0, 0, 255)))])
+
+    for queue_factory in (lambda: CompressedTimedQueue(decode_image_bytes, maxsize=48, window_seconds=2),
+                          lambda: TimedQueue(maxsize=48, window_seconds=2)):
+        result = save_window_snapshot(registry, tmp_path / "windows")
+        assert result["bytes"] == (tmp_path / "windows" / "payloads.bin").stat().st_size
+        assert json.loads((tmp_path / "windows" / "meta.json").read_text())["devices"] == ["device_a"]
+
+        restored = DeviceRegistry(queue_factory=queue_factory)
+        result = await restore_window_snapshot(restored, tmp_path / "windows", decoder=decoder, executor=executor)
+        assert result["frames"] == 2
+        window = await restored["device_a"].snapshot()
+        assert window.frame_indices.tolist() == [0, 1]
+        assert window.frames[0, 0, 0, 0] > 200 and window.frames[1, 0, 0, 2] > 200
+
+    # eager 큐로 복원할 때만 디코딩하고, 이벤트 루프가 아닌 실행기 스레드에서 함
+    assert len(decode_threads) == 2
+    assert all(name.startswith("test_restore") for name in decode_threads)
+    executor.shutdown()
@@ -0,0 +1,19 @@
+from fastapi.responses import JSONResponse
+from utils.helper import create_error_response, get_logger
+from typing import Optional
+
+import hmac
+import config
+
+logger = get_logger(__name__)
+
+
+def check_admin_token(token: Optional[str], method: str) -> Optional[JSONResponse]:
+    """관리용 API 토큰 확인, 통과하면 None, 아니면 에러 응답"""
+    if not config.ADMIN_TOKEN:
+        logger.warning(f"error_code:403, admin_disabled, {method}, ADMIN_TOKEN 미설정")
+        return create_error_response(403, "admin_disabled", method, "ADMIN_TOKEN 이 설정되지 않아 관리용 API 를 사용할 수 없습니다.")
+    if token is None or not hmac.compare_digest(token, config.ADMIN_TOKEN):
+        logger.warning(f"error_code:401, unauthorized, {method}, 관리용 토큰 불일치")
+        return create_error_response(401, "unauthorized", method, "X-Admin-Token 헤더가 올바르지 않습니다.")
+    return None
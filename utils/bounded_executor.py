@@ -0,0 +1,79 @@
+import asyncio
+import contextvars
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+class ExecutorSaturated(Exception):
+    """실행기 대기열이 가득 차 요청을 받을 수 없음"""
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        super().__init__(f"{name} 실행기 포화 상태 (최대 {limit}건)")
+
+
+class BoundedExecutor:
+    """이벤트 루프 밖에서 작업을 실행하는 스레드 풀 + 입장 제어"""
+
+    def __init__(self, name: str, max_workers: int, max_pending: int):
+        if max_workers < 1 or max_pending < 1:
+            raise ValueError("max_workers, max_pending 은 1 이상이어야 함")
+
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+        # 아래 카운터는 이벤트 루프 스레드에서만 변경됨
+        self._reserved = 0
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+
+    @contextmanager
+    def reserve(self):
+        """요청 하나가 실행기를 사용할 자리를 확보, 가득 차 있으면 ExecutorSaturated"""
+        if self._reserved >= self.max_pending:
+            self._rejected += 1
+            raise ExecutorSaturated(self.name, self.max_pending)
+
+        self._reserved += 1
+        try:
+            yield
+        finally:
+            self._reserved -= 1
+
+    async def run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # 호출한 요청의 context(request_uuid, 요청 trace)를 워커 스레드에서도 그대로 사용
+        context = contextvars.copy_context()
+        self._in_flight += 1
+        try:
+            return await loop.run_in_executor(self._executor, functools.partial(context.run, fn, *args, **kwargs))
+        finally:
+            self._in_flight -= 1
+            self._completed += 1
+
+    async def drain(self, timeout_seconds: float, poll_seconds: float = 0.01) -> bool:
+        """예약되었거나 실행 중인 작업이 모두 끝날 때까지 최대 timeout_seconds 기다림, 모두 끝났으면 True"""
+        deadline = time.monotonic() + timeout_seconds
+        while self._reserved or self._in_flight:
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(poll_seconds)
+        return True
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "maxPending": self.max_pending,
+            "reserved": self._reserved,
+            "inFlight": self._in_flight,
+            "completed": self._completed,
+            "rejected": self._rejected,
+        }
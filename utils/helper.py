@@ -1,7 +1,10 @@
 import os, logging
 from datetime import datetime
 import logging.config
+import logging.handlers
+import atexit
 import contextvars
+import queue
 from fastapi.responses import JSONResponse
 
 request_uuid = contextvars.ContextVar("request_uuid", default=None)
@@ -25,10 +28,19 @@ def get_log_filename(log_type: str) -> str:
 
 class UUIDFormatter(logging.Formatter):
     def format(self, record):
-        record.request_uuid = get_request_uuid()
+        # 백그라운드 스레드에서 포맷될 때는 큐에 넣을 때 기록해 둔 UUID 사용
+        if not hasattr(record, "request_uuid"):
+            record.request_uuid = get_request_uuid()
         return super().format(record)
 
 
+class RequestUUIDFilter(logging.Filter):
+    """QueueHandler 에 넣기 전, 요청 스레드의 request_uuid 를 레코드에 기록"""
+    def filter(self, record):
+        record.request_uuid = get_request_uuid()
+        return True
+
+
 LOGGING_CONFIG = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -88,6 +100,38 @@ LOGGING_CONFIG = {
 # 로깅 설정 적용
 logging.config.dictConfig(LOGGING_CONFIG)
 
+_queue_listeners = []
+
+
+def _use_queue_handlers():
+    """설정된 로거별 FileHandler 들을 QueueListener 백그라운드 스레드로 옮기고 로거에는 QueueHandler 만 남김"""
+    for name in LOGGING_CONFIG["loggers"]:
+        target = logging.getLogger(name)
+        handlers = list(target.handlers)
+        if not handlers:
+            continue
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.addFilter(RequestUUIDFilter())
+        for handler in handlers:
+            target.removeHandler(handler)
+        target.addHandler(queue_handler)
+
+        listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        _queue_listeners.append(listener)
+
+
+def stop_queue_listeners():
+    """남은 로그를 모두 파일에 쓰고 백그라운드 스레드 종료"""
+    while _queue_listeners:
+        _queue_listeners.pop().stop()
+
+
+_use_queue_handlers()
+atexit.register(stop_queue_listeners)
+
 def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
 
@@ -1,50 +1,158 @@
-import datetime
+import hashlib
+import random
+import time
 import uuid
-from starlette.concurrency import iterate_in_threadpool
+from typing import Dict, Optional
+
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from fastapi import Request, Response
 from utils.helper import get_middleware_logger, set_request_uuid
+from utils.tracing import TraceStore, current_trace
 
 middle_logger = get_middleware_logger()
 
 
-async def log_request(request: Request, call_next):
-    uuid_str = str(uuid.uuid4())
-    set_request_uuid(uuid_str)
+class BodyLogPolicy:
+    """라우트별 요청/응답 본문 로깅 방식
+
+    mode: full(전체), truncate(앞 max_bytes 만), hash(sha256 + 크기), size(크기만), none(기록 안 함)
+    sample_rate: 본문을 기록할 요청의 비율 (0.0 ~ 1.0)
+    """
+
+    MODES = ("full", "truncate", "hash", "size", "none")
+
+    def __init__(self, mode: str = "truncate", max_bytes: int = 1024, sample_rate: float = 1.0):
+        if mode not in self.MODES:
+            raise ValueError(f"지원하지 않는 본문 로깅 방식: {mode}")
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.sample_rate = sample_rate
+
+    def sampled(self) -> bool:
+        if self.mode == "none" or self.sample_rate <= 0:
+            return False
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def recorder(self) -> "BodyRecorder":
+        return BodyRecorder(self)
+
+
+class BodyRecorder:
+    """본문 청크가 흘러가는 동안 정책에 필요한 만큼만 기록, 본문 전체를 버퍼링하지 않음"""
+
+    def __init__(self, policy: BodyLogPolicy):
+        self.policy = policy
+        self.size = 0
+        self._head = bytearray()
+        self._hash = hashlib.sha256() if policy.mode == "hash" else None
+
+    def feed(self, chunk: bytes):
+        if not chunk:
+            return
+        self.size += len(chunk)
+        if self._hash is not None:
+            self._hash.update(chunk)
+        elif self.policy.mode == "full":
+            self._head += chunk
+        elif self.policy.mode == "truncate" and len(self._head) < self.policy.max_bytes:
+            self._head += chunk[:self.policy.max_bytes - len(self._head)]
+
+    def describe(self) -> str:
+        if self.size == 0:
+            return "(empty)"
+        if self.policy.mode == "hash":
+            return f"sha256={self._hash.hexdigest()} ({self.size} bytes)"
+        if self.policy.mode == "size":
+            return f"({self.size} bytes)"
+
+        text = self._head.decode(errors="ignore")
+        if self.size > len(self._head):
+            text += f"... (truncated, {self.size} bytes)"
+        return text
+
+
+class LoggingMiddleware:
+    """요청 UUID 설정 + 요청/응답 로깅을 하는 순수 ASGI 미들웨어
+
+    traces 가 켜져 있으면(threshold_ms > 0) 요청마다 단계별 trace 를 만들고, 느린 요청만 보관한다.
+    """
+
+    def __init__(self, app: ASGIApp, policies: Optional[Dict[str, BodyLogPolicy]] = None,
+                 default_policy: Optional[BodyLogPolicy] = None, traces: Optional[TraceStore] = None):
+        self.app = app
+        self.policies = policies or {}
+        self.default_policy = default_policy or BodyLogPolicy()
+        self.traces = traces
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        uuid_str = str(uuid.uuid4())
+        set_request_uuid(uuid_str)
+        start_time = time.perf_counter()
 
-    start_time = datetime.datetime.utcnow()
+        request = Request(scope)
+        client_ip = request.client.host if request.client else "Unknown"
+        middle_logger.info(f"Start [{uuid_str}] ---------------------")
+        middle_logger.info(f"   [{uuid_str}] Client IP: {client_ip}")
+        middle_logger.info(f"   [{uuid_str}] Request: {request.method} {request.url}")
 
-    middle_logger.info(f"Start [{uuid_str}] ---------------------")
-    client_ip = request.client.host
-    middle_logger.info(f"   [{uuid_str}] Client IP: {client_ip}")
-    middle_logger.info(f"   [{uuid_str}] Request: {request.method} {request.url}")
+        policy = self.policies.get(scope["path"], self.default_policy)
+        log_body = policy.sampled()
+        request_body = policy.recorder() if log_body else None
+        response_body = policy.recorder() if log_body else None
+        status_code = None
 
-    try:
-        request_body = await request.body()
-        middle_logger.info(f"   [{uuid_str}] Request Body: {request_body.decode(errors='ignore')}")
-    except Exception as e:
-        middle_logger.warning(f"   [{uuid_str}] Request Body Read Error: {e}")
+        trace = self.traces.begin(uuid_str, request.method, scope["path"]) if self.traces is not None else None
+        if trace is not None:
+            current_trace.set(trace)
+        body_started = None
+        response_started = None
 
-    response = await call_next(request)
+        async def receive_with_logging() -> Message:
+            nonlocal body_started
+            if trace is not None and body_started is None:
+                body_started = time.perf_counter()
+            message = await receive()
+            if message["type"] == "http.request":
+                if request_body is not None:
+                    request_body.feed(message.get("body", b""))
+                if trace is not None and not message.get("more_body", False):
+                    trace.add("body_read", body_started, time.perf_counter() - body_started)
+            return message
 
-    endpoint = request.scope.get("endpoint")
-    endpoint_name = endpoint.__name__ if endpoint else "Unknown"
-    middle_logger.info(f"   [{uuid_str}] Processed by endpoint: {endpoint_name}")
+        async def send_with_logging(message: Message):
+            nonlocal status_code, response_started
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_started = time.perf_counter()
+            elif message["type"] == "http.response.body":
+                if response_body is not None:
+                    response_body.feed(message.get("body", b""))
+                if trace is not None and not message.get("more_body", False):
+                    await send(message)
+                    trace.add("response_send", response_started, time.perf_counter() - response_started)
+                    return
+            await send(message)
 
-    response_body = [chunk async for chunk in response.body_iterator]
-    response.body_iterator = iterate_in_threadpool(iter(response_body))
-    if response_body:
         try:
-            decoded_body = b''.join(response_body).decode(errors="ignore")
-            middle_logger.info(f"   [{uuid_str}] Response Body: {decoded_body}")
-        except Exception as e:
-            middle_logger.warning(f"   [{uuid_str}] Response Body Decode Error: {e}")
-    else:
-        middle_logger.info(f"   [{uuid_str}] Response Body: (empty)")
+            await self.app(scope, receive_with_logging, send_with_logging)
+        finally:
+            if trace is not None and self.traces.finish(trace, status_code):
+                middle_logger.warning(f"   [{uuid_str}] Slow request: {trace.duration_seconds * 1000:.1f} ms, "
+                                      f"trace: GET /api/admin/traces/{uuid_str}")
 
-    process_time = (datetime.datetime.utcnow() - start_time).total_seconds()
-    middle_logger.info(f"   [{uuid_str}] Process-Time: {process_time:.3f} sec")
-    middle_logger.info(f"End [{uuid_str}] -----------------------")
+            endpoint = scope.get("endpoint")
+            endpoint_name = endpoint.__name__ if endpoint else "Unknown"
+            middle_logger.info(f"   [{uuid_str}] Processed by endpoint: {endpoint_name} (status: {status_code})")
 
-    return response
+            if log_body:
+                middle_logger.info(f"   [{uuid_str}] Request Body: {request_body.describe()}")
+                middle_logger.info(f"   [{uuid_str}] Response Body: {response_body.describe()}")
 
+            process_time = time.perf_counter() - start_time
+            middle_logger.info(f"   [{uuid_str}] Process-Time: {process_time:.3f} sec")
+            middle_logger.info(f"End [{uuid_str}] -----------------------")
@@ -0,0 +1,81 @@
+"""외부 도구 없이 쓰는 간단한 샘플링 프로파일러
+
+interval 마다 sys._current_frames() 로 모든 스레드의 호출 스택을 찍어 집계한다.
+결과는 함수별 self/total 샘플 수와 flamegraph 도구(flamegraph.pl, speedscope 등)에 넣을 수 있는 folded stack 형식.
+"""
+from collections import Counter
+from typing import Dict, List, Optional
+import sys
+import threading
+import time
+
+
+class SamplingProfiler:
+    def __init__(self, interval_seconds: float = 0.005, max_depth: int = 64):
+        self.interval_seconds = interval_seconds
+        self.max_depth = max_depth
+
+        self._stacks: Counter = Counter()
+        self._samples = 0
+        self._started = 0.0
+        self._stopped = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def samples(self) -> int:
+        return self._samples
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self._stop.clear()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._stopped = time.perf_counter()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        while not self._stop.wait(self.interval_seconds):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack.append(names.get(thread_id, str(thread_id)))
+                self._stacks[tuple(reversed(stack))] += 1
+            self._samples += 1
+
+    def result(self, top: int = 30) -> dict:
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in self._stacks.items():
+            self_counts[stack[-1]] += count
+            for function in set(stack[1:]):
+                total_counts[function] += count
+
+        def ranked(counts: Counter) -> List[Dict]:
+            return [{"function": function, "samples": count} for function, count in counts.most_common(top)]
+
+        return {
+            "seconds": round(self._stopped - self._started, 3),
+            "intervalMs": self.interval_seconds * 1000,
+            "samples": self._samples,
+            "self": ranked(self_counts),
+            "total": ranked(total_counts),
+            "folded": "\n".join(f"{';'.join(stack)} {count}" for stack, count in self._stacks.most_common()),
+        }
@@ -0,0 +1,122 @@
+"""느린 요청의 단계별 시간 기록
+
+요청마다 RequestTrace 를 contextvar 에 두고 span(stage) 로 단계 시간을 남긴다.
+추적이 꺼져 있으면(TraceStore.threshold_ms <= 0) RequestTrace 를 만들지 않고,
+span() 은 contextvar 조회 한 번 후 공용 nullcontext 를 반환하므로 비용이 거의 없다.
+BoundedExecutor 는 호출한 쪽 context 를 복사해 실행하므로 디코딩 등 워커 스레드의 span 도 같은 요청에 기록된다.
+"""
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from typing import List, Optional, Tuple
+import contextvars
+import threading
+import time
+
+current_trace: contextvars.ContextVar[Optional["RequestTrace"]] = contextvars.ContextVar("current_trace", default=None)
+
+_NO_SPAN = nullcontext()
+
+
+class RequestTrace:
+    """요청 하나의 단계별 (이름, 시작 오프셋, 걸린 시간)"""
+
+    def __init__(self, request_uuid: str, method: str, path: str):
+        self.request_uuid = request_uuid
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.status_code: Optional[int] = None
+        self.duration_seconds = 0.0
+        self.spans: List[Tuple[str, float, float]] = []
+        # 워커 스레드에서도 span 을 추가하므로 잠금
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, start, time.perf_counter() - start)
+
+    def add(self, stage: str, start: float, seconds: float):
+        with self._lock:
+            self.spans.append((stage, start - self.started, seconds))
+
+    def finish(self, status_code: Optional[int]):
+        self.status_code = status_code
+        self.duration_seconds = time.perf_counter() - self.started
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda item: item[1])
+        return {
+            "requestUuid": self.request_uuid,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status_code,
+            "startedAt": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started_at)),
+            "durationMs": round(self.duration_seconds * 1000, 3),
+            "spans": [
+                {"stage": stage, "startMs": round(offset * 1000, 3), "durationMs": round(seconds * 1000, 3)}
+                for stage, offset, seconds in spans
+            ],
+        }
+
+
+def span(stage: str):
+    """현재 요청이 추적 중이면 stage 시간을 기록하는 context manager, 아니면 아무것도 안 함"""
+    trace = current_trace.get()
+    return _NO_SPAN if trace is None else trace.span(stage)
+
+
+class TraceStore:
+    """threshold_ms 이상 걸린 요청의 trace 를 최근 max_traces 개까지 request_uuid 별로 보관"""
+
+    def __init__(self, threshold_ms: float = 0, max_traces: int = 100):
+        self.threshold_ms = threshold_ms
+        self.max_traces = max_traces
+        self._traces: "OrderedDict[str, RequestTrace]" = OrderedDict()
+        self._traced = 0
+        self._captured = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+
+    def begin(self, request_uuid: str, method: str, path: str) -> Optional[RequestTrace]:
+        if not self.enabled:
+            return None
+        self._traced += 1
+        return RequestTrace(request_uuid, method, path)
+
+    def finish(self, trace: RequestTrace, status_code: Optional[int]) -> bool:
+        """느린 요청이면 보관하고 True"""
+        trace.finish(status_code)
+        if trace.duration_seconds * 1000 < self.threshold_ms:
+            return False
+
+        self._captured += 1
+        self._traces[trace.request_uuid] = trace
+        while len(self._traces) > self.max_traces:
+            self._traces.popitem(last=False)
+        return True
+
+    def get(self, request_uuid: str) -> Optional[RequestTrace]:
+        return self._traces.get(request_uuid)
+
+    def recent(self, limit: int) -> List[RequestTrace]:
+        return list(self._traces.values())[-limit:][::-1]
+
+    def clear(self):
+        self._traces.clear()
+
+    def stats(self) -> dict:
+        return {
+            "thresholdMs": self.threshold_ms,
+            "maxTraces": self.max_traces,
+            "traced": self._traced,
+            "captured": self._captured,
+            "stored": len(self._traces),
+        }
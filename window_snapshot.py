@@ -0,0 +1,202 @@
+"""재시작 사이에 디바이스 프레임 윈도우를 보존하는 스냅샷
+
+종료 시 살아 있는 윈도우를 디렉터리 하나에 저장하고, 시작 시 아직 윈도우 안에 있는 프레임만 되살린다.
+  frames.npy   : (n, 145, 145, 3) uint8, np.load(mmap_mode="r") 로 필요한 프레임만 읽음 (eager 모드 프레임)
+  payloads.bin : 압축 이미지 바이트를 이어 붙인 파일 (lazy 모드 프레임)
+  index.npy    : 프레임마다 INDEX_DTYPE 레코드 하나, 디바이스 순서로 정렬됨
+  meta.json    : 버전, 저장 시각, deviceUid 목록 (마지막에 쓰므로 이 파일이 있으면 완전한 스냅샷)
+
+monotonic 시각은 프로세스가 바뀌면 의미가 없으므로 프레임 저장 시각은 wall-clock(time.time_ns())으로 바꿔 기록하고,
+되살릴 때 지금과의 차이로 만료 여부와 새 timestamp 를 정한다.
+"""
+import asyncio
+import json
+import mmap
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from api.frame.TimedQueue import FRAME_SHAPE, SignedFrame, frame_signature, image_signature
+from api.frame.CompressedTimedQueue import CompressedTimedQueue
+from utils.bounded_executor import BoundedExecutor
+from utils.exception_handlers import ErrorForm
+from utils.helper import get_logger
+
+logger = get_logger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+INDEX_DTYPE = np.dtype([
+    ("device", np.int32),     # meta.json devices 목록의 위치
+    ("frame_idx", np.int64),
+    ("time_ns", np.int64),    # 프레임 저장 시각 time.time_ns()
+    ("row", np.int64),        # frames.npy 행, 압축 바이트 프레임은 -1
+    ("offset", np.int64),     # payloads.bin 안의 위치
+    ("length", np.int64),     # 압축 바이트 길이, 배열 프레임은 0
+])
+
+
+def save_window_snapshot(registry, directory: Union[str, Path]) -> dict:
+    """registry 의 모든 디바이스 윈도우를 directory 에 저장 (임시 디렉터리에 다 쓴 뒤 교체)"""
+    started = time.perf_counter()
+    directory = Path(directory)
+    staging = directory.with_name(directory.name + ".tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    device_uids, windows, window_seconds = [], [], 0
+    for device_uid, queue in registry.items():
+        window_seconds = max(window_seconds, queue.window_seconds)
+        frame_indices, frames, ages_ns = queue.export_window()
+        if len(frame_indices):
+            windows.append((len(device_uids), frame_indices, frames, time.time_ns() - ages_ns))
+            device_uids.append(device_uid)
+
+    total = sum(len(frame_indices) for _, frame_indices, _, _ in windows)
+    arrays = sum(isinstance(frame, np.ndarray) for _, _, frames, _ in windows for frame in frames)
+    index = np.zeros(total, dtype=INDEX_DTYPE)
+    if arrays:
+        rows = np.lib.format.open_memmap(staging / "frames.npy", mode="w+", dtype=np.uint8, shape=(arrays, *FRAME_SHAPE))
+    else:
+        rows = np.empty((0, *FRAME_SHAPE), dtype=np.uint8)
+        np.save(staging / "frames.npy", rows)
+
+    position, row, offset = 0, 0, 0
+    with open(staging / "payloads.bin", "wb") as payload_file:
+        for device, frame_indices, frames, stamps in windows:
+            for frame_idx, frame, stamp in zip(frame_indices.tolist(), frames, stamps.tolist()):
+                entry = index[position]
+                entry["device"], entry["frame_idx"], entry["time_ns"] = device, frame_idx, stamp
+                if isinstance(frame, np.ndarray):
+                    rows[row] = frame
+                    entry["row"], entry["offset"], entry["length"] = row, -1, 0
+                    row += 1
+                else:
+                    payload_file.write(frame)
+                    entry["row"], entry["offset"], entry["length"] = -1, offset, len(frame)
+                    offset += len(frame)
+                position += 1
+    if isinstance(rows, np.memmap):
+        rows.flush()
+        del rows
+
+    np.save(staging / "index.npy", index)
+    (staging / "meta.json").write_text(json.dumps({
+        "version": SNAPSHOT_VERSION,
+        "savedAtNs": time.time_ns(),
+        "windowSeconds": window_seconds,
+        "devices": device_uids,
+    }, ensure_ascii=False), encoding="utf-8")
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(staging, directory)
+    return {
+        "devices": len(device_uids),
+        "frames": total,
+        "bytes": arrays * int(np.prod(FRAME_SHAPE)) + offset,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def load_entries(entries: np.ndarray, frames: np.ndarray, payloads, decoder: Optional[Callable[[bytes], np.ndarray]],
+                 signatures: bool) -> Tuple[List[Tuple[int, object]], List[int], int]:
+    """index 레코드들의 프레임을 읽어 ([(frameIdx, 프레임)], [저장 시각 time_ns], 디코딩 실패 수) 반환 (실행기 스레드에서 호출됨)
+
+    decoder 가 있으면 압축 바이트를 배열로 디코딩하고, signatures 면 썸네일까지 계산해 SignedFrame 으로 넘긴다.
+    """
+    items, stamps, failed = [], [], 0
+    for entry in entries:
+        if entry["row"] >= 0:
+            frame = np.array(frames[entry["row"]])
+        else:
+            frame = bytes(payloads[entry["offset"]:entry["offset"] + entry["length"]])
+            if decoder is not None:
+                try:
+                    frame = decoder(frame)
+                except ErrorForm:
+                    failed += 1
+                    continue
+        if signatures:
+            frame = SignedFrame(frame, frame_signature(frame) if isinstance(frame, np.ndarray) else image_signature(frame))
+        items.append((int(entry["frame_idx"]), frame))
+        stamps.append(int(entry["time_ns"]))
+    return items, stamps, failed
+
+
+async def restore_window_snapshot(registry, directory: Union[str, Path],
+                                  decoder: Optional[Callable[[bytes], np.ndarray]] = None,
+                                  executor: Optional[BoundedExecutor] = None) -> dict:
+    """directory 의 스냅샷에서 아직 윈도우 안에 있는 프레임을 registry 에 되살리고 스냅샷을 지움
+
+    이미 프레임이 들어온 디바이스는 새 프레임을 덮어쓰지 않도록 건너뛴다.
+    저장 당시와 디코딩 방식이 달라 배열로 저장하는 큐에 압축 바이트를 넣어야 하면 decoder 로 디코딩한다.
+    프레임 읽기와 디코딩은 디바이스마다 executor(없으면 기본 스레드)에서 하므로 모델 로드, 요청 처리와 함께 진행된다.
+    """
+    started = time.perf_counter()
+    directory = Path(directory)
+    result = {"devices": 0, "frames": 0, "expired": 0, "failed": 0, "skipped": 0}
+    meta_path = directory / "meta.json"
+    if not meta_path.exists():
+        return result
+
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    if meta.get("version") != SNAPSHOT_VERSION:
+        logger.warning(f"지원하지 않는 윈도우 스냅샷 버전: {meta.get('version')}, 복원하지 않음")
+        shutil.rmtree(directory, ignore_errors=True)
+        return result
+
+    index = np.load(directory / "index.npy")
+    frames = np.load(directory / "frames.npy", mmap_mode="r")
+    payload_path = directory / "payloads.bin"
+    payload_file = open(payload_path, "rb")
+    payloads = mmap.mmap(payload_file.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(payload_path) else b""
+
+    try:
+        boundaries = np.flatnonzero(np.diff(index["device"])) + 1
+        for entries in np.split(index, boundaries) if len(index) else []:
+            device_uid = meta["devices"][int(entries["device"][0])]
+            if device_uid in registry:
+                result["skipped"] += 1
+                continue
+            # 저장 이후 흐른 시간까지 포함해 윈도우를 벗어난 프레임은 되살리지 않음
+            if time.time_ns() - entries["time_ns"].max() >= meta["windowSeconds"] * 1_000_000_000:
+                result["expired"] += len(entries)
+                continue
+            try:
+                queue = registry.get_or_create(device_uid)
+            except ErrorForm as e:
+                logger.warning(f"윈도우 복원 중단: {e.detail_message}")
+                break
+
+            ages_ns = time.time_ns() - entries["time_ns"]
+            fresh = entries[ages_ns < int(queue.window_seconds * 1_000_000_000)][-queue.maxsize:]
+            result["expired"] += len(entries) - len(fresh)
+            if not len(fresh):
+                continue
+
+            args = (fresh, frames, payloads, None if isinstance(queue, CompressedTimedQueue) else decoder, queue.signatures)
+            if executor is not None:
+                items, stamps, failed = await executor.run(load_entries, *args)
+            else:
+                items, stamps, failed = await asyncio.to_thread(load_entries, *args)
+            result["failed"] += failed
+            # 스레드에서 읽는 동안 요청으로 같은 디바이스에 프레임이 들어왔으면 덮어쓰지 않음
+            if queue.qsize():
+                result["skipped"] += 1
+                continue
+            queue.restore_nowait(items, [time.time_ns() - stamp for stamp in stamps])
+            result["devices"] += 1
+            result["frames"] += len(items)
+    finally:
+        if isinstance(payloads, mmap.mmap):
+            payloads.close()
+        payload_file.close()
+        del frames
+        shutil.rmtree(directory, ignore_errors=True)
+
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result